@@ -0,0 +1,130 @@
+import argparse
+import functools
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, HERE)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1 import local_script_runner  # noqa: E402
+
+from bench_graph_render import synthetic_skills  # noqa: E402
+from mock_openai_server import sample_value  # noqa: E402
+from schemas import CAREER_ANALYSIS_SCHEMA, RESUME_ANALYSIS_SCHEMA  # noqa: E402
+
+RESUME = ("Data engineer with 5 years of Python, SQL and Spark experience. Built ETL pipelines on AWS "
+          "with Airflow and Docker, and dashboards in Tableau.\n").encode() * 20
+JOB = "We are hiring a machine learning engineer: Python, PyTorch, Kubernetes, SQL, AWS, MLOps, Docker."
+
+
+# The user interactions to time: (name, fragment that owns the widget, function that
+# changes the widget). Each returns False when the app has no such widget.
+def type_career_path(at, i):
+    widgets = [w for w in at.text_input if w.label.startswith("Desired Career Path")]
+    widgets and widgets[0].set_value(f"ML Engineering {i}")
+    return bool(widgets)
+
+
+def type_job_description(at, i):
+    widgets = [w for w in at.text_area if w.label.startswith("Paste Job Description")]
+    widgets and widgets[0].set_value(f"{JOB} {i}")
+    return bool(widgets)
+
+
+def filter_skills_explorer(at, i):
+    widgets = [w for w in at.multiselect if w.key == "explorer_priorities"]
+    widgets and widgets[0].set_value(["high", "medium", "low"][:1 + i % 3])
+    return bool(widgets)
+
+
+INTERACTIONS = [
+    ("type in Career Path tab", "career_path_tab", type_career_path),
+    ("type job description", "resume_analysis_tab", type_job_description),
+    ("filter Skills Explorer", "skills_explorer", filter_skills_explorer),
+]
+
+
+# Function to find the id of the fragment a function registered in the last run, or None
+def fragment_id(at, name):
+    for fid, wrapped in at._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            if getattr(cell.cell_contents, "__name__", None) == name:
+                return fid
+    return None
+
+
+# Function to rerun the app the way the browser would after a widget change: only the
+# fragment holding the widget when there is one, the whole script otherwise.
+# AppTest always reruns the whole script, so the fragment is queued on the rerun request
+# the same way Streamlit's session does it.
+def rerun(at, fragment):
+    if fragment is None:
+        return at.run()
+    original = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(original, fragment_id_queue=[fragment])
+    try:
+        return at.run()
+    finally:
+        local_script_runner.RerunData = original
+
+
+def start_app(script, skills):
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=120)
+    at.secrets["OPENAI_API_KEY"] = "sk-benchmark"
+    results = sample_value(RESUME_ANALYSIS_SCHEMA)
+    results["skill_match"]["recommended_skills"] = synthetic_skills(skills)
+    at.session_state.analysis_results = results
+    at.session_state.linkedin_analysis = sample_value(CAREER_ANALYSIS_SCHEMA)
+    at.run()
+    at.file_uploader[0].set_value(("resume.txt", RESUME, "text/plain"))
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time reruns of the app after single widget changes")
+    parser.add_argument("--script", default=os.path.join(SRC, "app.py"),
+                        help="app script to measure, e.g. a copy of app.py from an earlier revision in src/")
+    parser.add_argument("--skills", type=int, default=40, help="recommended skills in the analysis shown")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    at = start_app(args.script, args.skills)
+    print(f"{'interaction':<26} {'rerun scope':<22} {'median ms':>10} {'max ms':>8}")
+    for name, fragment_name, interact in INTERACTIONS:
+        timings = []
+        for i in range(args.repeat):
+            # A fragment rerun only reports the fragment's elements, so refresh the whole
+            # page first to find the widget
+            at.run()
+            if not interact(at, i):
+                break
+            fragment = fragment_id(at, fragment_name)
+            started = time.perf_counter()
+            rerun(at, fragment)
+            timings.append((time.perf_counter() - started) * 1000)
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+        if not timings:
+            print(f"{name:<26} {'(no such widget)':<22}")
+            continue
+        scope = fragment_name if fragment else "whole app"
+        print(f"{name:<26} {scope:<22} {statistics.median(timings):>10.1f} {max(timings):>8.1f}")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{'full rerun':<26} {'whole app':<22} {statistics.median(timings):>10.1f} {max(timings):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from helper import create_cytoscape_html  # noqa: E402
+from skill_graph import CYTOSCAPE_STYLES, build_skill_graph, layered_layout, to_cytoscape  # noqa: E402
+
+
+# The skill graph as app.py built it before the skill_graph module: one node per distinct
+# prerequisite string, every edge kept, laid out and animated by dagre in the browser with
+# the scripts fetched from the CDNs
+def legacy_render(recommended_skills):
+    nodes = [{'data': {'id': 'desired-job', 'label': 'Desired Job', 'type': 'root', 'info': ''}}]
+    edges = []
+    prereq_map = {}
+    skill_nodes = {}
+    for priority in ['high', 'medium', 'low']:
+        for skill_data in recommended_skills:
+            if skill_data['priority'] == priority:
+                skill_id = f"skill-{len(nodes)}"
+                nodes.append({'data': {'id': skill_id, 'label': skill_data['skill'], 'type': priority, 'info': ''}})
+                edges.append({'data': {'source': 'desired-job', 'target': skill_id}})
+                skill_nodes[skill_data['skill']] = skill_id
+    for priority in ['high', 'medium', 'low']:
+        for skill_data in recommended_skills:
+            if skill_data['priority'] == priority:
+                for prereq in skill_data['prerequisites']:
+                    if prereq not in prereq_map:
+                        prereq_map[prereq] = f"prereq-{len(nodes)}"
+                        nodes.append({'data': {'id': prereq_map[prereq], 'label': prereq, 'type': 'prerequisite',
+                                               'info': 'Prerequisite for multiple skills'}})
+                    edges.append({'data': {'source': skill_nodes[skill_data['skill']], 'target': prereq_map[prereq]}})
+    return create_cytoscape_html(nodes, edges, CYTOSCAPE_STYLES, "dagre", True, "cdn"), len(nodes), len(edges)
+
+
+# Pages memoized per analysis, the way app.py caches them with st.cache_data
+_pages = {}
+
+
+def current_render(recommended_skills, assets):
+    key = json.dumps([recommended_skills, assets], sort_keys=True)
+    if key not in _pages:
+        graph = build_skill_graph(recommended_skills)
+        nodes, edges = to_cytoscape(graph, layered_layout(graph))
+        _pages[key] = create_cytoscape_html(nodes, edges, CYTOSCAPE_STYLES, assets=assets), len(nodes), len(edges)
+    return _pages[key]
+
+
+# Recommendations in the shape the model returns, with the usual spelling variants of
+# shared prerequisites ("Python", "python", "Python 3")
+def synthetic_skills(count, seed=0):
+    rng = random.Random(seed)
+    basics = ["Python", "python", "Python 3", "SQL", "sql", "Git", "Linux", "Statistics", "Docker", "docker"]
+    skills = []
+    for i in range(count):
+        prereqs = rng.sample(basics, 3)
+        if i >= 3:
+            prereqs.append(f"Skill {rng.randrange(i)}")
+        skills.append({"skill": f"Skill {i}", "category": "technical", "priority": rng.choice(["high", "medium", "low"]),
+                       "prerequisites": prereqs, "estimated_time": "4 weeks", "resources": []})
+    return skills
+
+
+def timed(render, renders):
+    started = time.perf_counter()
+    for _ in range(renders):
+        html, nodes, edges = render()
+    return (time.perf_counter() - started) / renders * 1000, html, nodes, edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare skill graph rendering before and after precomputed layouts")
+    parser.add_argument("--skills", type=int, nargs="+", default=[10, 40, 150])
+    parser.add_argument("--renders", type=int, default=20, help="reruns showing the same analysis")
+    parser.add_argument("--assets", default="auto", choices=["auto", "static", "inline", "cdn"],
+                        help="static and inline need the vendored scripts (python src/graph_assets.py fetch)")
+    args = parser.parse_args()
+
+    print(f"{'skills':>6} {'version':>13} {'nodes':>6} {'edges':>6} {'ms/render':>10} {'html KB':>8} "
+          f"{'remote scripts':>15}  browser layout")
+    for count in args.skills:
+        skills = synthetic_skills(count)
+        rows = [
+            ("before", legacy_render, args.renders, "dagre + 500 ms animation"),
+            ("after, first", lambda skills: current_render(skills, args.assets), 1, "none (preset positions)"),
+            ("after, rerun", lambda skills: current_render(skills, args.assets), args.renders, "none (preset positions)"),
+        ]
+        for version, render, renders, layout in rows:
+            ms, html, nodes, edges = timed(lambda: render(skills), renders)
+            remote = len(re.findall(r'<script src="https?://', html))
+            print(f"{count:>6} {version:>13} {nodes:>6} {edges:>6} {ms:>10.2f} {len(html) / 1024:>8.1f} "
+                  f"{remote:>15}  {layout}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+# Every analysis below must reach the (mock) API, not a cache
+os.environ["NEXTCV_RESPONSE_CACHE"] = "0"
+os.environ["NEXTCV_JD_INDEX"] = "0"
+
+import llm_functions  # noqa: E402
+from incremental import AnalysisInputs  # noqa: E402
+from mock_openai_server import MockHandler  # noqa: E402
+from openai_client import get_client, set_client  # noqa: E402
+from prompt_builder import estimate_tokens  # noqa: E402
+
+RESUME = """Jane Doe
+jane@example.com
+EXPERIENCE
+Data Engineer, Acme (2019 - 2024)
+- Built ETL pipelines in Python and Spark that load 2 TB a day into the data warehouse
+- Scheduled jobs with Airflow and containerized them with Docker
+- Designed dashboards in Tableau for the sales team
+SKILLS
+Python, SQL, Spark, Airflow, Docker, Tableau, AWS
+"""
+JOB = """Senior Data Engineer
+We are looking for a data engineer to build our streaming platform.
+- 5+ years of Python and SQL
+- Experience with Spark and Kafka
+- Kubernetes and AWS in production
+- Great communication skills
+We offer flexible hours and a learning budget.
+"""
+
+# Typical edits between two clicks on Analyze: (name, resume, job description)
+EDITS = [
+    ("resume typo", RESUME.replace("Designed dashboards", "Designed interactive dashboards"), JOB),
+    ("resume new skill", RESUME + "Kafka streaming with exactly-once delivery\n", JOB),
+    ("job reworded", RESUME, JOB.replace("We offer flexible hours", "We offer remote work, flexible hours")),
+    ("job new skill", RESUME, JOB.replace("- Great communication", "- Terraform\n- Great communication")),
+    ("unchanged", RESUME, JOB + "\n"),
+    ("different job", RESUME, "Registered Nurse\nProvide patient care in a busy clinic. Python is a plus.\n"),
+]
+
+
+# Counts the requests and estimated tokens sent through the app's completion function
+class Meter:
+    def __init__(self):
+        self.requests = self.prompt_tokens = self.reply_tokens = 0
+        self._create = llm_functions._create_completion
+        self._lock = threading.Lock()
+        llm_functions._create_completion = self.create
+
+    def create(self, client, model, messages, *args, **kwargs):
+        reply = self._create(client, model, messages, *args, **kwargs)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += sum(estimate_tokens(message["content"]) for message in messages)
+            self.reply_tokens += estimate_tokens(reply)
+        return reply
+
+    def measure(self, run):
+        before = (self.requests, self.prompt_tokens, self.reply_tokens)
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        after = (self.requests, self.prompt_tokens, self.reply_tokens)
+        return result, elapsed, [b - a for a, b in zip(before, after)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and incremental re-analysis after small edits")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock API latency per request in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="mock API generation speed")
+    parser.add_argument("--items", type=int, default=4, help="list elements per field in mock replies")
+    parser.add_argument("--split-sections", action="store_true")
+    args = parser.parse_args()
+
+    MockHandler.latency = args.latency
+    MockHandler.tokens_per_second = args.tokens_per_second
+    MockHandler.items = args.items
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    set_client(get_client("benchmark", f"http://127.0.0.1:{server.server_port}/v1"))
+    meter = Meter()
+
+    def full(resume, job):
+        return llm_functions.analyze_resume_with_openai(resume, job, "", "benchmark", use_cache=False,
+                                                        split_sections=args.split_sections)
+
+    previous = full(RESUME, JOB)
+    print(f"{'edit':<18} {'mode':<12} {'requests':>8} {'prompt tok':>10} {'reply tok':>9} {'seconds':>8}  refreshed")
+    totals = {"full": [0, 0.0], "incremental": [0, 0.0]}
+    for name, resume, job in EDITS:
+        _, elapsed, (requests, prompt_tokens, reply_tokens) = meter.measure(lambda: full(resume, job))
+        totals["full"][0] += prompt_tokens + reply_tokens
+        totals["full"][1] += elapsed
+        print(f"{name:<18} {'full':<12} {requests:>8} {prompt_tokens:>10} {reply_tokens:>9} {elapsed:>8.2f}")
+        (_, refreshed), elapsed, (requests, prompt_tokens, reply_tokens) = meter.measure(
+            lambda: llm_functions.reanalyze_resume_with_openai(AnalysisInputs(RESUME, JOB, ""), previous, resume, job,
+                                                              "", "benchmark", split_sections=args.split_sections))
+        totals["incremental"][0] += prompt_tokens + reply_tokens
+        totals["incremental"][1] += elapsed
+        print(f"{'':<18} {'incremental':<12} {requests:>8} {prompt_tokens:>10} {reply_tokens:>9} {elapsed:>8.2f}  "
+              f"{'everything' if refreshed is None else ', '.join(refreshed) or 'nothing'}")
+    for mode, (tokens, seconds) in totals.items():
+        print(f"total {mode:<12} {tokens:>8} tokens {seconds:>7.2f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from job_ranking import BM25Index, rank_postings  # noqa: E402
+from skill_matcher import SKILLS  # noqa: E402
+
+FILLER = ("collaborate with the team to design build and operate services for our customers, "
+          "own projects end to end, communicate clearly with product and business partners, "
+          "we offer flexible hours, health benefits, learning budget and a friendly office").split()
+
+
+def phrase(rng, skills):
+    return " ".join(rng.choice(skill.aliases) for skill in skills)
+
+
+# Synthetic postings: each asks for a handful of taxonomy skills amid boilerplate. The
+# first `relevant` ask mostly for the resume's own skills, the rest for random ones.
+# Returns the shuffled postings and the positions of the relevant ones.
+def synthetic_postings(rng, count, resume_skills, relevant):
+    postings = []
+    for i in range(count):
+        if i < relevant:
+            wanted = rng.sample(resume_skills, 5) + rng.sample(SKILLS, 1)
+        else:
+            wanted = rng.sample(SKILLS, 6)
+        lines = [f"Role {i}"] + [" ".join(rng.choices(FILLER, k=12)) + " " + phrase(rng, wanted[j:j + 2])
+                                  for j in range(0, len(wanted), 2)]
+        postings.append("\n".join(lines + [" ".join(rng.choices(FILLER, k=40))]))
+    order = list(range(count))
+    rng.shuffle(order)
+    return [postings[i] for i in order], {position for position, i in enumerate(order) if i < relevant}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time local BM25 ranking of job postings against a resume")
+    parser.add_argument("--postings", type=int, nargs="+", default=[30, 1000, 10000])
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    resume_skills = rng.sample(SKILLS, 12)
+    resume = "\n".join(" ".join(rng.choices(FILLER, k=10)) + " " + phrase(rng, resume_skills[i:i + 3])
+                       for i in range(0, len(resume_skills), 3))
+
+    print(f"{'postings':>9} {'index ms':>9} {'score ms':>9} {'rank ms':>8} {'planted in top-k':>17}")
+    for count in args.postings:
+        postings, relevant = synthetic_postings(rng, count, resume_skills, args.top_k)
+        build, score, rank = [], [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            index = BM25Index(postings)
+            build.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            index.score(resume)
+            score.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            top = rank_postings(resume, postings, args.top_k)
+            rank.append((time.perf_counter() - started) * 1000)
+        found = len({i for i, _ in top} & relevant)
+        print(f"{count:>9} {statistics.median(build):>9.2f} {statistics.median(score):>9.3f} "
+              f"{statistics.median(rank):>8.2f} {found:>14}/{len(relevant)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+
+FOOTER = ("\n\nApply now at https://jobs.example.com/{id}?utm_source=linkedin&utm_campaign=spring — "
+          "we are an equal opportunity employer.")
+
+
+# Synthetic postings: a title line and bullets drawn from a large vocabulary, plus a few
+# boilerplate bullets shared across many postings, as real job boards have
+def synthetic_posting(rng, vocabulary, boilerplate):
+    bullets = [" ".join(rng.choices(vocabulary, k=rng.randint(8, 16))) for _ in range(rng.randint(6, 12))]
+    bullets += rng.sample(boilerplate, 3)
+    rng.shuffle(bullets)
+    return bullets
+
+
+def render(bullets, bullet="•"):
+    return "About the role\n" + "\n".join(f"{bullet} {text}" for text in bullets)
+
+
+# The ways the same posting comes back: re-spaced, with a tracking footer, with two bullets
+# swapped, or all three at once
+def variants(rng, bullets, posting_id):
+    swapped = list(bullets)
+    i, j = rng.sample(range(len(swapped)), 2)
+    swapped[i], swapped[j] = swapped[j], swapped[i]
+    return {
+        "whitespace": "   " + "\n\n".join(render(bullets).split("\n")).replace(" ", "  "),
+        "footer": render(bullets) + FOOTER.format(id=posting_id),
+        "reordered": render(swapped, "-"),
+        "all three": "  " + render(swapped, "-").replace("\n", "\n\n") + FOOTER.format(id=posting_id),
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure near-duplicate job description lookups")
+    parser.add_argument("--count", type=int, default=100000, help="postings stored in the index")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--resumes", type=int, default=1000, help="distinct resumes the postings are spread over")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    boilerplate = [" ".join(rng.choices(vocabulary, k=12)) for _ in range(200)]
+    index = NearDuplicateIndex(threshold=args.threshold, max_entries=args.count)
+
+    postings = []
+    started = time.perf_counter()
+    for posting_id in range(args.count):
+        bullets = synthetic_posting(rng, vocabulary, boilerplate)
+        scope = f"resume-{posting_id % args.resumes}"
+        index.add(scope, render(bullets), posting_id)
+        if len(postings) < args.queries:
+            postings.append((posting_id, scope, bullets))
+    elapsed = time.perf_counter() - started
+    print(f"threshold {args.threshold}: {index.bands} bands of {index.rows} rows")
+    print(f"indexed {args.count} postings in {elapsed:.1f}s ({elapsed / args.count * 1e6:.0f} µs each)")
+
+    print(f"{'query':<12} {'hit rate':>9} {'similarity':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    kinds = {}
+    for posting_id, scope, bullets in postings:
+        for kind, text in variants(rng, bullets, posting_id).items():
+            kinds.setdefault(kind, []).append((scope, text, posting_id))
+    kinds["unrelated"] = [(scope, render(synthetic_posting(rng, vocabulary, boilerplate)), None)
+                          for _, scope, _ in postings]
+    for kind, queries in kinds.items():
+        timings, similarities, hits = [], [], 0
+        for scope, text, expected in queries:
+            started = time.perf_counter()
+            found = index.lookup(scope, text)
+            timings.append((time.perf_counter() - started) * 1000)
+            if found is not None:
+                hits += found[0] == expected
+                similarities.append(found[1])
+        similarity = f"{statistics.mean(similarities):.3f}" if similarities else "-"
+        print(f"{kind:<12} {hits / len(queries):>9.3f} {similarity:>11} "
+              f"{percentile(timings, 0.5):>8.3f} {percentile(timings, 0.99):>8.3f}")
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pdf_extraction  # noqa: E402
+
+WORDS = ("python data engineer pipelines spark kubernetes led team built designed delivered improved "
+         "revenue customers stakeholders analytics platform migration reliability latency").split()
+
+
+# A text PDF with resume-like lines, 45 to a page. Needs fpdf2, which the app itself doesn't.
+def synthetic_pdf(pages, seed=0):
+    from fpdf import FPDF
+
+    rng = random.Random(seed)
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=10)
+    for _ in range(pages):
+        pdf.add_page()
+        for _ in range(45):
+            pdf.cell(0, 5, " ".join(rng.choices(WORDS, k=14)), new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+def timed(data):
+    started = time.perf_counter()
+    first = None
+    for _ in pdf_extraction.iter_pdf_pages(data):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and process-pool PDF extraction")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 40, 100, 200])
+    parser.add_argument("--workers", type=int, default=pdf_extraction.MAX_WORKERS)
+    args = parser.parse_args()
+
+    pdf_extraction.MAX_WORKERS = args.workers
+    print(f"{args.workers} workers")
+    print(f"{'pages':>6} {'mode':<14} {'first page s':>13} {'total s':>8}")
+    for pages in args.pages:
+        data = synthetic_pdf(pages)
+        pdf_extraction.PARALLEL_PAGE_THRESHOLD = pages + 1
+        rows = [("sequential", timed(data))]
+        pdf_extraction.PARALLEL_PAGE_THRESHOLD = 1
+        pdf_extraction.shutdown_pool()
+        # Right after startup the workers are still spawning, so this runs on the calling thread
+        rows.append(("pool starting", timed(data)))
+        while not pdf_extraction.pool_ready():
+            time.sleep(0.01)
+        rows.append(("pool, warm", timed(data)))
+        rows.append(("pool, warm", timed(synthetic_pdf(pages, seed=1))))
+        for mode, (first, total) in rows:
+            print(f"{pages:>6} {mode:<14} {first:>13.3f} {total:>8.3f}")
+    pdf_extraction.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from text_normalization import normalize_pdf_page, join_pdf_pages  # noqa: E402
+
+
+# The per-page and whole-document cleanup exactly as extract_text_from_file did it before
+# the rules were precompiled, kept here as the reference implementation.
+def legacy_normalize(pages):
+    text = ""
+    for page_text in pages:
+        page_text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', page_text)
+        page_text = re.sub(r'(\d{4})\s*\n\s*(\d{4})', r'\1-\2', page_text)
+        page_text = re.sub(r'([A-Z][a-z]+)\s*\n\s*([A-Z][a-z]+)', r'\1 \2', page_text)
+        page_text = re.sub(r'\n([A-Z][A-Z\s]+)\n', r'\n\n\1\n', page_text)
+        page_text = re.sub(r'\n\s*•\s*', '\n• ', page_text)
+        page_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', page_text)
+        page_text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', page_text)
+        page_text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', page_text)
+        text += page_text + "\n\n"
+
+    text = text.strip()
+    text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
+    text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
+    text = re.sub(r'\n\s*•\s*', '\n• ', text)
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    return text
+
+
+def current_normalize(pages):
+    return join_pdf_pages([normalize_pdf_page(page) for page in pages])
+
+
+WORDS = [
+    "Python", "Engineer", "Software", "Data", "led", "built", "deployed", "scalable",
+    "pipelines", "Google", "Acme", "Corp", "Kubernetes", "microservices", "reduced",
+    "latency", "by", "percent", "team", "of", "stake-", "holders", "cross-functional",
+]
+HEADERS = ["EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "PUBLICATIONS", "AWARDS"]
+
+
+# Build a page that looks like PyPDF2 output: wrapped lines, hyphenated breaks, broken
+# date ranges, bullets with stray whitespace and runs of blank lines.
+def synthetic_page(rng, lines=45):
+    out = []
+    for _ in range(lines):
+        kind = rng.random()
+        if kind < 0.08:
+            out.append(rng.choice(HEADERS))
+        elif kind < 0.3:
+            out.append(f" {rng.choice(['•', ' • '])} " + " ".join(rng.choices(WORDS, k=rng.randint(4, 12))))
+        elif kind < 0.4:
+            start = rng.randint(1990, 2020)
+            dash = rng.choice(["-", " - ", "–", " – ", "\n"])
+            out.append(f"{rng.choice(WORDS)} {start}{dash}{start + rng.randint(1, 4)}")
+        elif kind < 0.5:
+            out.append("")
+            out.append("  ")
+        else:
+            out.append(" ".join(rng.choices(WORDS, k=rng.randint(3, 14))))
+    return "\n".join(out)
+
+
+def time_it(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume text normalization")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failed = False
+    print(f"{'pages':>6} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}  output")
+    for page_count in args.pages:
+        pages = [synthetic_page(rng) for _ in range(page_count)]
+        matches = legacy_normalize(pages) == current_normalize(pages)
+        failed = failed or not matches
+
+        legacy = time_it(legacy_normalize, pages, args.repeat)
+        current = time_it(current_normalize, pages, args.repeat)
+        print(f"{page_count:>6} {legacy * 1000:>10.2f} {current * 1000:>11.2f} "
+              f"{legacy / current:>7.2f}x  {'identical' if matches else 'MISMATCH'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
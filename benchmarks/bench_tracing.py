@@ -0,0 +1,52 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import tracing  # noqa: E402
+
+
+# A stage with two nested spans, as in the text extraction path
+def stage(i):
+    with tracing.span("extract_text", bytes=i):
+        with tracing.span("pdf_parse", page=i) as s:
+            s.set(chars=i)
+        with tracing.span("text_cleanup"):
+            pass
+
+
+def bare(i):
+    pass
+
+
+def time_calls(func, calls):
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of stage tracing when off and when on")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("bare", "off", "on"):
+        tracing.enabled = mode == "on"
+        func = bare if mode == "bare" else stage
+        results[mode] = statistics.median(time_calls(func, args.calls) for _ in range(args.repeat))
+    print(f"{'mode':<6} {'ns per stage':>13} {'ns per span':>12}")
+    for mode, ns in results.items():
+        per_span = "-" if mode == "bare" else f"{(ns - results['bare']) / 3:.0f}"
+        print(f"{mode:<6} {ns:>13.0f} {per_span:>12}")
+    print()
+    print(tracing.summary_table())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from schemas import RESUME_ANALYSIS_SCHEMA  # noqa: E402
+
+# A minimal OpenAI-compatible chat completions server for exercising the batch runner and
+# the app without an API key. Requests with a json_schema response_format get a reply that
+# satisfies the schema; plain requests (company research) get a short text. Every reply
+# waits --latency seconds, plus its length over --tokens-per-second when given, to stand in
+# for generation time, carries x-ratelimit-* headers, and with --throttle-every N every Nth
+# request is answered with a 429.
+
+
+# Function to build a small value that satisfies a schema built by schemas.json_schema, with
+# `items` elements in every list
+def sample_value(schema, items=1):
+    kind = schema["type"]
+    if kind == "object":
+        return {key: sample_value(sub_schema, items) for key, sub_schema in schema["properties"].items()}
+    if kind == "array":
+        return [sample_value(schema["items"], items) for _ in range(items)]
+    if kind == "integer":
+        return 72
+    if "enum" in schema:
+        return schema["enum"][0]
+    return "mock"
+
+
+def reply_content(body, items=1):
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(sample_value(response_format["json_schema"]["schema"], items))
+    if response_format.get("type") == "json_object":
+        return json.dumps(sample_value(RESUME_ANALYSIS_SCHEMA, items))
+    return "Mock company summary: a mid-sized technology company."
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    tokens_per_second = 0.0
+    items = 1
+    throttle_every = 0
+    requests_per_minute = 500
+    requests_served = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        content = reply_content(body, self.items)
+        # About four characters per token
+        time.sleep(self.latency + (len(content) / 4 / self.tokens_per_second if self.tokens_per_second else 0))
+        with MockHandler.lock:
+            MockHandler.requests_served += 1
+            served = MockHandler.requests_served
+
+        if self.throttle_every and served % self.throttle_every == 0:
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests",
+                                            "code": "rate_limit_exceeded"}}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("retry-after-ms", "200")
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        # Token counts at about four characters per token
+        prompt_tokens = sum(len(message.get("content") or "") for message in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        completion = {
+            "id": "chatcmpl-mock",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+        }
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_rate_limit_headers()
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for start in range(0, len(content), 40):
+                chunk = dict(completion, object="chat.completion.chunk", choices=[
+                    {"index": 0, "delta": {"content": content[start:start + 40]}, "finish_reason": None}
+                ])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunk = dict(completion, object="chat.completion.chunk", choices=[], usage=usage)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        completion.update(object="chat.completion", usage=usage, choices=[{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }])
+        payload = json.dumps(completion).encode()
+        self.send_response(200)
+        self.send_rate_limit_headers()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_rate_limit_headers(self):
+        self.send_header("x-ratelimit-limit-requests", str(self.requests_per_minute))
+        self.send_header("x-ratelimit-remaining-requests", str(self.requests_per_minute - 1))
+        self.send_header("x-ratelimit-limit-tokens", "200000")
+        self.send_header("x-ratelimit-remaining-tokens", "190000")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock OpenAI chat completions")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds to wait before each reply")
+    parser.add_argument("--tokens-per-second", type=float, default=0,
+                        help="also wait as long as generating the reply would take at this speed")
+    parser.add_argument("--items", type=int, default=1, help="elements in every list of a structured reply")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with a 429")
+    parser.add_argument("--rpm", type=int, default=500, help="requests-per-minute limit to advertise")
+    args = parser.parse_args()
+
+    MockHandler.latency = args.latency
+    MockHandler.tokens_per_second = args.tokens_per_second
+    MockHandler.items = args.items
+    MockHandler.throttle_every = args.throttle_every
+    MockHandler.requests_per_minute = args.rpm
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockHandler)
+    print(f"Mock OpenAI server on http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Served {MockHandler.requests_served} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Heavy packages that only specific features need. Importing the app must not load any of
+# them beyond what Streamlit itself imports (it registers a plotly theme when plotly is
+# installed); each is imported on first use by the code path that needs it.
+DEFERRED = ["pandas", "plotly", "networkx", "openai", "PyPDF2", "docx", "numpy"]
+
+# Modules that make up the app's import at startup
+STARTUP_MODULES = ["app", "helper", "llm_functions", "skill_matcher"]
+# Longest a startup module may take to import, Streamlit included
+BUDGET_MS = 2000
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# Function to import `module` in a fresh interpreter with -X importtime and return
+# {top-level package: (self microseconds, cumulative microseconds)} plus the total. Importing
+# app.py runs the page script, which Streamlit only warns about outside `streamlit run`.
+def profile(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC, capture_output=True, text=True,
+        env={**os.environ, "STREAMLIT_SERVER_HEADLESS": "true"},
+    )
+    if result.returncode != 0 and "import time:" not in result.stderr:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    packages = defaultdict(lambda: [0, 0])
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        package = name.split(".")[0]
+        packages[package][0] += self_us
+        # A package's cumulative time is counted where it is first reached from outside it
+        if indent == 1 or name == package:
+            packages[package][1] = max(packages[package][1], cumulative_us)
+        if indent == 1:
+            total += cumulative_us
+    return dict(packages), total
+
+
+# Function to check a profiled import: startup modules must not load a deferred package
+# that Streamlit doesn't load anyway, and no import may go over budget_ms. Returns the
+# failures as messages.
+def check(module, packages, total, baseline, budget_ms=BUDGET_MS):
+    failures = []
+    if module in STARTUP_MODULES:
+        loaded = [package for package in DEFERRED if package in packages and package not in baseline]
+        if loaded:
+            failures.append(f"import {module} loads {', '.join(loaded)}, which should be deferred")
+    if budget_ms is not None and total / 1000 > budget_ms:
+        failures.append(f"import {module} took {total / 1000:.0f} ms, over the {budget_ms:.0f} ms budget")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-package import cost and check the startup budget")
+    parser.add_argument("modules", nargs="*", default=["app"])
+    parser.add_argument("--top", type=int, default=15, help="packages to list per module")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="fail if any module's import takes longer than this (default %(default)s)")
+    args = parser.parse_args()
+
+    baseline, streamlit_total = profile("streamlit")
+    print(f"import streamlit (baseline): {streamlit_total / 1000:.0f} ms\n")
+
+    failures = []
+    for module in args.modules:
+        packages, total = profile(module)
+        extra = f" ({(total - streamlit_total) / 1000:+.0f} ms over streamlit)" if "streamlit" in packages else ""
+        print(f"import {module}: {total / 1000:.0f} ms{extra}")
+        print(f"  {'package':<28} {'self ms':>8} {'cumulative ms':>14}")
+        ranked = sorted(packages.items(), key=lambda item: item[1][1], reverse=True)
+        for package, (self_us, cumulative_us) in ranked[:args.top]:
+            print(f"  {package:<28} {self_us / 1000:>8.1f} {cumulative_us / 1000:>14.1f}")
+
+        failures += check(module, packages, total, baseline, args.budget_ms)
+        print()
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
 import os
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from openai import OpenAI
-from helper import extract_text_from_file, create_cytoscape_html
-from llm_functions import analyze_resume_with_openai, analyze_linkedin_profile
-import networkx as nx
-import plotly.graph_objects as go
+from helper import extraction_cache, load_resume, create_cytoscape_html, page_preview, section_preview
+from llm_functions import (SPLIT_ANALYSIS, analyze_resume_with_openai, analyze_linkedin_profile, analyze_top_postings,
+                           prefetch_company_summary, reanalyze_resume_with_openai, response_cache, warm_company_cache)
+from company_cache import read_company_list
+from pdf_extraction import warm_pool
+from incremental import SECTION_NAMES, AnalysisInputs
+from job_ranking import rank_postings, split_postings
+from skill_matcher import match_skills
+from tracing import span
 import streamlit.components.v1 as components
-import json
 
 
 # App setup
@@ -20,8 +21,13 @@ st.set_page_config(
 )
 
 # Initialize session state
-if 'resume_text' not in st.session_state:
-    st.session_state.resume_text = ""
+# The resume uploaded under Resume Analysis, a StoredResume shared with the Career Path tab,
+# and the name of the file it came from. The store is shared by all sessions, so the name
+# this user gave the file is kept here rather than with the resume.
+if 'resume' not in st.session_state:
+    st.session_state.resume = None
+if 'resume_file_name' not in st.session_state:
+    st.session_state.resume_file_name = ""
 if 'job_description' not in st.session_state:
     st.session_state.job_description = ""
 if 'company' not in st.session_state:
@@ -32,6 +38,15 @@ if 'career_path' not in st.session_state:
     st.session_state.career_path = ""
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = None
+# The inputs analysis_results came from, and the sections the last Analyze regenerated
+# (None when it ran the whole analysis)
+if 'analysis_inputs' not in st.session_state:
+    st.session_state.analysis_inputs = None
+if 'analysis_refreshed' not in st.session_state:
+    st.session_state.analysis_refreshed = None
+# In rank mode, the analyses of the best matching postings: (posting, BM25 score, results)
+if 'posting_analyses' not in st.session_state:
+    st.session_state.posting_analyses = []
 if 'linkedin_analysis' not in st.session_state:
     st.session_state.linkedin_analysis = None
 if 'api_key' not in st.session_state:
@@ -42,15 +57,398 @@ if 'industry' not in st.session_state:
     st.session_state.industry = ""
 
 
+# Start the company lookup in the background as soon as the company name is entered,
+# so it is usually finished by the time the user clicks Analyze
+def prefetch_company():
+    prefetch_company_summary(st.session_state.company_input, st.session_state.api_key)
 
-# Main app interface
-st.title("NextCV - Career Optimization Tool")
-st.header("AI-Powered Resume and Career Path Analysis")
-st.write("Optimize your resume for your job application and identify skill gaps with AI-powered analysis")
 
-tabs = st.tabs(["Resume Analysis", "Career Path Analysis"])
+# Function to build the skill graph page for a list of recommended skills, with node
+# positions computed here so the browser doesn't run a layout. This is the one cache of the
+# page, so reruns that show the same analysis skip the graph work entirely. skill_graph (and networkx) is imported
+# here, on the first graph, rather than at app startup.
+@st.cache_data(max_entries=32)
+def skill_graph_html(recommended_skills):
+    from skill_graph import CYTOSCAPE_STYLES, build_skill_graph, layered_layout, to_cytoscape
 
-with tabs[0]:
+    with span("skill_graph_layout", skills=len(recommended_skills)):
+        skill_graph = build_skill_graph(recommended_skills)
+        positions = layered_layout(skill_graph)
+    with span("cytoscape_html", nodes=skill_graph.number_of_nodes()):
+        cyto_nodes, cyto_edges = to_cytoscape(skill_graph, positions)
+        graph_html = create_cytoscape_html(cyto_nodes, cyto_edges, CYTOSCAPE_STYLES)
+    return graph_html, len(skill_graph.graph['omitted'])
+
+
+# Function to describe what the server keeps of the user's data, given how it is configured
+def storage_notice():
+    notice = ("Your resume and analyses are kept in the server's memory to speed up repeated requests, "
+              "until they are evicted or the app restarts.")
+    on_disk = []
+    if extraction_cache.cache_dir:
+        on_disk.append("extracted resume text")
+    if response_cache.enabled:
+        on_disk.append(f"analyses for up to {response_cache.ttl_seconds / 86400:g} days")
+    if on_disk:
+        return notice + f" This deployment also stores {' and '.join(on_disk)} on disk."
+    return notice + " Nothing you upload is written to disk."
+
+
+# Function to confirm an extracted resume and preview its text
+def show_resume(resume, file_name, key):
+    st.success(f"Successfully extracted text from {file_name}")
+    with st.expander("Preview Extracted Text"):
+        headings = [heading for heading, _ in resume.sections if heading]
+        st.caption(f"About {resume.token_count:,} tokens" + (f" · Sections: {', '.join(headings)}" if headings else ""))
+        st.text_area("Extracted text", value=resume.text, key=key, height=300, label_visibility="collapsed")
+
+
+# Function to get a display payload built from an analysis result. It is built once per
+# result and kept in session state next to it, so reruns that show the same analysis
+# reuse it; a new analysis replaces it.
+def result_payload(results, name, build):
+    payloads = st.session_state.setdefault('result_payloads', {})
+    if name not in payloads or payloads[name][0] is not results:
+        payloads[name] = (results, build(results))
+    return payloads[name][1]
+
+
+# Function to group the recommended skills by priority, most important first
+def group_skills_by_priority(results):
+    skills_by_priority = {}
+    for priority in ["high", "medium", "low"]:
+        skills_by_priority[priority] = [skill for skill in results['skill_match']['recommended_skills']
+                                        if skill['priority'] == priority]
+    return skills_by_priority
+
+
+# Function to show the skill development graph and its legend
+@st.fragment
+def skill_graph_panel(results):
+    try:
+        graph_html, omitted = skill_graph_html(results['skill_match']['recommended_skills'])
+    except RuntimeError as e:
+        # The graph scripts are required to be vendored but aren't (see graph_assets)
+        st.error(f"Could not show the skill graph: {e}")
+        return
+    if omitted:
+        st.caption(f"{omitted} less important skills and prerequisites are left out of the graph; "
+                   "every recommended skill is listed in the Skills Explorer below.")
+    
+    # Create columns for chart and legend
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        # Render Cytoscape graph
+        components.html(graph_html, height=600)
+    
+    with col2:
+        # Create a custom legend with color explanations
+        st.markdown("### Priority Legend")
+        st.markdown(
+            """
+            <style>
+            .priority-box {
+                display: inline-block;
+                width: 15px;
+                height: 15px;
+                margin-right: 8px;
+                vertical-align: middle;
+                border-radius: 50%;
+            }
+            .priority-text {
+                vertical-align: middle;
+                font-size: 16px;
+            }
+            </style>
+            """, 
+            unsafe_allow_html=True
+        )
+        
+        priorities = [
+            {"name": "High Priority", "color": "#E63946", "description": "Learn these skills first"},
+            {"name": "Medium Priority", "color": "#F9C74F", "description": "Focus on these next"},
+            {"name": "Low Priority", "color": "#90BE6D", "description": "Nice to have skills"},
+            {"name": "Prerequisites", "color": "#43AA8B", "description": "Required foundation"}
+        ]
+        
+        for p in priorities:
+            st.markdown(
+                f"""
+                <div>
+                    <span class="priority-box" style="background-color: {p['color']};"></span>
+                    <span class="priority-text"><b>{p['name']}</b></span>
+                </div>
+                <div style="margin-left: 23px; margin-bottom: 10px; font-size: 14px;">{p['description']}</div>
+                """, 
+                unsafe_allow_html=True
+            )
+        
+        st.markdown("### How to use")
+        st.markdown(
+            """
+            - **Click** nodes to highlight them
+            - **Hover** over nodes for details
+            - **Drag** nodes to rearrange
+            - **Scroll** to zoom in/out
+            - Start with red nodes and work down
+            """
+        )
+
+
+# Function to show the recommended skills one by one, filtered by priority
+@st.fragment
+def skills_explorer(results):
+    st.subheader("Skills Explorer")
+    
+    skills_by_priority = result_payload(results, 'skills_by_priority', group_skills_by_priority)
+    selected_priorities = st.multiselect("Priority", list(skills_by_priority), default=list(skills_by_priority),
+                                         format_func=str.title, key="explorer_priorities")
+    filtered_skills = [skill for priority in selected_priorities for skill in skills_by_priority[priority]]
+    
+    # Display filtered skills in an expandable format
+    if filtered_skills:
+        for skill_data in filtered_skills:
+            priority_color = {
+                "high": "#E63946",
+                "medium": "#F9C74F", 
+                "low": "#90BE6D"
+            }.get(skill_data['priority'], "#43AA8B")
+            
+            with st.expander(f"📊 {skill_data['skill']} ({skill_data['priority'].title()} Priority)"):
+                col1, col2 = st.columns([1, 2])
+                
+                with col1:
+                    st.markdown(f"**Category:** {skill_data['category']}")
+                    st.markdown(f"**Est. Time:** {skill_data['estimated_time']}")
+                    
+                    if skill_data.get('prerequisites'):
+                        st.markdown("**Prerequisites:**")
+                        for prereq in skill_data['prerequisites']:
+                            st.markdown(f"- {prereq}")
+                
+                with col2:
+                    if skill_data.get('resources'):
+                        st.markdown("**Learning Resources:**")
+                        for i, resource in enumerate(skill_data['resources']):
+                            st.markdown(f"{i+1}. {resource}")
+                    
+                    # Add a progress tracking placeholder (in a real app, this could be interactive)
+                    st.progress(0)
+                    st.caption("Track your progress learning this skill")
+    else:
+        st.info("No skills match your selected priority filters.")
+
+
+# Function to show the resume analysis results. Each panel is a fragment, so a widget
+# inside one reruns only that panel, not the app or the inputs above it.
+@st.fragment
+def resume_results(results, company):
+    st.header("Analysis Results")
+    
+    # Overall match
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric("Match Percentage", f"{results['match_percentage']}%")
+    
+    with col2:
+        st.subheader("Summary")
+        st.write(results['summary'])
+    
+    # Tabs for detailed analysis
+    tab1, tab2, tab3 = st.tabs(["Skills Analysis", "Content Improvements", "Company Insights"])
+    
+    with tab1:
+        st.subheader("Your Matching Skills")
+        if results['skill_match']['matched_skills']:
+            st.success("These are the skills you already have that match the job requirements:")
+            for skill in results['skill_match']['matched_skills']:
+                st.markdown(f"✅ {skill}")
+        else:
+            st.warning("No matching skills found. Consider highlighting relevant skills from your experience.")
+        
+        st.subheader("Skills to Develop")
+        if results['skill_match']['missing_skills']:
+            st.error("These are the skills you need to develop for this role:")
+            for skill in results['skill_match']['missing_skills']:
+                st.markdown(f"⚠️ {skill}")
+        else:
+            st.success("Great! You have all the required skills for this role.")
+        
+        st.subheader("Recommended Skills Development Path")
+        if results['skill_match']['recommended_skills']:
+            skill_graph_panel(results)
+            skills_explorer(results)
+        else:
+            st.success("Your skill set is well-aligned with the role requirements.")
+    
+    with tab2:
+        st.subheader("Sections to Improve")
+        for section in results['content_improvements']['sections_to_improve']:
+            st.warning(section)
+        
+        st.subheader("Wording Suggestions")
+        for suggestion in results['content_improvements']['wording_suggestions']:
+            st.info(suggestion)
+        
+        st.subheader("Format Suggestions")
+        for suggestion in results['content_improvements']['format_suggestions']:
+            st.info(suggestion)
+    
+    with tab3:
+        if company:
+            st.subheader("Company-Specific Skills")
+            for skill in results['company_specific_insights']['company_specific_skills']:
+                st.success(skill)
+            
+            st.subheader("Recommended Projects")
+            for project in results['company_specific_insights']['company_projects']:
+                st.info(project)
+            
+            st.subheader("Networking Opportunities")
+            for opportunity in results['company_specific_insights']['networking_opportunities']:
+                st.info(opportunity)
+            
+            st.subheader("Company Resources")
+            for resource in results['company_specific_insights']['company_resources']:
+                st.info(resource)
+        else:
+            st.info("Enter a company name to get company-specific insights and recommendations.")
+
+
+# Function to show the career path analysis results
+@st.fragment
+def career_results(results):
+    st.header("Career Development Analysis")
+    
+    # Overall alignment
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric("Career Alignment", f"{results['career_alignment']['alignment_score']}%")
+    
+    with col2:
+        st.subheader("Summary")
+        st.write(results['summary'])
+    
+    # Tabs for detailed analysis
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "Career Alignment", 
+        # "Development Plan", 
+        "Skill Development", 
+        "Profile Optimization",
+        "Industry Insights"
+    ])
+    
+    with tab1:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Strengths")
+            for strength in results['career_alignment']['strengths']:
+                st.success(strength)
+        
+        with col2:
+            st.subheader("Gaps")
+            for gap in results['career_alignment']['gaps']:
+                st.error(gap)
+        
+        st.subheader("Networking Strategy")
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.write("**Key Connections**")
+            for connection in results['networking_strategy']['key_connections']:
+                st.info(connection)
+        
+        with col2:
+            st.write("**Communities**")
+            for community in results['networking_strategy']['communities']:
+                st.info(community)
+        
+        with col3:
+            st.write("**Engagement Tactics**")
+            for tactic in results['networking_strategy']['engagement_tactics']:
+                st.info(tactic)
+    
+    # with tab2:
+    #     col1, col2, col3 = st.columns(3)
+        
+    #     with col1:
+    #         st.subheader("Short-Term Actions (0-6 months)")
+    #         for action in results['development_plan']['short_term_actions']:
+    #             st.info(action)
+        
+    #     with col2:
+    #         st.subheader("Medium-Term Goals (6-18 months)")
+    #         for goal in results['development_plan']['medium_term_goals']:
+    #             st.success(goal)
+        
+    #     with col3:
+    #         st.subheader("Long-Term Milestones (18+ months)")
+    #         for milestone in results['development_plan']['long_term_milestones']:
+    #             st.success(milestone)
+    
+    with tab2:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Technical Skills")
+            for skill in results['skill_development']['technical_skills']:
+                with st.expander(f"{skill['skill']} (Priority: {skill['priority'].upper()})"):
+                    st.write(f"**Current Level:** {skill['current_level']}")
+                    st.write(f"**Gap Analysis:** {skill['gap_analysis']}")
+                    st.write("**Recommended Resources:**")
+                    for resource in skill['resources']:
+                        st.info(resource)
+        
+        with col2:
+            st.subheader("Soft Skills")
+            for skill in results['skill_development']['soft_skills']:
+                with st.expander(f"{skill['skill']} (Priority: {skill['priority'].upper()})"):
+                    st.write(f"**Current Level:** {skill['current_level']}")
+                    st.write(f"**Gap Analysis:** {skill['gap_analysis']}")
+                    st.write("**Development Approaches:**")
+                    for approach in skill['development_approaches']:
+                        st.info(approach)
+    
+    with tab3:
+        st.subheader("LinkedIn Profile Optimization")
+        
+        with st.expander("Headline Suggestions"):
+            for suggestion in results['profile_optimization']['headline_suggestions']:
+                st.info(suggestion)
+        
+        with st.expander("About Section Tips"):
+            for tip in results['profile_optimization']['about_section_tips']:
+                st.info(tip)
+        
+        with st.expander("Experience Highlighting"):
+            for tip in results['profile_optimization']['experience_highlighting']:
+                st.info(tip)
+    
+    with tab4:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.subheader("Industry Trends")
+            for trend in results['industry_insights']['trends']:
+                st.info(trend)
+        
+        with col2:
+            st.subheader("Valuable Certifications")
+            for cert in results['industry_insights']['certifications']:
+                st.success(cert)
+        
+        with col3:
+            st.subheader("Thought Leaders to Follow")
+            for leader in results['industry_insights']['thought_leaders']:
+                st.info(leader)
+
+
+# The Resume Analysis tab. A fragment, so typing in it reruns this tab only and leaves the
+# Career Path tab alone (and the other way round).
+@st.fragment
+def resume_analysis_tab():
 
     col1, col2 = st.columns(2)
 
@@ -60,386 +458,170 @@ with tabs[0]:
         
         if uploaded_file is not None:
             with st.spinner("Extracting text from your resume..."):
-                st.session_state.resume_text = extract_text_from_file(uploaded_file)
-                if st.session_state.resume_text:
-                    st.success(f"Successfully extracted text from {uploaded_file.name}")
-                    with st.expander("Preview Extracted Text"):
-                        st.text_area("", value=st.session_state.resume_text, key='resumeAnalysis', height=300)
+                live_preview = st.empty()
+                resume = load_resume(uploaded_file, on_page=page_preview(live_preview))
+                live_preview.empty()
+            if resume is not None:
+                show_resume(resume, uploaded_file.name, 'resumeAnalysis')
         else:
+            resume = None
             st.warning("Please upload your resume to proceed")
+
+        # The Career Path tab offers this resume too, so it is rerun when the resume changes.
+        # Resumes are compared by content key: the store may hand back a new object for the
+        # same content once the old one was evicted.
+        previous = st.session_state.resume
+        file_name = uploaded_file.name if resume is not None else ""
+        st.session_state.resume = resume
+        if (resume.key if resume is not None else None) != (previous.key if previous is not None else None) \
+                or file_name != st.session_state.resume_file_name:
+            st.session_state.resume_file_name = file_name
+            st.rerun()
         
     with col2:
         st.header("2. Enter Job Description")
-        st.session_state.company = st.text_input("Company Name", placeholder="Enter the company you're applying to")
-        st.session_state.job_description = st.text_area("Paste Job Description*", height=300, 
-                                                      placeholder="Enter the job description here...")
-        
-        if not st.session_state.job_description:
-            st.warning("Please enter a job description to proceed")
+        rank_mode = st.checkbox("Rank several job postings", key="rank_mode",
+                                help="Paste all the postings you saved, see at once which match your resume best, "
+                                     "and analyze only those in depth")
+        if not rank_mode:
+            st.session_state.company = st.text_input("Company Name", placeholder="Enter the company you're applying to",
+                                                     key="company_input", on_change=prefetch_company)
+        wait_for_company = not st.checkbox("Don't wait for company research",
+                                           help="Analyze right away and use company details only if they are already available")
+        split_sections = st.checkbox("Faster analysis", value=SPLIT_ANALYSIS,
+                                     help="Generate the sections of the analysis in parallel, using a smaller model for the simpler ones")
+        use_cache = not st.checkbox("Analyze from scratch", key="fresh_analysis",
+                                    help="Don't reuse an earlier analysis of the same or a nearly identical job "
+                                         "description, and don't keep any part of your last analysis")
+        if rank_mode:
+            postings = split_postings(st.text_area("Paste Job Descriptions*", height=300, key="postings_text",
+                                                   placeholder="Company: Acme\nData Engineer\n...\n---\n"
+                                                               "Company: Globex\nML Engineer\n..."))
+            st.caption("Separate the postings with a line of `---`. A line such as `Company: Acme` "
+                       "names the company of a posting.")
+            top_k = st.number_input("Best matches to analyze in depth", min_value=1, max_value=10, value=3)
+            if not postings:
+                st.warning("Please enter the job descriptions to proceed")
+        else:
+            postings = []
+            st.session_state.job_description = st.text_area("Paste Job Description*", height=300, 
+                                                          placeholder="Enter the job description here...")
             
+            if not st.session_state.job_description:
+                st.warning("Please enter a job description to proceed")
+            incremental = st.session_state.analysis_inputs is not None and st.checkbox(
+                "Update my last analysis", value=True, key="incremental",
+                help="After small edits, regenerate only the parts of the analysis they affect and keep the rest")
+
+    # Local ranking of the pasted postings; it takes milliseconds, so it follows every edit
+    if rank_mode and resume is not None and postings:
+        st.subheader("Posting Ranking")
+        ranking = rank_postings(resume.text, [posting.text for posting in postings])
+        st.dataframe([{
+            "Rank": rank,
+            "Posting": postings[index].title,
+            "Company": postings[index].company,
+            "Relevance": round(score, 1),
+            "Skill Match": f"{match_skills(resume.text, postings[index].text, resume.skills)['match_percentage']}%",
+            "Analyze": rank <= top_k,
+        } for rank, (index, score) in enumerate(ranking, 1)], hide_index=True, use_container_width=True)
+
+    # Instant, local skill check while the inputs are being filled in
+    if not rank_mode and resume is not None and st.session_state.job_description:
+        quick_match = match_skills(resume.text, st.session_state.job_description, resume.skills)
+        if quick_match["matched_skills"] or quick_match["missing_skills"]:
+            st.subheader("Quick Skill Check")
+            col1, col2, col3 = st.columns([1, 2, 2])
+            col1.metric("Skill Match", f"{quick_match['match_percentage']}%")
+            col2.markdown("**✅ Matched:** " + (", ".join(quick_match["matched_skills"]) or "none"))
+            col3.markdown("**❌ Missing:** " + (", ".join(quick_match["missing_skills"]) or "none"))
+
 
     # Analyze button
+    job_entered = bool(postings) if rank_mode else bool(st.session_state.job_description)
     if st.button("Analyze", key="analyze_button", use_container_width=True, 
-                disabled=not (st.session_state.resume_text and st.session_state.job_description and st.session_state.api_key)):
+                disabled=not (resume and job_entered and st.session_state.api_key)):
         if not st.session_state.api_key:
             st.error("Please enter your OpenAI API key in the sidebar.")
-        elif not st.session_state.resume_text:
+        elif not resume:
             st.error("Please upload your resume.")
-        elif not st.session_state.job_description:
+        elif not job_entered:
             st.error("Please enter a job description.")
+        elif rank_mode:
+            count = min(top_k, len(postings))
+            with st.spinner(f"Analyzing your resume against the {count} best matching postings..."):
+                progress = st.progress(0.0)
+                finished = []
+
+                def show_progress(index, results):
+                    finished.append(index)
+                    progress.progress(len(finished) / count, text=f"Finished: {postings[index].title}")
+
+                analyses = analyze_top_postings(resume.text, postings, st.session_state.api_key, top_k=count,
+                                                on_result=show_progress, wait_for_company=wait_for_company,
+                                                split_sections=split_sections, use_cache=use_cache)
+                progress.empty()
+                st.session_state.posting_analyses = [(postings[index], score, results)
+                                                     for index, score, results in analyses if results]
         else:
+            inputs = AnalysisInputs(resume.text, st.session_state.job_description, st.session_state.company)
             with st.spinner("Analyzing your resume against the job description..."):
-                st.session_state.analysis_results = analyze_resume_with_openai(
-                    st.session_state.resume_text, 
-                    st.session_state.job_description,
-                    st.session_state.company,
-                    st.session_state.api_key
-                )
-
-    # Display analysis results
-    if st.session_state.analysis_results:
-        results = st.session_state.analysis_results
-        
-        st.header("Analysis Results")
-        
-        # Overall match
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            st.metric("Match Percentage", f"{results['match_percentage']}%")
-        
-        with col2:
-            st.subheader("Summary")
-            st.write(results['summary'])
-        
-        # Tabs for detailed analysis
-        tab1, tab2, tab3 = st.tabs(["Skills Analysis", "Content Improvements", "Company Insights"])
-        
-        with tab1:
-            st.subheader("Your Matching Skills")
-            if results['skill_match']['matched_skills']:
-                st.success("These are the skills you already have that match the job requirements:")
-                for skill in results['skill_match']['matched_skills']:
-                    st.markdown(f"✅ {skill}")
-            else:
-                st.warning("No matching skills found. Consider highlighting relevant skills from your experience.")
-            
-            st.subheader("Skills to Develop")
-            if results['skill_match']['missing_skills']:
-                st.error("These are the skills you need to develop for this role:")
-                for skill in results['skill_match']['missing_skills']:
-                    st.markdown(f"⚠️ {skill}")
-            else:
-                st.success("Great! You have all the required skills for this role.")
-            
-            st.subheader("Recommended Skills Development Path")
-            if results['skill_match']['recommended_skills']:
-                # Prepare data for Cytoscape
-                cyto_nodes = []
-                cyto_edges = []
-                prereq_map = {}  # To track existing prerequisites
-                
-                # Add root node
-                cyto_nodes.append({
-                    'data': {
-                        'id': 'desired-job',
-                        'label': 'Desired Job',
-                        'type': 'root',
-                        'info': ''
-                    }
+                live_results = st.empty()
+                on_section = section_preview(live_results, {
+                    "skill_match": "Skills Analysis",
+                    "company_specific_insights": "Company Insights",
                 })
-                
-                # Group skills by priority
-                priority_groups = {
-                    'high': [],
-                    'medium': [],
-                    'low': []
-                }
-                
-                for skill_data in results['skill_match']['recommended_skills']:
-                    priority_groups[skill_data['priority']].append(skill_data)
-                
-                # First pass: Add all main skill nodes
-                skill_nodes = {}  # Track skill nodes by their labels
-                for priority in ['high', 'medium', 'low']:
-                    skills = priority_groups[priority]
-                    if skills:
-                        for skill_data in skills:
-                            skill_id = f"skill-{len(cyto_nodes)}"
-                            skill = skill_data['skill']
-                            
-                            # Add skill node
-                            cyto_nodes.append({
-                                'data': {
-                                    'id': skill_id,
-                                    'label': skill,
-                                    'type': priority,
-                                    'info': f"Priority: {priority.title()}\nCategory: {skill_data['category']}\nEst. Time: {skill_data['estimated_time']}"
-                                }
-                            })
-                            
-                            # Connect to root
-                            cyto_edges.append({
-                                'data': {
-                                    'source': 'desired-job',
-                                    'target': skill_id
-                                }
-                            })
-                            
-                            skill_nodes[skill] = skill_id
-                
-                # Second pass: Add prerequisites and connect them
-                for priority in ['high', 'medium', 'low']:
-                    skills = priority_groups[priority]
-                    if skills:
-                        for skill_data in skills:
-                            skill_id = skill_nodes[skill_data['skill']]
-                            
-                            # Add prerequisites if any
-                            if skill_data.get('prerequisites'):
-                                for prereq in skill_data['prerequisites']:
-                                    # Check if this prerequisite already exists
-                                    if prereq not in prereq_map:
-                                        prereq_id = f"prereq-{len(cyto_nodes)}"
-                                        prereq_map[prereq] = prereq_id
-                                        
-                                        # Add new prerequisite node
-                                        cyto_nodes.append({
-                                            'data': {
-                                                'id': prereq_id,
-                                                'label': prereq,
-                                                'type': 'prerequisite',
-                                                'info': f"Prerequisite for multiple skills"
-                                            }
-                                        })
-                                    else:
-                                        prereq_id = prereq_map[prereq]
-                                    
-                                    # Connect prerequisite to skill
-                                    cyto_edges.append({
-                                        'data': {
-                                            'source': skill_id,
-                                            'target': prereq_id
-                                        }
-                                    })
-                
-                # Define Cytoscape styles
-                cyto_styles = [
-                    {
-                        'selector': 'node',
-                        'style': {
-                            'label': 'data(label)',
-                            'text-valign': 'center',
-                            'text-halign': 'center',
-                            'font-size': '12px',
-                            'width': '30px',
-                            'height': '30px',
-                            'padding': '5px'
-                        }
-                    },
-                    {
-                        'selector': 'edge',
-                        'style': {
-                            'width': 2,
-                            'curve-style': 'bezier',
-                            'target-arrow-shape': 'triangle',
-                            'line-color': '#888',
-                            'target-arrow-color': '#888',
-                            'opacity': 0.8
-                        }
-                    },
-                    {
-                        'selector': 'node[type="root"]',
-                        'style': {
-                            'background-color': '#6E7C7C',
-                            'font-weight': 'bold',
-                            'font-size': '16px'
-                        }
-                    },
-                    {
-                        'selector': 'node[type="high"]',
-                        'style': {
-                            'background-color': '#E63946',
-                        }
-                    },
-                    {
-                        'selector': 'node[type="medium"]',
-                        'style': {
-                            'background-color': '#F9C74F'
-                        }
-                    },
-                    {
-                        'selector': 'node[type="low"]',
-                        'style': {
-                            'background-color': '#90BE6D'
-                        }
-                    },
-                    {
-                        'selector': 'node[type="prerequisite"]',
-                        'style': {
-                            'background-color': '#43AA8B',
-                            'font-size': '12px',
-                        }
-                    },
-                    {
-                        'selector': '.highlighted',
-                        'style': {
-                            'border-width': '3px',
-                            'border-color': '#000',
-                            'border-opacity': 1,
-                            'z-index': 999
-                        }
-                    },
-                    {
-                        'selector': '.hover',
-                        'style': {
-                            'border-width': '2px',
-                            'border-color': '#fff',
-                            'border-opacity': 1,
-                            'z-index': 999
-                        }
-                    }
-                ]
-                
-                # Create columns for chart and legend
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    # Render Cytoscape graph
-                    components.html(
-                        create_cytoscape_html(cyto_nodes, cyto_edges, cyto_styles),
-                        height=600,
+                if incremental and use_cache and st.session_state.analysis_results:
+                    results, refreshed = reanalyze_resume_with_openai(
+                        st.session_state.analysis_inputs,
+                        st.session_state.analysis_results,
+                        *inputs,
+                        st.session_state.api_key,
+                        stream=True,
+                        on_section=on_section,
+                        wait_for_company=wait_for_company,
+                        split_sections=split_sections,
+                        use_cache=use_cache,
                     )
-                
-                with col2:
-                    # Create a custom legend with color explanations
-                    st.markdown("### Priority Legend")
-                    st.markdown(
-                        """
-                        <style>
-                        .priority-box {
-                            display: inline-block;
-                            width: 15px;
-                            height: 15px;
-                            margin-right: 8px;
-                            vertical-align: middle;
-                            border-radius: 50%;
-                        }
-                        .priority-text {
-                            vertical-align: middle;
-                            font-size: 16px;
-                        }
-                        </style>
-                        """, 
-                        unsafe_allow_html=True
-                    )
-                    
-                    priorities = [
-                        {"name": "High Priority", "color": "#E63946", "description": "Learn these skills first"},
-                        {"name": "Medium Priority", "color": "#F9C74F", "description": "Focus on these next"},
-                        {"name": "Low Priority", "color": "#90BE6D", "description": "Nice to have skills"},
-                        {"name": "Prerequisites", "color": "#43AA8B", "description": "Required foundation"}
-                    ]
-                    
-                    for p in priorities:
-                        st.markdown(
-                            f"""
-                            <div>
-                                <span class="priority-box" style="background-color: {p['color']};"></span>
-                                <span class="priority-text"><b>{p['name']}</b></span>
-                            </div>
-                            <div style="margin-left: 23px; margin-bottom: 10px; font-size: 14px;">{p['description']}</div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
-                    
-                    st.markdown("### How to use")
-                    st.markdown(
-                        """
-                        - **Click** nodes to highlight them
-                        - **Hover** over nodes for details
-                        - **Drag** nodes to rearrange
-                        - **Scroll** to zoom in/out
-                        - Start with red nodes and work down
-                        """
-                    )
-                
-                # Interactive Skills Explorer
-                st.subheader("Skills Explorer")
-                
-                filtered_skills = [
-                    skill for skill in results['skill_match']['recommended_skills'] 
-                ]
-                
-                # Display filtered skills in an expandable format
-                if filtered_skills:
-                    for skill_data in filtered_skills:
-                        priority_color = {
-                            "high": "#E63946",
-                            "medium": "#F9C74F", 
-                            "low": "#90BE6D"
-                        }.get(skill_data['priority'], "#43AA8B")
-                        
-                        with st.expander(f"📊 {skill_data['skill']} ({skill_data['priority'].title()} Priority)"):
-                            col1, col2 = st.columns([1, 2])
-                            
-                            with col1:
-                                st.markdown(f"**Category:** {skill_data['category']}")
-                                st.markdown(f"**Est. Time:** {skill_data['estimated_time']}")
-                                
-                                if skill_data.get('prerequisites'):
-                                    st.markdown("**Prerequisites:**")
-                                    for prereq in skill_data['prerequisites']:
-                                        st.markdown(f"- {prereq}")
-                            
-                            with col2:
-                                if skill_data.get('resources'):
-                                    st.markdown("**Learning Resources:**")
-                                    for i, resource in enumerate(skill_data['resources']):
-                                        st.markdown(f"{i+1}. {resource}")
-                                
-                                # Add a progress tracking placeholder (in a real app, this could be interactive)
-                                st.progress(0)
-                                st.caption("Track your progress learning this skill")
                 else:
-                    st.info("No skills match your selected priority filters.")
+                    results, refreshed = analyze_resume_with_openai(
+                        *inputs,
+                        st.session_state.api_key,
+                        stream=True,
+                        on_section=on_section,
+                        wait_for_company=wait_for_company,
+                        use_cache=use_cache,
+                        split_sections=split_sections,
+                    ), None
+                live_results.empty()
+            st.session_state.analysis_results = results
+            st.session_state.analysis_inputs = inputs if results else None
+            st.session_state.analysis_refreshed = refreshed
 
+    # Display analysis results
+    if rank_mode and st.session_state.posting_analyses:
+        analyses = st.session_state.posting_analyses
+        choice = st.selectbox("Show the analysis of", range(len(analyses)), key="shown_posting",
+                              format_func=lambda i: f"{i + 1}. {analyses[i][0].title}"
+                                                    + (f" ({analyses[i][0].company})" if analyses[i][0].company else ""))
+        posting, _, results = analyses[min(choice, len(analyses) - 1)]
+        resume_results(results, posting.company)
+    elif not rank_mode and st.session_state.analysis_results:
+        refreshed = st.session_state.analysis_refreshed
+        if refreshed is not None:
+            updated = [name for key, name in SECTION_NAMES.items() if key in refreshed and key != "match_percentage"]
+            kept = [name for key, name in SECTION_NAMES.items() if key not in refreshed and key != "match_percentage"]
+            if updated:
+                st.info(f"🔄 Updated for your edits: {', '.join(updated)}. "
+                        f"Kept from your last analysis: {', '.join(kept) or 'nothing'}.")
             else:
-                st.success("Your skill set is well-aligned with the role requirements.")
-        
-        with tab2:
-            st.subheader("Sections to Improve")
-            for section in results['content_improvements']['sections_to_improve']:
-                st.warning(section)
-            
-            st.subheader("Wording Suggestions")
-            for suggestion in results['content_improvements']['wording_suggestions']:
-                st.info(suggestion)
-            
-            st.subheader("Format Suggestions")
-            for suggestion in results['content_improvements']['format_suggestions']:
-                st.info(suggestion)
-        
-        with tab3:
-            if st.session_state.company:
-                st.subheader("Company-Specific Skills")
-                for skill in results['company_specific_insights']['company_specific_skills']:
-                    st.success(skill)
-                
-                st.subheader("Recommended Projects")
-                for project in results['company_specific_insights']['company_projects']:
-                    st.info(project)
-                
-                st.subheader("Networking Opportunities")
-                for opportunity in results['company_specific_insights']['networking_opportunities']:
-                    st.info(opportunity)
-                
-                st.subheader("Company Resources")
-                for resource in results['company_specific_insights']['company_resources']:
-                    st.info(resource)
-            else:
-                st.info("Enter a company name to get company-specific insights and recommendations.")
+                st.info("🔄 Your edits don't change anything the analysis depends on, so your last analysis was kept.")
+        resume_results(st.session_state.analysis_results, st.session_state.company)
 
-with tabs[1]:
+
+# The Career Path Analysis tab
+@st.fragment
+def career_path_tab():
     st.header("Career Path Analysis")
     st.write("Get personalized career development advice based on your LinkedIn profile, resume, and desired career path")
     
@@ -447,17 +629,26 @@ with tabs[1]:
     
     with col1:
         st.subheader("1. Upload Your Resume")
-        uploaded_file = st.file_uploader("Upload your resume (PDF, DOCX, or TXT)*", type=["pdf", "docx", "txt"], key="linkedin_resume")
-        
-        if uploaded_file is not None:
-            with st.spinner("Extracting text from your resume..."):
-                resume_text = extract_text_from_file(uploaded_file)
-                if resume_text:
-                    st.success(f"Successfully extracted text from {uploaded_file.name}")
-                    with st.expander("Preview Extracted Text"):
-                        st.text_area("", value=resume_text, height=300)
+        shared_resume = st.session_state.resume
+        if shared_resume is not None and st.checkbox(f"Use the resume uploaded for Resume Analysis "
+                                                     f"({st.session_state.resume_file_name})",
+                                                     value=True, key="reuse_resume"):
+            resume = shared_resume
+            file_name = st.session_state.resume_file_name
         else:
-            st.warning("Please upload your resume to proceed")
+            uploaded_file = st.file_uploader("Upload your resume (PDF, DOCX, or TXT)*", type=["pdf", "docx", "txt"], key="linkedin_resume")
+            if uploaded_file is not None:
+                with st.spinner("Extracting text from your resume..."):
+                    live_preview = st.empty()
+                    resume = load_resume(uploaded_file, on_page=page_preview(live_preview))
+                    live_preview.empty()
+                file_name = uploaded_file.name
+            else:
+                resume = None
+                st.warning("Please upload your resume to proceed")
+        if resume is not None:
+            show_resume(resume, file_name, 'careerPathResume')
+        resume_text = resume.text if resume is not None else ""
     
     with col2:
         st.subheader("2. Enter Career Details")
@@ -514,159 +705,70 @@ with tabs[1]:
             st.error("Please upload your resume.")
         else:
             with st.spinner("Analyzing your LinkedIn profile, resume, and career path..."):
+                live_results = st.empty()
                 st.session_state.linkedin_analysis = analyze_linkedin_profile(
                     st.session_state.linkedin_url,
                     st.session_state.career_path,
                     st.session_state.country,
                     st.session_state.industry,
                     resume_text,
-                    st.session_state.api_key
+                    st.session_state.api_key,
+                    stream=True,
+                    on_section=section_preview(live_results, {}),
                 )
+                live_results.empty()
     
     # Display LinkedIn analysis results
     if st.session_state.linkedin_analysis:
-        results = st.session_state.linkedin_analysis
-        
-        st.header("Career Development Analysis")
-        
-        # Overall alignment
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            st.metric("Career Alignment", f"{results['career_alignment']['alignment_score']}%")
-        
-        with col2:
-            st.subheader("Summary")
-            st.write(results['summary'])
-        
-        # Tabs for detailed analysis
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "Career Alignment", 
-            # "Development Plan", 
-            "Skill Development", 
-            "Profile Optimization",
-            "Industry Insights"
-        ])
-        
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("Strengths")
-                for strength in results['career_alignment']['strengths']:
-                    st.success(strength)
-            
-            with col2:
-                st.subheader("Gaps")
-                for gap in results['career_alignment']['gaps']:
-                    st.error(gap)
-            
-            st.subheader("Networking Strategy")
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.write("**Key Connections**")
-                for connection in results['networking_strategy']['key_connections']:
-                    st.info(connection)
-            
-            with col2:
-                st.write("**Communities**")
-                for community in results['networking_strategy']['communities']:
-                    st.info(community)
-            
-            with col3:
-                st.write("**Engagement Tactics**")
-                for tactic in results['networking_strategy']['engagement_tactics']:
-                    st.info(tactic)
-        
-        # with tab2:
-        #     col1, col2, col3 = st.columns(3)
-            
-        #     with col1:
-        #         st.subheader("Short-Term Actions (0-6 months)")
-        #         for action in results['development_plan']['short_term_actions']:
-        #             st.info(action)
-            
-        #     with col2:
-        #         st.subheader("Medium-Term Goals (6-18 months)")
-        #         for goal in results['development_plan']['medium_term_goals']:
-        #             st.success(goal)
-            
-        #     with col3:
-        #         st.subheader("Long-Term Milestones (18+ months)")
-        #         for milestone in results['development_plan']['long_term_milestones']:
-        #             st.success(milestone)
-        
-        with tab2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("Technical Skills")
-                for skill in results['skill_development']['technical_skills']:
-                    with st.expander(f"{skill['skill']} (Priority: {skill['priority'].upper()})"):
-                        st.write(f"**Current Level:** {skill['current_level']}")
-                        st.write(f"**Gap Analysis:** {skill['gap_analysis']}")
-                        st.write("**Recommended Resources:**")
-                        for resource in skill['resources']:
-                            st.info(resource)
-            
-            with col2:
-                st.subheader("Soft Skills")
-                for skill in results['skill_development']['soft_skills']:
-                    with st.expander(f"{skill['skill']} (Priority: {skill['priority'].upper()})"):
-                        st.write(f"**Current Level:** {skill['current_level']}")
-                        st.write(f"**Gap Analysis:** {skill['gap_analysis']}")
-                        st.write("**Development Approaches:**")
-                        for approach in skill['development_approaches']:
-                            st.info(approach)
-        
-        with tab3:
-            st.subheader("LinkedIn Profile Optimization")
-            
-            with st.expander("Headline Suggestions"):
-                for suggestion in results['profile_optimization']['headline_suggestions']:
-                    st.info(suggestion)
-            
-            with st.expander("About Section Tips"):
-                for tip in results['profile_optimization']['about_section_tips']:
-                    st.info(tip)
-            
-            with st.expander("Experience Highlighting"):
-                for tip in results['profile_optimization']['experience_highlighting']:
-                    st.info(tip)
-        
-        with tab4:
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.subheader("Industry Trends")
-                for trend in results['industry_insights']['trends']:
-                    st.info(trend)
-            
-            with col2:
-                st.subheader("Valuable Certifications")
-                for cert in results['industry_insights']['certifications']:
-                    st.success(cert)
-            
-            with col3:
-                st.subheader("Thought Leaders to Follow")
-                for leader in results['industry_insights']['thought_leaders']:
-                    st.info(leader)
+        career_results(st.session_state.linkedin_analysis)
+
+
+# Main app interface
+st.title("NextCV - Career Optimization Tool")
+st.header("AI-Powered Resume and Career Path Analysis")
+st.write("Optimize your resume for your job application and identify skill gaps with AI-powered analysis")
+
+tabs = st.tabs(["Resume Analysis", "Career Path Analysis"])
+
+with tabs[0]:
+    resume_analysis_tab()
+
+with tabs[1]:
+    career_path_tab()
 
 # OpenAI API Key in sidebar
 # st.sidebar.header("Settings")
 # st.session_state.api_key = st.sidebar.text_input("Enter your OpenAI API Key", type="password")
 st.session_state.api_key = st.secrets["OPENAI_API_KEY"]
 
+# Look up the most common employers once per server process
+@st.cache_resource
+def warm_popular_companies(api_key):
+    path = os.environ.get("NEXTCV_POPULAR_COMPANIES_FILE")
+    if path:
+        warm_company_cache(read_company_list(path), api_key)
+    return True
+
+warm_popular_companies(st.session_state.api_key)
+
+# Start the PDF extraction workers once per server process, so large uploads don't wait for them
+@st.cache_resource
+def warm_pdf_workers():
+    warm_pool()
+    return True
+
+warm_pdf_workers()
+
 # About section in sidebar
 st.sidebar.header("About")
-st.sidebar.info("""
+st.sidebar.info(f"""
 This application uses AI to help you optimize your career prospects in two ways:
 
 1. **Resume Analysis**: Upload your resume and a job description to get tailored recommendations for ATS optimization and skills improvement.
 
 2. **Career Path Analysis**: Input your LinkedIn profile and desired career path to receive personalized career development guidance.
 
-Your data is processed securely and is not stored after the session ends.
+{storage_notice()}
 """)
 
 # App footer
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from helper import extract_text_from_file
+from job_ranking import rank_postings
+from llm_functions import analyze_resume_with_openai, near_duplicate_stats, rate_limit_stats
+from openai_client import get_client, set_client
+import tracing
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+# Function to load job descriptions from a directory. A .txt file is a job description on its
+# own; a .json file holds {"job_description": ..., "company": ...}. The file name is the job id.
+def load_jobs(jobs_dir):
+    jobs = {}
+    for name in sorted(os.listdir(jobs_dir)):
+        job_id, extension = os.path.splitext(name)
+        path = os.path.join(jobs_dir, name)
+        if extension == ".txt":
+            with open(path, encoding="utf-8") as f:
+                jobs[job_id] = {"job_description": f.read(), "company": ""}
+        elif extension == ".json":
+            with open(path, encoding="utf-8") as f:
+                job = json.load(f)
+            jobs[job_id] = {"job_description": job["job_description"], "company": job.get("company", "")}
+    return jobs
+
+
+# Function to extract the text of every resume in a directory, keyed by file name
+def load_resumes(resumes_dir):
+    resumes = {}
+    for name in sorted(os.listdir(resumes_dir)):
+        if os.path.splitext(name)[1].lower() in RESUME_EXTENSIONS:
+            with open(os.path.join(resumes_dir, name), "rb") as f:
+                text = extract_text_from_file(f)
+            if text:
+                resumes[name] = text
+            else:
+                print(f"Skipping {name}: no text could be extracted", file=sys.stderr)
+    return resumes
+
+
+# Function to read the (resume, job) pairs already analyzed successfully in a previous run
+def load_checkpoint(output_path):
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut off by an interrupted run; that pair is simply analyzed again
+                continue
+            if record.get("result") is not None:
+                done.add((record["resume"], record["job"]))
+    return done
+
+
+# Function to check whether a file ends without a newline, i.e. in the middle of a record
+def _ends_mid_line(path):
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+# Function to pick the top_k jobs per resume by local BM25 ranking, or every job without top_k
+def select_pairs(resumes, jobs, top_k=None):
+    if not top_k:
+        return [(resume, job) for resume in resumes for job in jobs]
+    job_ids = list(jobs)
+    descriptions = [jobs[job]["job_description"] for job in job_ids]
+    return [(resume, job_ids[index]) for resume in resumes
+            for index, _ in rank_postings(resumes[resume], descriptions, top_k)]
+
+
+# Runs the (resume, job) grid with at most `concurrency` analyses in flight, appending one
+# JSONL record per finished pair so an interrupted run picks up where it stopped. With
+# top_k, each resume is analyzed only against its top_k best matching jobs.
+async def run_batch(resumes, jobs, output_path, api_key, concurrency, split_sections=False, top_k=None):
+    done = load_checkpoint(output_path)
+    pairs = [pair for pair in select_pairs(resumes, jobs, top_k) if pair not in done]
+    scope = f", best {top_k} jobs per resume" if top_k else ""
+    print(f"{len(resumes)} resumes x {len(jobs)} jobs{scope}: {len(done)} already done, {len(pairs)} to run")
+
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        # A record cut off by an interrupted run is ended first, so the next one doesn't run into it
+        if _ends_mid_line(output_path):
+            output.write("\n")
+
+        async def analyze(resume, job_id):
+            nonlocal failures
+            job = jobs[job_id]
+            async with semaphore:
+                pair_started = time.perf_counter()
+                result = await asyncio.to_thread(
+                    analyze_resume_with_openai,
+                    resumes[resume], job["job_description"], job["company"], api_key,
+                    split_sections=split_sections,
+                )
+                elapsed = time.perf_counter() - pair_started
+
+            latencies.append(elapsed)
+            if result is None:
+                failures += 1
+            record = {"resume": resume, "job": job_id, "elapsed": round(elapsed, 3), "result": result}
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+            finished = len(latencies)
+            if finished % 10 == 0 or finished == len(pairs):
+                rate = finished / (time.perf_counter() - started)
+                print(f"[{finished}/{len(pairs)}] {rate * 60:.1f} analyses/min, {failures} failed")
+
+        await asyncio.gather(*(analyze(resume, job) for resume, job in pairs))
+
+    total = time.perf_counter() - started
+    if latencies:
+        print(
+            f"Finished {len(latencies)} analyses in {total:.1f}s "
+            f"({len(latencies) / total * 60:.1f}/min), {failures} failed, "
+            f"latency p50 {statistics.median(latencies):.2f}s max {max(latencies):.2f}s"
+        )
+    for model, stats in rate_limit_stats().items():
+        print(
+            f"{model}: {stats['requests']} requests, peak queue {stats['max_queue_depth']}, "
+            f"wait mean {stats['mean_wait_seconds']:.2f}s max {stats['max_wait_seconds']:.2f}s, "
+            f"{stats['throttled']} throttled"
+        )
+    near_duplicates = near_duplicate_stats()
+    if near_duplicates["hits"]:
+        print(f"{near_duplicates['hits']} analyses reused from near-duplicate job descriptions "
+              f"(mean similarity {near_duplicates['mean_hit_similarity']:.2f})")
+    if tracing.enabled:
+        print(tracing.summary_table())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze every resume against every job description")
+    parser.add_argument("--resumes", required=True, help="directory of PDF, DOCX or TXT resumes")
+    parser.add_argument("--jobs", required=True, help="directory of .txt or .json job descriptions")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=8, help="analyses in flight at once")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"))
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint, e.g. a local mock server")
+    parser.add_argument("--split-sections", action="store_true",
+                        help="generate each analysis as concurrent section prompts")
+    parser.add_argument("--top-k", type=int,
+                        help="analyze each resume only against the K jobs that match it best by local ranking")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or OPENAI_API_KEY)")
+    if args.base_url:
+        set_client(get_client(args.api_key, args.base_url))
+
+    resumes = load_resumes(args.resumes)
+    jobs = load_jobs(args.jobs)
+    asyncio.run(run_batch(resumes, jobs, args.output, args.api_key, args.concurrency,
+                          args.split_sections, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
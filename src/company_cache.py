@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Trailing words that don't distinguish one employer from another
+_LEGAL_SUFFIXES = {
+    "ag", "bv", "co", "company", "corp", "corporation", "gmbh", "inc", "incorporated",
+    "limited", "llc", "llp", "lp", "ltd", "nv", "plc", "pte", "pty", "sa",
+}
+
+
+# Function to map the ways users type a company to one cache key:
+# "Google", "google " and "Google LLC" all become "google"
+def normalize_company_name(name):
+    words = re.findall(r"[\w&]+", name.casefold())
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+# Function to read a list of companies to pre-warm, one per line; blank lines and # comments are skipped
+def read_company_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+# Process-wide cache of company summaries keyed by normalized name. Entries expire after
+# ttl_seconds, the least recently used ones are dropped past max_entries, and the whole
+# cache is written to a JSON file so it survives restarts.
+class CompanyCache:
+    def __init__(self, path=None, ttl_seconds=30 * 24 * 3600, max_entries=1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, company):
+        key = normalize_company_name(company)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["fetched_at"] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["summary"]
+
+    def put(self, company, summary):
+        key = normalize_company_name(company)
+        with self._lock:
+            self._entries[key] = {"name": company.strip(), "summary": summary, "fetched_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["fetched_at"]):
+            if now - entry["fetched_at"] <= self.ttl_seconds:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Persistence is best effort; the in-memory entry is still served
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+# Bounded LRU cache of extracted resume text, keyed by a hash of the uploaded bytes.
+# Entries live in memory and, when a cache directory is given, are also written to disk
+# so they survive process restarts.
+class ExtractionCache:
+    def __init__(self, max_entries=64, cache_dir=None, max_disk_entries=1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # The file extension and extractor version are part of the key: the same bytes
+    # uploaded as .txt and .pdf are parsed differently, and a rule change invalidates old text
+    @staticmethod
+    def make_key(data, file_name, version):
+        digest = hashlib.sha256()
+        digest.update(f"{version}:{os.path.splitext(file_name)[1].lower()}:".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        text = self._read_from_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+        self._write_to_disk(key, text)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _remember(self, key, text):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def _read_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            # Touch the file so disk eviction follows recency of use, not of creation
+            os.utime(path)
+            return text
+        except OSError:
+            return None
+
+    def _write_to_disk(self, key, text):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError:
+            # The disk layer is best effort; the in-memory entry is still usable
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _evict_disk(self):
+        files = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".txt")
+        ]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
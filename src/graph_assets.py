@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# The pinned scripts the skill graph needs. They are vendored under static/vendor, next to
+# app.py, by running `python src/graph_assets.py fetch` wherever the CDNs are reachable;
+# the fetch records each file's SHA-256 in the manifest and every later use checks it.
+ASSETS = {
+    "cytoscape": ("cytoscape.min.js", "https://cdnjs.cloudflare.com/ajax/libs/cytoscape/3.21.1/cytoscape.min.js"),
+    "dagre": ("dagre.min.js", "https://unpkg.com/dagre@0.8.5/dist/dagre.min.js"),
+    "cytoscape-dagre": ("cytoscape-dagre.js", "https://unpkg.com/cytoscape-dagre@2.5.0/cytoscape-dagre.js"),
+}
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "vendor")
+MANIFEST_PATH = os.path.join(VENDOR_DIR, "manifest.json")
+
+# How the graph page loads its scripts: "static" (Streamlit static files, cached by the
+# browser), "inline" (embedded in the page), "cdn" (the original public URLs) or "auto",
+# which uses static files when they are served, inline scripts when they are only on disk,
+# and the CDN when nothing is vendored. "static" and "inline" never fall back to the CDN.
+ASSET_MODE = os.environ.get("NEXTCV_GRAPH_ASSETS", "auto")
+MODES = ("auto", "static", "inline", "cdn")
+
+_verified = {}
+_inline = {}
+_lock = threading.Lock()
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Function to check that an asset is vendored and unchanged since it was fetched. The result
+# is remembered for the life of the process.
+def is_vendored(name):
+    with _lock:
+        if name not in _verified:
+            file_name, url = ASSETS[name]
+            path = os.path.join(VENDOR_DIR, file_name)
+            entry = _read_manifest().get(name, {})
+            _verified[name] = (
+                os.path.exists(path) and entry.get("url") == url and entry.get("sha256") == _sha256(path)
+            )
+            if not _verified[name]:
+                logger.warning("%s %s", file_name, "does not match the manifest" if os.path.exists(path)
+                               else "is not vendored")
+        return _verified[name]
+
+
+# Function to get the URL Streamlit serves static/vendor under when
+# server.enableStaticServing is on, below the app's server.baseUrlPath
+def static_url():
+    base = (_option("server.baseUrlPath") or "").strip("/")
+    return f"/{base}/app/static/vendor/" if base else "/app/static/vendor/"
+
+
+# Function to build the <script> tags for the given assets in the configured mode. In
+# "auto" mode assets that aren't vendored come from the CDN; in "static" and "inline" mode
+# they raise a RuntimeError instead, since those are set where the CDN must not be used.
+def script_tags(names, mode=None):
+    mode = mode or ASSET_MODE
+    if mode not in MODES:
+        raise RuntimeError(f"Unknown NEXTCV_GRAPH_ASSETS mode {mode!r}; use one of {', '.join(MODES)}")
+    if mode in ("static", "inline"):
+        missing = [ASSETS[name][0] for name in names if not is_vendored(name)]
+        if missing:
+            raise RuntimeError(
+                f"NEXTCV_GRAPH_ASSETS is {mode!r} but {', '.join(missing)} {'is' if len(missing) == 1 else 'are'} "
+                f"missing from {VENDOR_DIR} or {'does' if len(missing) == 1 else 'do'} not match its manifest. Run `python src/graph_assets.py fetch` where the CDNs are reachable, "
+                "or set NEXTCV_GRAPH_ASSETS=auto to load the graph scripts from the CDN."
+            )
+    elif mode == "auto":
+        mode = "static" if _option("server.enableStaticServing") else "inline"
+    tags = []
+    for name in names:
+        file_name, url = ASSETS[name]
+        if mode == "cdn" or not is_vendored(name):
+            tags.append(f'<script src="{url}"></script>')
+        elif mode == "static":
+            tags.append(f'<script src="{static_url()}{file_name}"></script>')
+        else:
+            tags.append(f"<script>{_inline_source(name)}</script>")
+    return "\n".join(tags)
+
+
+def _inline_source(name):
+    with _lock:
+        if name not in _inline:
+            with open(os.path.join(VENDOR_DIR, ASSETS[name][0]), encoding="utf-8") as f:
+                # A literal "</script>" inside the source would end the tag early
+                _inline[name] = f.read().replace("</script", "<\\/script")
+        return _inline[name]
+
+
+def _option(name):
+    try:
+        import streamlit as st
+        return st.get_option(name)
+    except Exception:
+        return None
+
+
+# Function to download the pinned assets into static/vendor and record their hashes
+def fetch_assets():
+    import urllib.request
+
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    manifest = {}
+    for name, (file_name, url) in ASSETS.items():
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        with open(os.path.join(VENDOR_DIR, file_name), "wb") as f:
+            f.write(data)
+        manifest[name] = {"file": file_name, "url": url, "sha256": hashlib.sha256(data).hexdigest()}
+        print(f"{file_name}: {len(data)} bytes")
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    _verified.clear()
+    _inline.clear()
+
+
+# Function to check, without network access, that a rendered graph page loads every script
+# from the vendored files: each asset matches the manifest, no page references a remote
+# URL, and (when Node.js is installed) every inline script parses. Returns a list of problems.
+def verify_offline():
+    from helper import create_cytoscape_html
+    from skill_graph import CYTOSCAPE_STYLES
+
+    problems = [f"{ASSETS[name][0]} is missing or does not match {MANIFEST_PATH}"
+                for name in ASSETS if not is_vendored(name)]
+    if problems:
+        return problems
+
+    nodes = [{'data': {'id': 'desired-job', 'label': 'Desired Job', 'type': 'root', 'info': ''},
+              'position': {'x': 0, 'y': 0}},
+             {'data': {'id': 'skill-1', 'label': 'Python', 'type': 'high', 'info': ''},
+              'position': {'x': 0, 'y': 90}}]
+    edges = [{'data': {'source': 'desired-job', 'target': 'skill-1'}}]
+    node = shutil.which("node")
+    for layout in ("preset", "dagre"):
+        for mode in ("static", "inline"):
+            page = create_cytoscape_html(nodes, edges, CYTOSCAPE_STYLES, layout=layout, assets=mode)
+            for src in re.findall(r'<script src="([^"]+)"', page):
+                if re.match(r"[a-z]+://", src):
+                    problems.append(f"{layout}/{mode}: page loads {src}")
+                elif not src.startswith(static_url()) or not os.path.exists(
+                        os.path.join(VENDOR_DIR, src[len(static_url()):])):
+                    problems.append(f"{layout}/{mode}: {src} is not a vendored file")
+            if node and mode == "inline":
+                for script in re.findall(r"<script>(.*?)</script>", page, re.S):
+                    with tempfile.NamedTemporaryFile("w", suffix=".js", delete=False) as f:
+                        f.write(script)
+                    result = subprocess.run([node, "--check", f.name], capture_output=True, text=True)
+                    os.unlink(f.name)
+                    if result.returncode != 0:
+                        problems.append(f"{layout}/{mode}: inline script does not parse: {result.stderr[:200]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor and verify the skill graph's JavaScript assets")
+    parser.add_argument("command", choices=["fetch", "verify"])
+    args = parser.parse_args()
+
+    if args.command == "fetch":
+        fetch_assets()
+    problems = verify_offline()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    print("Graph assets OK" if not problems else f"{len(problems)} problem(s)")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
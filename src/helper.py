@@ -1,85 +1,185 @@
 import streamlit as st
-import PyPDF2
-import docx
 import os
 import io
 import json
-import plotly.express as px
-from openai import OpenAI
-import re
+from extraction_cache import ExtractionCache
+from graph_assets import script_tags
+from pdf_extraction import iter_pdf_pages
+from resume_store import ResumeStore
+from text_normalization import normalize_text_file, normalize_document, join_pdf_pages
+from tracing import register_collector, span
 
-# Function to extract text from various file formats
-def extract_text_from_file(file):
+# Bump whenever the extraction or cleanup rules below change so cached text is regenerated
+EXTRACTOR_VERSION = "1"
+
+# Shared across reruns and sessions; set NEXTCV_EXTRACTION_CACHE_DIR to persist it on disk
+extraction_cache = ExtractionCache(
+    max_entries=int(os.environ.get("NEXTCV_EXTRACTION_CACHE_SIZE", "64")),
+    cache_dir=os.environ.get("NEXTCV_EXTRACTION_CACHE_DIR") or None,
+)
+
+# The resumes currently in use, with what is derived from them, keyed like the extraction cache
+resume_store = ResumeStore(max_entries=int(os.environ.get("NEXTCV_RESUME_STORE_SIZE", "64")))
+register_collector("extraction_cache", extraction_cache.stats)
+register_collector("resume_store", resume_store.stats)
+
+# Layout used when node positions aren't precomputed, and by layout="dagre"
+DAGRE_LAYOUT = {
+    'name': 'dagre',
+    'rankDir': 'TB',
+    'ranker': 'network-simplex',
+    'nodeDimensionsIncludeLabels': True,
+    'spacingFactor': 1,
+    'edgeSep': 40,
+    'rankSep': 90,
+    'fit': True,
+    'padding': 50
+}
+
+# Function to extract text from various file formats, reusing the cached text for previously seen uploads.
+# on_page, if given, is called with the cleaned text of each PDF page as it becomes available.
+def extract_text_from_file(file, on_page=None):
+    data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+    return _cached_extract(data, file.name, extraction_cache.make_key(data, file.name, EXTRACTOR_VERSION), on_page)
+
+# Function to load an uploaded resume into the shared resume store. The same content uploaded
+# again, in either tab, returns the stored resume without extracting anything. Returns None
+# when no text could be extracted.
+def load_resume(file, on_page=None):
+    data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+    key = extraction_cache.make_key(data, file.name, EXTRACTOR_VERSION)
+    resume = resume_store.get(key)
+    if resume is None:
+        text = _cached_extract(data, file.name, key, on_page)
+        if not text:
+            return None
+        resume = resume_store.put(key, text)
+    return resume
+
+def _cached_extract(data, file_name, key, on_page):
+    with span("extract_text", file_type=os.path.splitext(file_name)[1].lower(), bytes=len(data)) as current:
+        text = extraction_cache.get(key)
+        current.set(cached=text is not None)
+        if text is None:
+            text = _extract_text(data, file_name, on_page)
+            # Failed extractions come back empty and are retried on the next upload
+            if text:
+                extraction_cache.put(key, text)
+        return text
+
+# Function to build an on_page callback that fills a placeholder with pages as they are extracted
+def page_preview(placeholder):
+    pages = []
+    container = None
+
+    def on_page(page_text):
+        nonlocal container
+        if container is None:
+            container = placeholder.container(height=300)
+        pages.append(page_text)
+        container.caption(f"Page {len(pages)}")
+        container.text(page_text)
+
+    return on_page
+
+# Function to build an on_section callback that shows each part of a streamed analysis as soon
+# as it is complete. The full results view replaces this preview once the analysis finishes.
+def section_preview(placeholder, labels):
+    container = placeholder.container()
+
+    def on_section(key, value):
+        label = labels.get(key, key.replace("_", " ").title())
+        if isinstance(value, (int, float)):
+            container.metric(label, f"{value}%")
+        elif isinstance(value, str):
+            container.subheader(label)
+            container.write(value)
+        elif isinstance(value, dict):
+            with container.expander(f"✅ {label}"):
+                for sub_key, sub_value in value.items():
+                    _render_preview_value(sub_key.replace("_", " ").title(), sub_value)
+
+    return on_section
+
+def _render_preview_value(title, value):
+    if isinstance(value, list):
+        st.markdown(f"**{title}**")
+        for item in value:
+            # Lists of skill objects are summarized by their name
+            st.markdown(f"- {item.get('skill', '') if isinstance(item, dict) else item}")
+    else:
+        st.markdown(f"**{title}:** {value}")
+
+def _extract_text(data, file_name, on_page=None):
     text = ""
-    file_extension = os.path.splitext(file.name)[1].lower()
+    file_extension = os.path.splitext(file_name)[1].lower()
     
     if file_extension == '.pdf':
+        # Pages are collected and joined once; text from pages read before a failure is kept
+        pages = []
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
-            for page_num in range(len(pdf_reader.pages)):
-                # Extract text with layout preservation
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                
-                # Clean up common PDF extraction artifacts while preserving structure
-                # Fix hyphenation issues while preserving original text
-                page_text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', page_text)
-                # Fix line breaks within dates and company names
-                page_text = re.sub(r'(\d{4})\s*\n\s*(\d{4})', r'\1-\2', page_text)
-                page_text = re.sub(r'([A-Z][a-z]+)\s*\n\s*([A-Z][a-z]+)', r'\1 \2', page_text)
-                # Preserve section headers
-                page_text = re.sub(r'\n([A-Z][A-Z\s]+)\n', r'\n\n\1\n', page_text)
-                # Fix bullet points and lists
-                page_text = re.sub(r'\n\s*•\s*', '\n• ', page_text)
-                # Preserve proper spacing between sections
-                page_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', page_text)
-                # Fix spacing around dates and periods
-                page_text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', page_text)
-                page_text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', page_text)
-                
-                text += page_text + "\n\n"
+            for page_text in iter_pdf_pages(data):
+                pages.append(page_text)
+                if on_page is not None:
+                    on_page(page_text)
         except Exception as e:
             st.error(f"Error extracting text from PDF: {e}")
+        # The final cleanup only needs to revisit page boundaries
+        with span("text_cleanup", pages=len(pages)):
+            return join_pdf_pages(pages)
     elif file_extension in ['.docx', '.doc']:
         try:
-            doc = docx.Document(io.BytesIO(file.read()))
-            for para in doc.paragraphs:
+            # Imported on first use to keep python-docx out of app startup
+            import docx
+            with span("docx_parse"):
+                doc = docx.Document(io.BytesIO(data))
                 # Preserve paragraph breaks and formatting
-                text += para.text.strip() + "\n\n"
+                text = "".join(para.text.strip() + "\n\n" for para in doc.paragraphs)
         except Exception as e:
             st.error(f"Error extracting text from Word document: {e}")
     elif file_extension == '.txt':
         try:
-            text = file.read().decode('utf-8')
-            # Clean up text file formatting while preserving structure
-            text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-            text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
-            text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
+            with span("text_cleanup"):
+                text = normalize_text_file(data.decode('utf-8'))
         except Exception as e:
             st.error(f"Error reading text file: {e}")
     else:
         st.error("Unsupported file format. Please upload a PDF, DOCX, or TXT file.")
     
     # Final cleanup while preserving structure
-    text = text.strip()
-    # Ensure consistent spacing around dates and periods
-    text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
-    text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
-    # Ensure proper spacing around bullet points
-    text = re.sub(r'\n\s*•\s*', '\n• ', text)
-    # Ensure proper spacing between sections
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    with span("text_cleanup"):
+        text = normalize_document(text)
     
     return text
     
 
-def create_cytoscape_html(nodes, edges, styles):
+# Function to get the HTML page for a Cytoscape graph. With layout="preset" (the default)
+# nodes are drawn at the 'position' each element carries, so the browser runs no layout;
+# elements without positions, or layout="dagre", fall back to a dagre layout. Layout
+# animation is off unless animate=True. Scripts come from the vendored copies (see
+# graph_assets; assets overrides the NEXTCV_GRAPH_ASSETS mode). The app caches the page
+# per analysis (see skill_graph_html in app.py).
+def create_cytoscape_html(nodes, edges, styles, layout="preset", animate=False, assets=None):
+    if layout == "preset" and nodes and all('position' in node for node in nodes):
+        # Reset Layout moves dragged nodes back to these positions
+        layout_options = {
+            'name': 'preset',
+            'positions': {node['data']['id']: node['position'] for node in nodes},
+            'fit': True,
+            'padding': 50
+        }
+        scripts = script_tags(['cytoscape'], assets)
+    else:
+        layout_options = dict(DAGRE_LAYOUT)
+        scripts = script_tags(['cytoscape', 'dagre', 'cytoscape-dagre'], assets)
+    layout_options['animate'] = animate
+    if animate:
+        layout_options['animationDuration'] = 500
+
     return f"""
     <html>
         <head>
-            <script src="https://cdnjs.cloudflare.com/ajax/libs/cytoscape/3.21.1/cytoscape.min.js"></script>
-            <script src="https://unpkg.com/dagre@0.8.5/dist/dagre.min.js"></script>
-            <script src="https://unpkg.com/cytoscape-dagre@2.5.0/cytoscape-dagre.js"></script>
+            {scripts}
             <style>
                 .cy-container {{
                     position: relative;
@@ -125,8 +225,11 @@ def create_cytoscape_html(nodes, edges, styles):
                 </div>
             </div>
             <script>
-                // Register the dagre layout
-                cytoscape.use(cytoscapeDagre);
+                // Register the dagre layout when it was loaded
+                if (typeof cytoscapeDagre !== 'undefined') {{
+                    cytoscape.use(cytoscapeDagre);
+                }}
+                var layoutOptions = {json.dumps(layout_options)};
                 
                 var cy = cytoscape({{
                     container: document.getElementById('cy'),
@@ -135,19 +238,7 @@ def create_cytoscape_html(nodes, edges, styles):
                         edges: {json.dumps(edges)}
                     }},
                     style: {json.dumps(styles)},
-                    layout: {{
-                        name: 'dagre',
-                        rankDir: 'TB',
-                        ranker: 'network-simplex',
-                        nodeDimensionsIncludeLabels: true,
-                        spacingFactor: 1,
-                        edgeSep: 40,
-                        rankSep: 90,
-                        animate: true,
-                        animationDuration: 500,
-                        fit: true,
-                        padding: 50
-                    }},
+                    layout: layoutOptions,
                     wheelSensitivity: 0.2  // Reduce scroll zoom sensitivity
                 }});
                 
@@ -201,19 +292,7 @@ def create_cytoscape_html(nodes, edges, styles):
                 
                 // Add button functionality
                 document.getElementById('resetLayout').addEventListener('click', function() {{
-                    cy.layout({{
-                        name: 'dagre',
-                        rankDir: 'TB',
-                        ranker: 'network-simplex',
-                        nodeDimensionsIncludeLabels: true,
-                        spacingFactor: 1,
-                        edgeSep: 40,
-                        rankSep: 90,
-                        animate: true,
-                        animationDuration: 500,
-                        fit: true,
-                        padding: 50
-                    }}).run();
+                    cy.layout(layoutOptions).run();
                 }});
             </script>
         </body>
@@ -0,0 +1,60 @@
+import difflib
+from collections import namedtuple
+
+from company_cache import normalize_company_name
+
+# The inputs an analysis was generated from, kept next to it so that a resubmission with
+# slightly edited inputs can be compared with them
+AnalysisInputs = namedtuple("AnalysisInputs", "resume_text job_description company")
+
+# Display names of the top-level sections of a resume analysis, as the results tabs call them
+SECTION_NAMES = {
+    "match_percentage": "Match Percentage",
+    "summary": "Summary",
+    "skill_match": "Skills Analysis",
+    "content_improvements": "Content Improvements",
+    "company_specific_insights": "Company Insights",
+}
+
+
+# Function to measure how much a text changed, as the share of words that differ (0 when
+# only whitespace changed, 1 when nothing is left)
+def change_ratio(old, new):
+    old_words, new_words = (old or "").split(), (new or "").split()
+    if old_words == new_words:
+        return 0.0
+    return 1 - difflib.SequenceMatcher(None, old_words, new_words, autojunk=False).ratio()
+
+
+# Function to count the lines that were added, removed or edited between two texts
+def changed_lines(old, new):
+    old_lines = [line.strip() for line in (old or "").splitlines() if line.strip()]
+    new_lines = [line.strip() for line in (new or "").splitlines() if line.strip()]
+    opcodes = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != "equal")
+
+
+# Function to decide which top-level sections of a resume analysis to generate again after
+# its inputs changed from `old` to `new`. old_match and new_match are the local skill
+# matches of the two. Returns the set of section keys, empty when nothing the analysis
+# depends on changed, or None when the change is too large to keep any of it:
+# - resume wording changed: content improvements (they quote and critique the wording)
+# - job description wording changed: summary
+# - the skills found in either changed: summary and skills analysis
+# - the company changed, or either text changed by more than max_change: everything
+def sections_to_refresh(old, new, old_match, new_match, max_change):
+    if normalize_company_name(old.company) != normalize_company_name(new.company):
+        return None
+    resume_change = change_ratio(old.resume_text, new.resume_text)
+    job_change = change_ratio(old.job_description, new.job_description)
+    if max(resume_change, job_change) > max_change:
+        return None
+
+    refresh = set()
+    if resume_change:
+        refresh.add("content_improvements")
+    if job_change:
+        refresh.add("summary")
+    if any(set(old_match[key]) != set(new_match[key]) for key in ("matched_skills", "missing_skills")):
+        refresh.update(("summary", "skill_match"))
+    return refresh
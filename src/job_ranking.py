@@ -0,0 +1,99 @@
+import re
+from collections import namedtuple
+
+from skill_matcher import get_matcher, tokenize
+
+# A job posting pasted alongside others: a display title (its first line), the company
+# named on a "Company:" line, if any, and the full text
+Posting = namedtuple("Posting", "title company text")
+
+# Postings pasted together are separated by a line of three or more dashes, equals signs
+# or asterisks
+_SEPARATOR = re.compile(r"^\s*(?:-{3,}|={3,}|\*{3,})\s*$", re.MULTILINE)
+_COMPANY_LINE = re.compile(r"^\s*company\s*:\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# Words too common in resumes and postings to say anything about the match
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could do does for
+from has have having he her his i if in into is it its may me more most must my new of on or
+our out over she should so such than that the their them then there these they this those to
+under up us was we were what when where which while who will with within would you your
+""".split())
+
+
+# Function to split text holding several job postings into Posting tuples
+def split_postings(text):
+    postings = []
+    for chunk in _SEPARATOR.split(text or ""):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        company = _COMPANY_LINE.search(chunk)
+        body = _COMPANY_LINE.sub("", chunk, count=1).strip() if company else chunk
+        title = next((line.strip() for line in body.splitlines() if line.strip()), "")
+        postings.append(Posting(title[:80], company.group(1) if company else "", chunk))
+    return postings
+
+
+# Function to split text into the terms documents are indexed on: its words, plus one
+# "skill:<name>" term per mention of a taxonomy skill, so a resume that says "k8s" and a
+# posting that says "Kubernetes" share a term
+def terms(text):
+    tokens = tokenize(text or "")
+    words = [token for token in tokens if token not in STOPWORDS and len(token) > 1]
+    skills = get_matcher().find_skills_in_tokens(tokens)
+    return words + [f"skill:{name}" for name, count in skills.items() for _ in range(count)]
+
+
+# Okapi BM25 index over a set of documents, held as NumPy arrays: one entry per distinct
+# (document, term) pair with its precomputed term weight. Building it is one pass over the
+# words of each document; scoring a query is then a gather and a bincount over the entries,
+# with no Python loop over documents. NumPy is imported on first use, not with the app.
+class BM25Index:
+    def __init__(self, documents, k1=1.5, b=0.75):
+        import numpy as np
+
+        self.size = len(documents)
+        self.vocabulary = {}
+        token_ids = [np.array([self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms(document)],
+                              dtype=np.int64) for document in documents]
+        lengths = np.array([len(ids) for ids in token_ids], dtype=np.float64)
+        vocabulary_size = max(len(self.vocabulary), 1)
+
+        # Count each term per document by sorting (document, term) keys
+        doc_of_token = np.repeat(np.arange(self.size, dtype=np.int64), lengths.astype(np.int64))
+        keys = doc_of_token * vocabulary_size + (np.concatenate(token_ids) if token_ids else np.zeros(0, np.int64))
+        keys, counts = np.unique(keys, return_counts=True)
+        self._docs = keys // vocabulary_size
+        self._terms = keys % vocabulary_size
+
+        document_frequency = np.bincount(self._terms, minlength=vocabulary_size)
+        self.idf = np.log(1 + (self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if self.size and lengths.sum() else 1.0
+        norm = k1 * (1 - b + b * lengths / average_length)
+        self._weights = self.idf[self._terms] * counts * (k1 + 1) / (counts + norm[self._docs])
+
+    # Function to score every document against a query text. Query terms repeated in the
+    # query count for more, with the same saturation as in documents, so a resume that
+    # mentions Python ten times doesn't drown out everything else.
+    def score(self, query, k3=1.2):
+        import numpy as np
+
+        query_weights = np.zeros(max(len(self.vocabulary), 1))
+        ids, counts = np.unique([self.vocabulary[term] for term in terms(query) if term in self.vocabulary],
+                                return_counts=True)
+        query_weights[ids.astype(np.int64)] = counts * (k3 + 1) / (counts + k3)
+        return np.bincount(self._docs, weights=self._weights * query_weights[self._terms], minlength=self.size)
+
+
+# Function to rank job descriptions by how well a resume matches them, best first. Returns
+# (index into job_descriptions, BM25 score) pairs, the top_k only if given. No API call is
+# made, so this can run over every saved posting before choosing which to analyze in depth.
+def rank_postings(resume_text, job_descriptions, top_k=None):
+    import numpy as np
+
+    if not job_descriptions:
+        return []
+    scores = BM25Index(job_descriptions).score(resume_text)
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [(int(i), float(scores[i])) for i in order]
@@ -0,0 +1,102 @@
+import json
+import re
+
+
+# Incremental parser for a streamed JSON object. Text is fed in arbitrary chunks and every
+# top-level member is returned as soon as its value is complete, so callers can act on
+# "match_percentage" while the rest of the object is still being generated. Anything before
+# the first "{" (a preamble or a ```json fence) is ignored.
+class IncrementalJSONParser:
+    def __init__(self):
+        self.members = {}
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._state = "key"
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    # Returns a list of (key, value) pairs completed by this chunk
+    def feed(self, chunk):
+        completed = []
+        if self.done or not chunk:
+            return completed
+        self._buffer += chunk
+
+        while self._pos < len(self._buffer) and not self.done:
+            i = self._pos
+            char = self._buffer[i]
+            self._pos += 1
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(self._buffer[self._key_start:i + 1])
+                        self._state = "colon"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = i
+            elif char == ":" and self._depth == 1 and self._state == "colon":
+                self._state = "value"
+                self._value_start = i + 1
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(i, completed)
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                self._complete_member(i, completed)
+
+        return completed
+
+    def _complete_member(self, end, completed):
+        if self._state == "value":
+            try:
+                value = json.loads(self._buffer[self._value_start:end])
+            except ValueError:
+                # A malformed value is skipped; the member is simply missing from the result
+                pass
+            else:
+                self.members[self._key] = value
+                completed.append((self._key, value))
+        self._state = "key"
+        self._key = None
+
+
+# Function to recover a JSON object from a model reply. A complete object is parsed as is;
+# for a truncated or partly malformed reply, every top-level member that did complete is
+# kept, so only the broken sections have to be generated again.
+def parse_json_reply(text):
+    json_match = re.search(r'({[\s\S]*})', text)
+    if json_match:
+        try:
+            value = json.loads(json_match.group(0))
+        except ValueError:
+            pass
+        else:
+            if isinstance(value, dict):
+                return value
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.members
@@ -1,69 +1,342 @@
 import streamlit as st
-from openai import OpenAI
-import re
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from openai_client import get_client
+import asyncio
+import copy
+import hashlib
 import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from company_cache import CompanyCache, normalize_company_name
+from incremental import AnalysisInputs, sections_to_refresh
+from job_ranking import rank_postings
+from json_stream import IncrementalJSONParser, parse_json_reply
+from near_duplicates import NearDuplicateIndex
+from prompt_builder import PromptSection, assemble_prompt, estimate_tokens
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+from schemas import (CAREER_ANALYSIS_SCHEMA, RESUME_ANALYSIS_SCHEMA, RESUME_NARRATIVE_SCHEMA, default_value,
+                     invalid_sections, is_valid, normalize_integers, response_format, subschema)
+from skill_matcher import match_skills
+from tracing import adopt, current_span, record_usage, register_collector, span, traced
+
+logger = logging.getLogger(__name__)
+
+# Per-request input budget; the least valuable prompt sections are trimmed to fit
+MAX_PROMPT_TOKENS = int(os.environ.get("NEXTCV_MAX_PROMPT_TOKENS", "16000"))
+
+# Completions for identical prompts can be served from a local SQLite cache. It stores
+# resume text and analyses on disk, so it is opt-in: set NEXTCV_RESPONSE_CACHE=1 to use it.
+response_cache = ResponseCache(
+    os.environ.get("NEXTCV_RESPONSE_CACHE_PATH", os.path.expanduser("~/.cache/nextcv/responses.sqlite3")),
+    ttl_seconds=int(os.environ.get("NEXTCV_RESPONSE_CACHE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.environ.get("NEXTCV_RESPONSE_CACHE_SIZE", "5000")),
+    enabled=os.environ.get("NEXTCV_RESPONSE_CACHE", "0") == "1",
+)
+
+# Company summaries are shared by every session and persisted across restarts. Names are
+# normalized, so "Google", "google " and "Google LLC" share one entry.
+company_cache = CompanyCache(
+    os.environ.get("NEXTCV_COMPANY_CACHE_PATH", os.path.expanduser("~/.cache/nextcv/companies.json")),
+    ttl_seconds=int(os.environ.get("NEXTCV_COMPANY_CACHE_TTL", str(30 * 24 * 3600))),
+    max_entries=int(os.environ.get("NEXTCV_COMPANY_CACHE_SIZE", "1000")),
+)
+
+# Resume analyses are also indexed by a MinHash fingerprint of the job description, so the
+# same posting pasted again with different whitespace, a tracking footer or a moved bullet
+# reuses the earlier analysis for the same resume and company instead of calling the API.
+# NEXTCV_JD_SIMILARITY_THRESHOLD is the estimated Jaccard similarity of the two postings'
+# word shingles needed to count as the same; NEXTCV_JD_INDEX=0 turns it off.
+near_duplicates = NearDuplicateIndex(
+    threshold=float(os.environ.get("NEXTCV_JD_SIMILARITY_THRESHOLD", "0.8")),
+    max_entries=int(os.environ.get("NEXTCV_JD_INDEX_SIZE", "10000")),
+    enabled=os.environ.get("NEXTCV_JD_INDEX", "1") != "0",
+)
+
+# With split sections, the resume analysis is generated as concurrent section prompts
+# (name, top-level keys, model) instead of one long reply. The list-style sections use
+# the smaller, faster model.
+SPLIT_ANALYSIS = os.environ.get("NEXTCV_SPLIT_ANALYSIS", "0") == "1"
+SECTION_MODEL = os.environ.get("NEXTCV_SECTION_MODEL", "gpt-4o-mini")
+RESUME_ANALYSIS_SECTIONS = [
+    ("overview", ["match_percentage", "summary"], "gpt-4.1-mini"),
+    ("skill_match", ["skill_match"], "gpt-4.1-mini"),
+    ("content_improvements", ["content_improvements"], SECTION_MODEL),
+    ("company_specific_insights", ["company_specific_insights"], SECTION_MODEL),
+]
+
+# An analysis submitted again with its resume and job description each changed by at most
+# this share of words regenerates only the sections the edit can affect and keeps the rest
+INCREMENTAL_MAX_CHANGE = float(os.environ.get("NEXTCV_INCREMENTAL_MAX_CHANGE", "0.2"))
+
+# Every completion goes through a client-side rate limiter per model, shared by all sessions.
+# The budgets start from these settings and then follow the limits the API reports.
+RATE_LIMIT_RPM = int(os.environ.get("NEXTCV_RATE_LIMIT_RPM", "500"))
+RATE_LIMIT_TPM = int(os.environ.get("NEXTCV_RATE_LIMIT_TPM", "200000"))
+RATE_LIMIT_RETRIES = int(os.environ.get("NEXTCV_RATE_LIMIT_RETRIES", "5"))
+# Reply tokens counted against the budget up front, since the API reserves them too
+COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("NEXTCV_COMPLETION_TOKEN_ESTIMATE", "2000"))
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+# Company lookups run on a small background pool so they can start as soon as the company
+# name is entered, well before the user clicks Analyze. Concurrent lookups of the same
+# normalized name share one API call.
+_company_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="company-lookup")
+company_flights = SingleFlight()
+
+# Analyses with the same normalized inputs that run at the same time, e.g. several users
+# submitting a circulating job posting or a double-clicked Analyze, share one API call
+analysis_flights = SingleFlight()
+
+# Function to fetch a short summary of the company the user is applying to
+@traced("company_lookup")
+def fetch_company_summary(company, api_key):
+    client = get_client(api_key)
+    company_prompt = f"""
+    Search up information about the company {company}. 
+    Given the context that the user is applying for a job at this company, give a summary about it."""
+
+    return _create_completion(client, "gpt-4o-mini", [{"role": "user", "content": company_prompt}], 0.2)
+
+# Function to start the company lookup in the background; returns a future for the summary text
+def prefetch_company_summary(company, api_key):
+    key = normalize_company_name(company)
+    if not key:
+        return None
+
+    summary = company_cache.get(company)
+    if summary is not None:
+        future = Future()
+        future.set_result(summary)
+        return future
+
+    return company_flights.submit(key, _company_executor, _lookup_company, company, api_key)
+
+# Fetches a summary and caches it before the lookup stops being in flight, so there is no
+# window where a new request finds neither
+def _lookup_company(company, api_key):
+    summary = fetch_company_summary(company, api_key)
+    company_cache.put(company, summary)
+    return summary
+
+# Function to look up a list of popular employers ahead of time so their first users don't wait
+def warm_company_cache(companies, api_key):
+    return [future for future in (prefetch_company_summary(company, api_key) for company in companies) if future]
+
+# Function to get the company summary for an analysis. By default the analysis joins on the
+# lookup (started earlier by prefetch_company_summary, or now). With wait_for_company=False
+# it never blocks: a finished lookup is used if there is one, otherwise the analysis runs
+# without company details and the lookup is started for next time.
+def _resolve_company_summary(company, api_key, wait_for_company):
+    future = prefetch_company_summary(company, api_key)
+    if future is None:
+        return ""
+    if not wait_for_company and not future.done():
+        return ""
+    try:
+        return future.result()
+    except Exception as e:
+        st.warning(f"Could not look up company details for {company}: {e}")
+        return ""
 
 # Function to analyze resume using OpenAI
-def analyze_resume_with_openai(resume_text, job_description, company, api_key):
-    client = OpenAI(api_key=api_key)
-
-    company_response = ""  # Initialize with empty string
-    if company != "":
-        company_prompt = f"""
-        Search up information about the company {company}. 
-        Given the context that the user is applying for a job at this company, give a summary about it."""
-
-        company_response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", 
-                       "content": company_prompt}],
-            temperature=0.2
-        )
-    
-    prompt = f"""
+def analyze_resume_with_openai(resume_text, job_description, company, api_key, stream=False, on_section=None,
+                               wait_for_company=True, use_cache=True, split_sections=None, local_skills=True):
+    if split_sections is None:
+        split_sections = SPLIT_ANALYSIS
+    # Callers only share an analysis built the same way: one that may skip a pending company
+    # lookup or splits its sections can differ from one that doesn't
+    key = ("resume_analysis", _input_digest(resume_text, job_description), normalize_company_name(company),
+           local_skills, wait_for_company, split_sections)
+    return _coalesced(key, on_section, _run_resume_analysis, resume_text, job_description, company, api_key,
+                      stream, on_section, wait_for_company, use_cache, split_sections, local_skills)
+
+# Function to rank several postings against one resume locally with BM25 and analyze only
+# the top_k best matches, concurrently. postings are Posting tuples (see job_ranking).
+# Returns (posting index, BM25 score, analysis) for the top_k, best match first;
+# on_result(index, analysis) is called as each analysis finishes.
+def analyze_top_postings(resume_text, postings, api_key, top_k=3, on_result=None, wait_for_company=True,
+                         split_sections=None, use_cache=True):
+    with span("posting_ranking", postings=len(postings)):
+        ranking = rank_postings(resume_text, [posting.text for posting in postings], top_k)
+    # Worker threads report errors and warnings to the calling Streamlit session
+    ctx = get_script_run_ctx(suppress_warning=True)
+    parent = current_span()
+
+    def analyze(index):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        posting = postings[index]
+        with adopt(parent):
+            return analyze_resume_with_openai(resume_text, posting.text, posting.company, api_key,
+                                              wait_for_company=wait_for_company, use_cache=use_cache,
+                                              split_sections=split_sections)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(len(ranking), 1), thread_name_prefix="posting-analysis") as executor:
+        futures = {executor.submit(analyze, index): index for index, _ in ranking}
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_result is not None:
+                on_result(index, results[index])
+    return [(index, score, results[index]) for index, score in ranking]
+
+# Function to analyze a resume again after its inputs were edited, keeping the parts of the
+# previous analysis the edit can't have affected (see incremental.sections_to_refresh).
+# previous_inputs are the AnalysisInputs previous_result came from. Returns (result,
+# refreshed): the top-level sections generated again, or None when the whole analysis was
+# redone because the inputs changed too much or use_cache=False asked for a fresh one.
+@traced("reanalysis")
+def reanalyze_resume_with_openai(previous_inputs, previous_result, resume_text, job_description, company, api_key,
+                                 stream=False, on_section=None, wait_for_company=True, split_sections=None,
+                                 local_skills=True, use_cache=True):
+    if split_sections is None:
+        split_sections = SPLIT_ANALYSIS
+    old_match = match_skills(previous_inputs.resume_text, previous_inputs.job_description)
+    new_match = match_skills(resume_text, job_description)
+    refresh = sections_to_refresh(previous_inputs, AnalysisInputs(resume_text, job_description, company),
+                                  old_match, new_match, INCREMENTAL_MAX_CHANGE)
+    # The skill match is computed locally only when the job description names known skills,
+    # and the previous analysis can't be reused across that switch
+    local = [local_skills and bool(match["matched_skills"] or match["missing_skills"])
+             for match in (old_match, new_match)]
+    if refresh is None or local[0] != local[1] or not use_cache:
+        return analyze_resume_with_openai(resume_text, job_description, company, api_key, stream, on_section,
+                                          wait_for_company, use_cache, split_sections=split_sections,
+                                          local_skills=local_skills), None
+
+    if local[1]:
+        schema_name, schema = "resume_narrative", RESUME_NARRATIVE_SCHEMA
+        result = _narrative(previous_result)
+        if on_section is not None:
+            on_section("match_percentage", new_match["match_percentage"])
+            on_section = _merging_skill_match(on_section, new_match)
+    else:
+        schema_name, schema = "resume_analysis", RESUME_ANALYSIS_SCHEMA
+        result = copy.deepcopy(previous_result)
+        if "summary" in refresh:
+            refresh.add("match_percentage")
+    refresh = [key for key in schema["properties"] if key in refresh]
+    if on_section is not None:
+        for key, value in result.items():
+            if key not in refresh:
+                on_section(key, value)
+
+    if refresh:
+        logger.info("Regenerating %s of the previous analysis", ", ".join(refresh))
+        client = get_client(api_key)
+        company_response = _resolve_company_summary(company, api_key, wait_for_company)
+        prompt, _ = assemble_prompt(_resume_analysis_sections(resume_text, job_description, company,
+                                                              company_response, new_match if local[1] else None),
+                                    MAX_PROMPT_TOKENS)
+        groups = RESUME_ANALYSIS_SECTIONS if split_sections else [("refresh", refresh, "gpt-4.1-mini")]
+        fresh = _complete_sections(client, prompt, schema_name, subschema(schema, refresh), groups, on_section,
+                                   use_cache)
+        if fresh is None:
+            return None, refresh
+        result.update(fresh)
+    if local[1]:
+        result = _with_skill_match(result, new_match)
+    # Only analyses with freshly written, complete sections are indexed; the kept ones may
+    # come from an analysis that ran without company details
+    if refresh and _has_company_details(company, company_response):
+        near_duplicates.add(_analysis_scope(resume_text, company, new_match if local[1] else None),
+                            job_description, copy.deepcopy(result))
+    return result, refresh
+
+@traced("resume_analysis")
+def _run_resume_analysis(resume_text, job_description, company, api_key, stream, on_section, wait_for_company,
+                         use_cache, split_sections, local_skills):
+    client = get_client(api_key)
+
+    # With local_skills the match percentage and the matched/missing skill lists come from
+    # the local skill matcher and the model only writes the narrative around them. When the
+    # job description names no skill the matcher knows, the model judges the match instead.
+    skill_match = match_skills(resume_text, job_description) if local_skills else None
+    if skill_match and not (skill_match["matched_skills"] or skill_match["missing_skills"]):
+        skill_match = None
+
+    scope = _analysis_scope(resume_text, company, skill_match)
+    if use_cache:
+        reused = _reuse_near_duplicate(scope, job_description, skill_match, on_section)
+        if reused is not None:
+            return reused
+    if skill_match:
+        schema_name, schema = "resume_narrative", RESUME_NARRATIVE_SCHEMA
+        if on_section is not None:
+            on_section("match_percentage", skill_match["match_percentage"])
+            on_section = _merging_skill_match(on_section, skill_match)
+    else:
+        schema_name, schema = "resume_analysis", RESUME_ANALYSIS_SCHEMA
+
+    company_response = _resolve_company_summary(company, api_key, wait_for_company)
+    prompt, report = assemble_prompt(_resume_analysis_sections(resume_text, job_description, company, company_response,
+                                                               skill_match), MAX_PROMPT_TOKENS)
+    logger.info("Resume analysis prompt tokens: %s", report)
+
+    if split_sections:
+        result = _complete_sections(client, prompt, schema_name, schema, RESUME_ANALYSIS_SECTIONS, on_section,
+                                    use_cache)
+    else:
+        result = _complete_json(client, "gpt-4.1-mini", prompt, schema_name, schema, stream, on_section, use_cache)
+    if result is not None and skill_match:
+        result = _with_skill_match(result, skill_match)
+    if result is not None and _has_company_details(company, company_response):
+        near_duplicates.add(scope, job_description, copy.deepcopy(result))
+    return result
+
+# Function to build the prompt sections of a resume analysis
+def _resume_analysis_sections(resume_text, job_description, company, company_response, skill_match):
+    sections = [
+        PromptSection("instructions", f"""
     You are acting as both an experienced technical recruiter and hiring manager for {company}. 
     Analyze the following resume against the job description to provide detailed, strategic feedback.
     Focus on providing actionable insights that will help the candidate stand out.
     
-    RESUME (note that the resume is extracted from a PDF file, so the formatting might be off):
-    {resume_text}
-    
-    JOB DESCRIPTION:
-    {job_description + " in " + company}
-
-    Company Details:
-    {company_response}
-    
+    RESUME (note that the resume is extracted from a PDF file, so the formatting might be off):"""),
+        PromptSection("resume", resume_text, trim_rank=2, min_tokens=800),
+        PromptSection("instructions", """
+    JOB DESCRIPTION:"""),
+        PromptSection("job_description", job_description + " in " + company, trim_rank=1, min_tokens=300),
+        PromptSection("instructions", """
+    Company Details:"""),
+        PromptSection("company_details", company_response, trim_rank=0),
+        PromptSection("output_format", """
     Provide a comprehensive analysis in JSON format with the following structure:
-    {{
+    {
         "match_percentage": 0-100,
-        "skill_match": {{
+        "summary": "brief summary of the overall analysis and actionable insights for the candidate to get an edge in the application.",
+        "skill_match": {
             "matched_skills": ["list of matched skills"],
             "missing_skills": ["list of missing skills"],
             "recommended_skills": [
-                {{
+                {
                     "skill": "skill name",
                     "category": "technical/soft/domain-specific",
                     "priority": "high/medium/low",
                     "prerequisites": ["list of prerequisite skills if any"],
                     "estimated_time": "estimated time to learn (weeks/months)",
                     "resources": ["list of specific learning resources"]
-                }}
+                }
             ]
-        }},
-        "content_improvements": {{
+        },
+        "content_improvements": {
             "sections_to_improve": ["list of sections that need improvement"],
             "wording_suggestions": ["list of wording improvements, be specific about this and give examples"],
             "format_suggestions": ["list of formatting improvements, be specific about this and give examples. But don't need to mention the formatting errors that could be due to the PDF extraction."]
-        }},
-        "company_specific_insights": {{
+        },
+        "company_specific_insights": {
             "company_specific_skills": ["skills particularly valued by this company"],
             "company_projects": ["suggestions for projects or experiences that would impress this company"],
             "networking_opportunities": ["specific networking opportunities or events related to this company"],
             "company_resources": ["company-specific resources or programs the candidate could leverage"]
-        }},
-        "summary": "brief summary of the overall analysis and actionable insights for the candidate to get an edge in the application."
-    }}
+        }
+    }
     
     For the recommended_skills, organize them in a logical learning path with clear prerequisites and priorities.
     Also for the recommended skills, the resume might not mention all the skills, but judge based on the resume to see if the candidate has the skills. 
@@ -76,48 +349,111 @@ def analyze_resume_with_openai(resume_text, job_description, company, api_key):
     
     Be specific, actionable, and detailed in your analysis. Focus on providing genuine value to the job seeker.
     If a company is provided, emphasize company-specific insights and how the candidate can better position themselves for this particular role.
-    """
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "user", 
-                       "content": prompt}],
-            temperature=0.2,
-        )
-        result = response.choices[0].message.content
-        
-        # Extract the JSON part from the response
-        json_pattern = r'({[\s\S]*})'
-        json_match = re.search(json_pattern, result)
-        
-        if json_match:
-            json_data = json.loads(json_match.group(0))
-            return json_data
-        else:
-            st.error("Failed to parse the API response.")
-            return None
-            
-    except Exception as e:
-        st.error(f"Error communicating with OpenAI API: {e}")
+    """),
+    ]
+    if skill_match:
+        sections.insert(-1, PromptSection("skill_match", _skill_match_context(skill_match)))
+    return sections
+
+# Function to get the scope analyses are indexed under for near-duplicate reuse: the resume,
+# the company, and whether the skill match was computed locally. An analysis whose skill
+# match the model judged (the job description named no skill the matcher knows) is never
+# served for one with a local match, or the other way round, since neither can be turned
+# into the other.
+def _analysis_scope(resume_text, company, skill_match):
+    return (_input_digest(resume_text), normalize_company_name(company), bool(skill_match))
+
+# Function to check that an analysis had the company details it asked for. One that ran
+# without them (the lookup was still pending with wait_for_company=False, or failed) is
+# not indexed for reuse, so a later run with the same inputs gets company-specific advice.
+def _has_company_details(company, company_response):
+    return bool(company_response) or not normalize_company_name(company)
+
+# Function to serve the analysis of a near-duplicate job description analyzed earlier with
+# the same resume and company. The locally computed skill match is redone for the new text;
+# the reused analysis is indexed under it too, so later variants can match either one.
+def _reuse_near_duplicate(scope, job_description, skill_match, on_section):
+    found = near_duplicates.lookup(scope, job_description)
+    if found is None:
         return None
+    result, similarity = found
+    logger.info("Reusing the analysis of a near-duplicate job description (similarity %.3f)", similarity)
+    result = copy.deepcopy(result)
+    if skill_match:
+        result = _with_skill_match(_narrative(result), skill_match)
+    if similarity < 1:
+        near_duplicates.add(scope, job_description, copy.deepcopy(result))
+    st.info(f"This job description is {similarity:.0%} similar to one analyzed before with the same resume, "
+            "so that analysis was reused.")
+    if on_section is not None:
+        for section, value in result.items():
+            on_section(section, value)
+    return result
+
+# Function to describe the local skill match to the model
+def _skill_match_context(skill_match):
+    return f"""
+    Precomputed Skill Match (computed from the resume and job description; it is final, so don't repeat it,
+    base the recommended skills and the rest of the analysis on it):
+    Match percentage: {skill_match["match_percentage"]}
+    Matched skills: {", ".join(skill_match["matched_skills"]) or "none"}
+    Missing skills: {", ".join(skill_match["missing_skills"]) or "none"}"""
+
+# Function to strip the locally computed fields from a resume analysis, leaving the narrative
+def _narrative(result):
+    narrative = {key: copy.deepcopy(value) for key, value in result.items() if key != "match_percentage"}
+    narrative["skill_match"] = {key: value for key, value in narrative["skill_match"].items()
+                                if key not in ("matched_skills", "missing_skills")}
+    return narrative
+
+# Function to complete a narrative result with the locally computed fields, in the usual key order
+def _with_skill_match(narrative, skill_match):
+    result = {"match_percentage": skill_match["match_percentage"]}
+    result.update(narrative)
+    result["skill_match"] = dict(
+        matched_skills=skill_match["matched_skills"],
+        missing_skills=skill_match["missing_skills"],
+        **narrative["skill_match"],
+    )
+    return result
+
+# Function to wrap an on_section callback so the skill_match section it receives includes
+# the locally computed skill lists
+def _merging_skill_match(on_section, skill_match):
+    def merged(key, value):
+        if key == "skill_match":
+            value = _with_skill_match({"skill_match": value}, skill_match)["skill_match"]
+        on_section(key, value)
+    return merged
     
 # Function to analyze LinkedIn profile
-def analyze_linkedin_profile(linkedin_url, career_path, country, industry, resume_text, api_key):
-    client = OpenAI(api_key=api_key)
+def analyze_linkedin_profile(linkedin_url, career_path, country, industry, resume_text, api_key, stream=False, on_section=None,
+                             use_cache=True):
+    key = ("career_analysis", _input_digest(linkedin_url, career_path, country, industry, resume_text))
+    return _coalesced(key, on_section, _run_linkedin_analysis, linkedin_url, career_path, country, industry,
+                      resume_text, api_key, stream, on_section, use_cache)
+
+@traced("career_analysis")
+def _run_linkedin_analysis(linkedin_url, career_path, country, industry, resume_text, api_key, stream, on_section,
+                           use_cache):
+    client = get_client(api_key)
     
-    prompt = f"""
+    sections = [
+        PromptSection("instructions", """
     You are an expert career coach tasked to help the user with their career development and LinkedIn optimization. Your thinking should be thorough. You can think step by step before and after each action you decide to take.
     The user wants to find out how to develop their career. Analyze the following LinkedIn profile URL and resume to provide comprehensive career development advice.
 
-    LINKEDIN PROFILE URL:
-    {linkedin_url}
+    LINKEDIN PROFILE URL:"""),
+        PromptSection("linkedin_url", linkedin_url),
+        PromptSection("instructions", """
 
-    RESUME:
-    {resume_text}
+    RESUME:"""),
+        PromptSection("resume", resume_text, trim_rank=1, min_tokens=800),
+        PromptSection("instructions", """
     
-    DESIRED CAREER PATH/SPECIALIZATION:
-    {career_path + " in " + industry + " in " + country}
+    DESIRED CAREER PATH/SPECIALIZATION:"""),
+        PromptSection("career_path", career_path + " in " + industry + " in " + country),
+        PromptSection("output_format", """
 
     You must have a comprehensive understanding about the career path and the industry.
     Think carefully about what kind of skills expertise the industry today actually need according to the desired career pathway.
@@ -129,72 +465,272 @@ def analyze_linkedin_profile(linkedin_url, career_path, country, industry, resum
     4. Skill Development: Identify key technical and soft skills to focus on.
     5. Profile Optimization: Provide concrete tips for optimizing the LinkedIn profile and resume.
     6. Industry Insights: Share deep insights about the industry, including trends and certifications.
-    {{
-        "career_alignment": {{
+    {
+        "career_alignment": {
             "alignment_score": 0-100,
             "strengths": ["list of strengths that align with the desired path"],
             "gaps": ["list of immediate gaps or weaknesses for the desired path"]
-        }},
-        "networking_strategy": {{
+        },
+        "summary": "brief summary of the overall career development advice based on the profile, resume, desired career path and the stage of career the user is at",
+        "networking_strategy": {
             "key_connections": ["types of professionals to connect with"],
             "communities": ["relevant professional communities to join (be specific)"],
             "engagement_tactics": ["strategies for meaningful networking (give specific examples.)"]
-        }},
-        "skill_development": {{
+        },
+        "skill_development": {
             "technical_skills": [
-                {{
+                {
                     "skill": "skill name",
                     "priority": "high/medium/low",
                     "resources": ["list of specific learning resources"],
                     "current_level": "Beginner/Intermediate/Advanced",
                     "gap_analysis": "analysis of current skill level vs required level"
-                }}
+                }
             ],
             "soft_skills": [
-                {{
+                {
                     "skill": "skill name",
                     "priority": "high/medium/low",
                     "development_approaches": ["list of ways to develop this soft skill"],
                     "current_level": "Beginner/Intermediate/Advanced",
                     "gap_analysis": "analysis of current skill level vs required level"
-                }}
+                }
             ]
-        }},
-        "profile_optimization": {{
+        },
+        "profile_optimization": {
             "headline_suggestions": ["suggestions for LinkedIn headline based on the profile. be creative and generate based on the strength and interest of the user."],
             "about_section_tips": ["improvements for About section"],
             "experience_highlighting": ["tips on highlighting relevant experience"],
-        }},
-        "industry_insights": {{
+        },
+        "industry_insights": {
             "trends": ["relevant and up-to-date industry trends"],
             "certifications": ["valuable certifications"],
             "thought_leaders": ["people to follow"]
-        }},
-        "summary": "brief summary of the overall career development advice based on the profile, resume, desired career path and the stage of career the user is at"
-    }}
+        }
+    }
     
     Note: Focus on providing genuine value to the career seeker. Consider both the LinkedIn profile and resume in your analysis to provide a comprehensive view of the user's current position and how to progress towards their desired career path.
-    """
+    """),
+    ]
+    prompt, report = assemble_prompt(sections, MAX_PROMPT_TOKENS)
+    logger.info("Career path prompt tokens: %s", report)
     
+    return _complete_json(client, "gpt-4.1-mini", prompt, "career_analysis", CAREER_ANALYSIS_SCHEMA,
+                          stream, on_section, use_cache)
+
+
+# Function to run an analysis once for all concurrent callers with the same key. Callers that
+# joined another's call get their own copy of the result, replayed through on_section.
+def _coalesced(key, on_section, run, *args):
+    result, shared = analysis_flights.do(key, run, *args)
+    if not shared:
+        return result
+    if result is None:
+        st.error("The analysis could not be completed. Please try again.")
+        return None
+    result = copy.deepcopy(result)
+    if on_section is not None:
+        for section, value in result.items():
+            on_section(section, value)
+    return result
+
+# Function to fingerprint analysis inputs; whitespace and case differences don't count
+def _input_digest(*texts):
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(" ".join((text or "").split()).casefold().encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+# Function to report how many analyses and company lookups were shared with an identical
+# call already in flight instead of being sent to the API
+def single_flight_stats():
+    return {"analyses": analysis_flights.stats(), "company_lookups": company_flights.stats()}
+
+# Function to report how often analyses were served from a near-duplicate job description
+def near_duplicate_stats():
+    return near_duplicates.stats()
+
+
+# Function to run a structured-output completion and return the validated result. With
+# stream=True the reply is streamed and on_section(key, value) is called for each top-level
+# key as soon as its value is complete, well before the whole reply has arrived. Sections
+# that come back missing, truncated or invalid are re-requested on their own instead of
+# regenerating the whole analysis. Complete results are stored in the response cache;
+# use_cache=False bypasses it for this call.
+def _complete_json(client, model, prompt, schema_name, schema, stream=False, on_section=None, use_cache=True):
+    from openai import RateLimitError
+
+    messages = [{"role": "user", "content": prompt}]
+    temperature = 0.2
+    # The whole response format is part of the key, so a changed schema doesn't get replies
+    # of the old shape
+    schema_format = response_format(schema_name, schema)
+    cache_key = response_cache.make_key(model, messages, temperature=temperature, response_format=schema_format)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
-        result = response.choices[0].message.content
-        
-        # Extract the JSON part from the response
-        json_pattern = r'({[\s\S]*})'
-        json_match = re.search(json_pattern, result)
-        
-        if json_match:
-            json_data = json.loads(json_match.group(0))
-            return json_data
+        result = response_cache.get(cache_key) if use_cache else None
+        cached = result is not None
+        if cached:
+            # Replay a cached reply through the same callback a live stream would drive
+            if stream and on_section is not None:
+                for key, value in IncrementalJSONParser().feed(result):
+                    on_section(key, value)
         else:
-            st.error("Failed to parse the API response.")
-            return None
-            
+            result = _create_completion(client, model, messages, temperature, schema_format, stream, on_section)
+    except RateLimitError as e:
+        st.error(f"The OpenAI API is rate limiting requests right now, please try again in a minute. ({e})")
+        return None
     except Exception as e:
         st.error(f"Error communicating with OpenAI API: {e}")
-        return None
\ No newline at end of file
+        return None
+
+    with span("json_parse", schema=schema_name, chars=len(result)):
+        json_data = parse_json_reply(result)
+    if not json_data:
+        st.error("Failed to parse the API response.")
+        return None
+
+    missing = invalid_sections(json_data, schema)
+    if missing:
+        json_data.update(_repair_sections(client, model, messages, result, schema_name, schema, missing, on_section))
+        missing = invalid_sections(json_data, schema)
+        if missing:
+            st.warning(f"Some parts of the analysis could not be generated: {', '.join(missing)}")
+            for key in missing:
+                json_data[key] = default_value(schema["properties"][key])
+
+    normalize_integers(json_data, schema)
+    if use_cache and not cached and not missing:
+        response_cache.put(cache_key, model, json.dumps(json_data))
+    return json_data
+
+# Function to generate a structured result as one completion per group of top-level keys,
+# run concurrently and merged in schema order, so the wall time approaches that of the
+# slowest section rather than the sum of all of them. Every request starts with the same
+# shared prompt, which the API's prompt caching can reuse. on_section is called on this
+# thread as each section completes.
+def _complete_sections(client, prompt, schema_name, schema, sections, on_section=None, use_cache=True):
+    # Keys the schema doesn't ask for are dropped, and so are groups left without any
+    sections = [(name, [key for key in keys if key in schema["properties"]], model) for name, keys, model in sections]
+    sections = [section for section in sections if section[1]]
+    results = asyncio.run(_gather_sections(client, prompt, schema_name, schema, sections, on_section, use_cache))
+
+    merged = {}
+    for result in results:
+        merged.update(result or {})
+    if not merged:
+        return None
+    missing = [key for key in schema["properties"] if key not in merged]
+    if missing:
+        st.warning(f"Some parts of the analysis could not be generated: {', '.join(missing)}")
+        for key in missing:
+            merged[key] = default_value(schema["properties"][key])
+    return {key: merged[key] for key in schema["properties"]}
+
+async def _gather_sections(client, prompt, schema_name, schema, sections, on_section, use_cache):
+    # Worker threads report errors and warnings to the calling Streamlit session, and trace
+    # their requests as part of the caller's analysis
+    ctx = get_script_run_ctx(suppress_warning=True)
+    parent = current_span()
+
+    def complete(name, keys, model):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        section_prompt = prompt + (
+            f"\n    For this request, produce only the following parts of the analysis: {', '.join(keys)}. "
+            "Reply with a JSON object containing just these keys."
+        )
+        with adopt(parent), span("section", section=name):
+            return _complete_json(client, model, section_prompt, f"{schema_name}_{name}", subschema(schema, keys),
+                                  use_cache=use_cache)
+
+    async def run(name, keys, model):
+        result = await asyncio.to_thread(complete, name, keys, model)
+        if result is not None and on_section is not None:
+            for key in keys:
+                on_section(key, result[key])
+        return result
+
+    return await asyncio.gather(*(run(*section) for section in sections))
+
+# Function to ask for just the given top-level sections of a reply again, with the broken
+# reply as context. Returns the sections that came back valid.
+def _repair_sections(client, model, messages, reply, schema_name, schema, keys, on_section=None):
+    repair_messages = messages + [
+        {"role": "assistant", "content": reply},
+        {"role": "user", "content": (
+            "These sections of your JSON reply were missing, cut off or invalid: " + ", ".join(keys) + ". "
+            "Reply with a JSON object containing only these sections, complete and following the requested structure."
+        )},
+    ]
+    try:
+        text = _create_completion(client, model, repair_messages, 0.2,
+                                  response_format(f"{schema_name}_repair", schema, keys))
+    except Exception as e:
+        st.warning(f"Error repairing the analysis: {e}")
+        return {}
+
+    repaired = parse_json_reply(text)
+    sections = {key: repaired[key] for key in keys
+                if key in repaired and is_valid(repaired[key], schema["properties"][key])}
+    if on_section is not None:
+        for key, value in sections.items():
+            on_section(key, value)
+    return sections
+
+# Function to run one chat completion through the model's rate limiter and return the reply
+# text, streaming it through on_section when stream=True
+def _create_completion(client, model, messages, temperature, response_format=None, stream=False, on_section=None):
+    params = {"model": model, "messages": messages, "temperature": temperature}
+    if response_format is not None:
+        params["response_format"] = response_format
+
+    tokens = sum(estimate_tokens(message["content"]) for message in messages) + COMPLETION_TOKEN_ESTIMATE
+    limiter = get_rate_limiter(model)
+    with span("completion", model=model, stream=stream):
+        if not stream:
+            raw = limiter.call(lambda: client.chat.completions.with_raw_response.create(**params), tokens)
+            completion = raw.parse()
+            record_usage(completion.model, completion.usage)
+            return completion.choices[0].message.content or ""
+
+        parser = IncrementalJSONParser()
+        chunks = []
+        # The token usage of a streamed reply comes in a last chunk without choices
+        raw = limiter.call(lambda: client.chat.completions.with_raw_response.create(
+            stream=True, stream_options={"include_usage": True}, **params), tokens)
+        for chunk in raw.parse():
+            if chunk.usage is not None:
+                record_usage(chunk.model, chunk.usage)
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            delta = chunk.choices[0].delta.content
+            chunks.append(delta)
+            for key, value in parser.feed(delta):
+                if on_section is not None:
+                    on_section(key, value)
+        return "".join(chunks)
+
+
+# Function to get the shared rate limiter for a model
+def get_rate_limiter(model):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(model)
+        if limiter is None:
+            limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM, max_retries=RATE_LIMIT_RETRIES)
+            _rate_limiters[model] = limiter
+    return limiter
+
+# Function to report queue depth, wait times and throttling per model, for sizing capacity
+def rate_limit_stats():
+    with _rate_limiters_lock:
+        limiters = dict(_rate_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
+
+# The caches, rate limiters, coalesced calls and near-duplicate index are exported with the
+# stage metrics when tracing is on (see tracing.py)
+register_collector("response_cache", response_cache.stats)
+register_collector("company_cache", company_cache.stats)
+register_collector("rate_limiter", rate_limit_stats, label="model")
+register_collector("single_flight", single_flight_stats, label="calls")
+register_collector("near_duplicates", near_duplicate_stats)
@@ -0,0 +1,171 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+# NumPy is imported where it is used, so that importing this module with the app doesn't
+# load it before the first analysis
+
+_SHINGLE_MULTIPLIER = 1000003
+
+# Links and e-mail addresses (tracking URLs, "apply at ..." footers) are left out of the fingerprint
+_LINKS = re.compile(r"https?://\S+|www\.\S+|\S+@\S+")
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+# Function to hash the word shingles of a text: lowercase words, `size` at a time, so
+# whitespace, punctuation and case don't matter and a moved bullet only changes the few
+# shingles that span its edges. Returns the distinct 32-bit hashes.
+def shingle_hashes(text, size=3):
+    import numpy as np
+
+    words = _WORDS.findall(_LINKS.sub(" ", (text or "").lower()))
+    tokens = np.fromiter((zlib.crc32(word.encode()) for word in words), dtype=np.uint64, count=len(words))
+    size = min(size, len(tokens))
+    if size == 0:
+        return tokens
+    count = len(tokens) - size + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    for i in range(size):
+        combined = combined * np.uint64(_SHINGLE_MULTIPLIER) + tokens[i:i + count]
+    return np.unique((combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+
+# Function to pick the LSH banding (bands, rows per band) that best separates pairs above
+# and below the threshold. A pair with Jaccard similarity s lands in a shared bucket with
+# probability 1 - (1 - s^rows)^bands. Candidates are checked against the full signature
+# anyway, so a missed near-duplicate is weighted much more than an extra candidate.
+def optimal_bands(threshold, num_perm, false_negative_weight=0.95):
+    import numpy as np
+
+    similarities = np.linspace(0, 1, 1001)
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            candidate = 1 - (1 - similarities ** rows) ** bands
+            false_positives = candidate[similarities < threshold].sum()
+            false_negatives = (1 - candidate[similarities >= threshold]).sum()
+            error = (1 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+# In-memory index of texts by MinHash signature with LSH buckets, for finding an earlier
+# text that is nearly the same as a new one (estimated Jaccard similarity of their shingles
+# at least `threshold`). Entries are grouped by a scope, e.g. the resume a job description
+# was analyzed with, and only match within it. Each lookup hashes the text once and checks
+# one bucket per band, so its cost doesn't grow with the number of entries. The least
+# recently used entries are evicted past max_entries. The banding and hash functions are
+# set up on first use.
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=3, max_entries=10000, enabled=True, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.seed = seed
+        self.bands = self.rows = None
+        self._a = self._b = None
+        self._setup_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self._hit_similarity = 0.0
+
+    def _setup(self):
+        import numpy as np
+
+        with self._setup_lock:
+            if self._a is None:
+                self.bands, self.rows = optimal_bands(self.threshold, self.num_perm)
+                rng = np.random.default_rng(self.seed)
+                # Multiply-shift hash functions, ((a * x + b) mod 2^64) >> 32 with odd a, one per permutation
+                a = rng.integers(0, 1 << 63, self.num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+                self._b = rng.integers(0, 1 << 63, self.num_perm, dtype=np.uint64)
+                # Set last: signature() only takes the lock while _a is unset
+                self._a = a
+
+    # Function to compute the MinHash signature of a text, or None when it has no words
+    def signature(self, text):
+        import numpy as np
+
+        if self._a is None:
+            self._setup()
+        shingles = shingle_hashes(text, self.shingle_size)
+        if len(shingles) == 0:
+            return None
+        # uint64 arithmetic wraps around, which is the mod 2^64
+        return ((shingles[:, None] * self._a + self._b) >> np.uint64(32)).min(axis=0)
+
+    def _bucket_keys(self, scope, signature):
+        return [hash((scope, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()))
+                for band in range(self.bands)]
+
+    # Function to find the stored value whose text is most similar to `text` within scope.
+    # Returns (value, estimated similarity), or None when nothing reaches the threshold.
+    def lookup(self, scope, text):
+        if not self.enabled:
+            return None
+        signature = self.signature(text)
+        with self._lock:
+            self.lookups += 1
+            if signature is None:
+                return None
+            candidates = set()
+            for key in self._bucket_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+            best = None
+            for entry_id in candidates:
+                entry_scope, entry_signature, value, _ = self._entries[entry_id]
+                if entry_scope != scope:
+                    continue
+                similarity = float((entry_signature == signature).sum()) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (entry_id, value, similarity)
+            if best is None:
+                return None
+            self._entries.move_to_end(best[0])
+            self.hits += 1
+            self._hit_similarity += best[2]
+            return best[1], best[2]
+
+    def add(self, scope, text, value):
+        if not self.enabled:
+            return
+        signature = self.signature(text)
+        if signature is None:
+            return
+        keys = self._bucket_keys(scope, signature)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, signature, value, keys)
+            for key in keys:
+                self._buckets.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        entry_id, (_, _, _, keys) = self._entries.popitem(last=False)
+        for key in keys:
+            bucket = self._buckets[key]
+            bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "mean_hit_similarity": round(self._hit_similarity / self.hits, 3) if self.hits else 0.0,
+                "bands": self.bands,
+                "rows": self.rows,
+            }
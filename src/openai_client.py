@@ -0,0 +1,57 @@
+import os
+import threading
+
+# Connection pool and timeout settings shared by every OpenAI client this process creates
+MAX_CONNECTIONS = int(os.environ.get("NEXTCV_OPENAI_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("NEXTCV_OPENAI_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.environ.get("NEXTCV_OPENAI_KEEPALIVE_EXPIRY", "60"))
+CONNECT_TIMEOUT = float(os.environ.get("NEXTCV_OPENAI_CONNECT_TIMEOUT", "10"))
+REQUEST_TIMEOUT = float(os.environ.get("NEXTCV_OPENAI_TIMEOUT", "120"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+_injected_client = None
+
+
+# Function to get the process-wide client for an API key and base URL. Clients are created
+# once and reused across calls and sessions, so their pooled keep-alive connections skip
+# the TCP and TLS handshakes on every analysis after the first.
+def get_client(api_key, base_url=None):
+    if _injected_client is not None:
+        return _injected_client
+
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # The SDK is imported with the first client, not at app startup
+            from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI, Timeout
+
+            # The SDK's own connection-limits class, so pool settings match the HTTP library it is built on
+            Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+            timeout = Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                # Retries are left to the rate limiter, which backs off across all callers
+                max_retries=0,
+                http_client=DefaultHttpxClient(
+                    timeout=timeout,
+                    limits=Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
+            _clients[key] = client
+    return client
+
+
+# Function to make every call use the given client, for example one pointing at a local
+# mock server; pass None to go back to the pooled clients
+def set_client(client):
+    global _injected_client
+    _injected_client = client
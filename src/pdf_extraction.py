@@ -0,0 +1,126 @@
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from text_normalization import normalize_pdf_page
+from tracing import span
+
+# PDFs with fewer pages than this are extracted on the calling thread; starting workers
+# and shipping the file to them costs more than it saves on a typical 1-3 page resume
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("NEXTCV_PDF_PARALLEL_THRESHOLD", "40"))
+PAGES_PER_CHUNK = int(os.environ.get("NEXTCV_PDF_PAGES_PER_CHUNK", "8"))
+# The pool is started with the app (see warm_pool), so it is kept small by default
+MAX_WORKERS = int(os.environ.get("NEXTCV_PDF_WORKERS", "0")) or min(os.cpu_count() or 1, 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+_warmup = []
+_documents = itertools.count()
+
+# In a worker process: the document it last opened, as (document id, PdfReader)
+_worker_document = None
+
+
+# One pool per process, shared by all sessions. Workers are spawned rather than forked
+# because the Streamlit server is multi-threaded.
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+# Function to start the pool's workers in the background. Spawning them and importing
+# PyPDF2 takes seconds, far longer than extracting even a long resume on the calling thread,
+# so large PDFs only go to the pool once it is warm. Does nothing where the pool is never used.
+def warm_pool():
+    if MAX_WORKERS < 2 or _warmup:
+        return
+    executor = _get_executor()
+    with _executor_lock:
+        if not _warmup:
+            _warmup.extend(executor.submit(os.getpid) for _ in range(MAX_WORKERS))
+
+
+# Function to check whether the pool's workers are up and can take pages
+def pool_ready():
+    return bool(_warmup) and all(future.done() for future in _warmup)
+
+
+# Function to stop the pool's workers; warm_pool starts a new pool
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+        _warmup.clear()
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def _init_worker():
+    import PyPDF2  # noqa: F401
+
+
+# Runs in a worker process. PdfReader can't be pickled, so each worker opens the document
+# itself, once: the ranges of one document that land on the same worker reuse its reader.
+def _extract_page_range(document_id, data, start, stop):
+    global _worker_document
+    import PyPDF2
+    if _worker_document is None or _worker_document[0] != document_id:
+        _worker_document = (document_id, PyPDF2.PdfReader(io.BytesIO(data)))
+    pdf_reader = _worker_document[1]
+    return [normalize_pdf_page(pdf_reader.pages[i].extract_text()) for i in range(start, stop)]
+
+
+# Function to yield the cleaned text of each page in page order. Large documents are split
+# into page ranges that are extracted across the process pool, once it is warm; pages are
+# yielded as soon as every page before them is done, so callers can show a progressive
+# preview. Parsing and cleanup are traced per page on the calling thread; pages extracted
+# in the pool only count towards the caller's extract_text span.
+def iter_pdf_pages(data):
+    # PyPDF2 is imported on first use to keep it out of app startup
+    import PyPDF2
+    with span("pdf_open", bytes=len(data)):
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(pdf_reader.pages)
+
+    large = page_count >= PARALLEL_PAGE_THRESHOLD and MAX_WORKERS >= 2
+    use_pool = large and pool_ready()
+    if large and not use_pool:
+        # Extracting here beats waiting for cold workers; the next large PDF gets the pool
+        warm_pool()
+    if not use_pool:
+        for page in pdf_reader.pages:
+            with span("pdf_parse"):
+                page_text = page.extract_text()
+            with span("text_cleanup"):
+                page_text = normalize_pdf_page(page_text)
+            yield page_text
+        return
+
+    executor = _get_executor()
+    document_id = (os.getpid(), next(_documents))
+    futures = {
+        executor.submit(_extract_page_range, document_id, data, start, min(start + PAGES_PER_CHUNK, page_count)): start
+        for start in range(0, page_count, PAGES_PER_CHUNK)
+    }
+    try:
+        finished = {}
+        next_start = 0
+        for future in as_completed(futures):
+            finished[futures[future]] = future.result()
+            while next_start in finished:
+                yield from finished.pop(next_start)
+                next_start += PAGES_PER_CHUNK
+    finally:
+        # Stop queued ranges if the caller gave up early or a range failed
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,74 @@
+import re
+from collections import namedtuple
+
+# A named piece of a prompt. Sections with a trim_rank may be shortened to fit the token
+# budget, lowest rank first, but never below min_tokens. Sections without one (instructions,
+# the output format) are always sent in full.
+PromptSection = namedtuple("PromptSection", "name text trim_rank min_tokens", defaults=(None, 0))
+
+# Words, digit groups and single symbols, roughly the units BPE tokenizers split English into
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+_TRUNCATION_NOTE = "\n[...truncated to fit the input budget]"
+
+
+# Function to estimate the token count of a text offline, without a tokenizer vocabulary.
+# Long words are counted as several tokens and digits in groups of three, which tracks the
+# OpenAI tokenizers closely on resume-style text and errs on the high side.
+def estimate_tokens(text):
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1 + (len(piece) - 1) // 8
+    return tokens
+
+
+# Function to assemble a prompt from sections within max_tokens. Returns the prompt and a
+# report with the estimated tokens per section, the total and what was trimmed.
+def assemble_prompt(sections, max_tokens):
+    texts = [section.text for section in sections]
+    counts = [estimate_tokens(text) for text in texts]
+    trimmed = {}
+
+    excess = sum(counts) - max_tokens
+    trimmable = sorted(
+        (i for i, section in enumerate(sections) if section.trim_rank is not None),
+        key=lambda i: sections[i].trim_rank,
+    )
+    for i in trimmable:
+        if excess <= 0:
+            break
+        target = max(sections[i].min_tokens, counts[i] - excess)
+        if target >= counts[i]:
+            continue
+        texts[i] = _truncate(texts[i], counts[i], target)
+        new_count = estimate_tokens(texts[i])
+        trimmed[sections[i].name] = trimmed.get(sections[i].name, 0) + counts[i] - new_count
+        excess -= counts[i] - new_count
+        counts[i] = new_count
+
+    breakdown = {}
+    for section, count in zip(sections, counts):
+        breakdown[section.name] = breakdown.get(section.name, 0) + count
+    report = {
+        "total_tokens": sum(counts),
+        "max_tokens": max_tokens,
+        "sections": breakdown,
+        "trimmed": trimmed,
+    }
+    return "\n".join(texts), report
+
+
+# Keep the start of the text, cut at a line or word boundary near the target size
+def _truncate(text, tokens, target):
+    keep = int(len(text) * (target - estimate_tokens(_TRUNCATION_NOTE)) / tokens)
+    if keep <= 0:
+        return ""
+    cut = text.rfind("\n", 0, keep)
+    if cut < keep // 2:
+        cut = text.rfind(" ", 0, keep)
+    if cut < keep // 2:
+        cut = keep
+    return text[:cut] + _TRUNCATION_NOTE
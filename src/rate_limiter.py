@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from collections import deque
+
+
+# A per-minute budget that refills continuously. The level may go below zero when the
+# server reports less headroom than we expected.
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    # Seconds until `amount` can be taken; requests larger than the whole bucket only wait for a full one
+    def time_until(self, amount, now):
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+    def consume(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    # Adopt the limit and remaining headroom the server reported
+    def observe(self, limit, remaining, now):
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining), self.capacity)
+
+
+# Client-side limiter shared by every thread that calls one model. Callers are admitted in
+# arrival order once both the requests-per-minute and tokens-per-minute budgets allow, the
+# budgets follow the x-ratelimit-* headers of each response, and a 429 pauses the whole
+# queue for a jittered, exponentially growing delay (or the server's retry-after).
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._paused_until = 0.0
+        self._admitted = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._throttled = 0
+        self._retries = 0
+
+    # Blocks until the caller may send a request estimated at `tokens`. A retry keeps its
+    # place at the head of the queue instead of going to the back.
+    def acquire(self, tokens, retry=False):
+        ticket = object()
+        with self._condition:
+            if retry:
+                self._queue.appendleft(ticket)
+            else:
+                self._queue.append(ticket)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            started = time.monotonic()
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = None
+                    if self._queue[0] is ticket:
+                        delay = max(
+                            self._paused_until - now,
+                            self.requests.time_until(1, now),
+                            self.tokens.time_until(tokens, now),
+                        )
+                        if delay <= 0:
+                            break
+                    self._condition.wait(delay)
+                self.requests.consume(1, now)
+                self.tokens.consume(tokens, now)
+            finally:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+
+            waited = now - started
+            self._admitted += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return waited
+
+    # Function to send a request through the limiter, retrying rate-limit, connection and
+    # server errors with backoff. `request` returns a raw response whose headers are read
+    # to adapt the budgets.
+    def call(self, request, tokens):
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, retry=attempt > 0)
+            try:
+                response = request()
+            except RateLimitError as e:
+                # An exhausted quota won't recover by waiting
+                if attempt == self.max_retries or getattr(e, "code", None) == "insufficient_quota":
+                    raise
+                delay = max(self._backoff(attempt), _retry_after(e.response.headers))
+                with self._condition:
+                    self._throttled += 1
+                    self._retries += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    self._condition.notify_all()
+                continue
+            except (APIConnectionError, InternalServerError):
+                if attempt == self.max_retries:
+                    raise
+                with self._condition:
+                    self._retries += 1
+                time.sleep(self._backoff(attempt))
+                continue
+
+            headers = getattr(response, "headers", None)
+            if headers is not None:
+                self.observe(headers)
+            return response
+
+    # Function to adapt the budgets to the x-ratelimit-* headers of a response
+    def observe(self, headers):
+        with self._condition:
+            now = time.monotonic()
+            self.requests.observe(_header_number(headers, "x-ratelimit-limit-requests"),
+                                  _header_number(headers, "x-ratelimit-remaining-requests"), now)
+            self.tokens.observe(_header_number(headers, "x-ratelimit-limit-tokens"),
+                                _header_number(headers, "x-ratelimit-remaining-tokens"), now)
+            self._condition.notify_all()
+
+    # Full jitter: a random delay up to the exponentially growing cap
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def stats(self):
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "requests": self._admitted,
+                "total_wait_seconds": round(self._total_wait, 3),
+                "mean_wait_seconds": round(self._total_wait / self._admitted, 3) if self._admitted else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+            }
+
+
+def _header_number(headers, name):
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# Seconds the server asked us to wait, from retry-after-ms or retry-after
+def _retry_after(headers):
+    milliseconds = _header_number(headers, "retry-after-ms")
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return _header_number(headers, "retry-after") or 0.0
@@ -0,0 +1,105 @@
+import re
+import threading
+from collections import OrderedDict
+
+from prompt_builder import estimate_tokens
+from skill_matcher import get_matcher
+
+# Headings resumes commonly use in title case. All-caps lines are taken as headings too,
+# except the first line, which is usually the candidate's name.
+_HEADINGS = {
+    "summary", "professional summary", "profile", "objective", "experience", "work experience",
+    "professional experience", "employment history", "education", "skills", "technical skills",
+    "projects", "certifications", "awards", "publications", "languages", "interests",
+    "volunteer experience", "leadership", "activities",
+}
+_ALL_CAPS_HEADING = re.compile(r"^[A-Z][A-Z&/ ]{2,39}$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Function to split resume text into (heading, body) pairs. Text before the first heading
+# (usually the name and contact details) comes under an empty heading.
+def split_sections(text):
+    sections = []
+    heading, lines, started = "", [], False
+    for line in text.splitlines():
+        stripped = line.strip().rstrip(":")
+        if stripped.casefold() in _HEADINGS or (started and _ALL_CAPS_HEADING.match(stripped)):
+            if started:
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines, started = stripped, [], True
+        else:
+            lines.append(line)
+            started = started or bool(stripped)
+    if started:
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+
+# One resume's extracted text and what is derived from it. Derived values are computed on
+# first use and kept with the text, so every tab and rerun that shows this resume shares them.
+# It holds nothing about who uploaded it: the same content from two sessions is one entry,
+# so per-upload details such as the file name stay in the session.
+class StoredResume:
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def _derive(self, name, build):
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.text)
+            return self._derived[name]
+
+    # Lowercase text with whitespace runs collapsed, for comparisons and lookups that
+    # shouldn't depend on line breaks or case
+    @property
+    def normalized_text(self):
+        return self._derive("normalized_text", lambda text: _WHITESPACE.sub(" ", text).strip().casefold())
+
+    @property
+    def sections(self):
+        return self._derive("sections", split_sections)
+
+    @property
+    def token_count(self):
+        return self._derive("token_count", estimate_tokens)
+
+    # The taxonomy skills the resume mentions, with how often
+    @property
+    def skills(self):
+        return self._derive("skills", get_matcher().find_skills)
+
+
+# Bounded LRU store of resumes keyed by a hash of the uploaded content, shared by both tabs
+# and all sessions. A resume uploaded twice, in either tab, is one StoredResume.
+class ResumeStore:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            resume = self._entries.get(key)
+            if resume is not None:
+                self._entries.move_to_end(key)
+            return resume
+
+    # Function to store extracted text under key; if another caller stored it first, that
+    # resume is returned so everyone shares one copy
+    def put(self, key, text):
+        with self._lock:
+            resume = self._entries.get(key)
+            if resume is None:
+                resume = self._entries[key] = StoredResume(key, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return resume
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries)}
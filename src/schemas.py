@@ -0,0 +1,209 @@
+from typing import List, Literal, TypedDict, get_args, get_origin, get_type_hints
+
+# Typed models of the analysis results. They are the single source of truth for the JSON
+# schema sent with structured-output requests (see json_schema) and for validating replies.
+# Field order matters: structured output generates keys in schema order, so the headline
+# fields come first and can be rendered while the rest is still streaming.
+
+Priority = Literal["high", "medium", "low"]
+Level = Literal["Beginner", "Intermediate", "Advanced"]
+
+
+class RecommendedSkill(TypedDict):
+    skill: str
+    category: str
+    priority: Priority
+    prerequisites: List[str]
+    estimated_time: str
+    resources: List[str]
+
+
+class SkillMatch(TypedDict):
+    matched_skills: List[str]
+    missing_skills: List[str]
+    recommended_skills: List[RecommendedSkill]
+
+
+class ContentImprovements(TypedDict):
+    sections_to_improve: List[str]
+    wording_suggestions: List[str]
+    format_suggestions: List[str]
+
+
+class CompanyInsights(TypedDict):
+    company_specific_skills: List[str]
+    company_projects: List[str]
+    networking_opportunities: List[str]
+    company_resources: List[str]
+
+
+class ResumeAnalysis(TypedDict):
+    match_percentage: int
+    summary: str
+    skill_match: SkillMatch
+    content_improvements: ContentImprovements
+    company_specific_insights: CompanyInsights
+
+
+class NarrativeSkillMatch(TypedDict):
+    recommended_skills: List[RecommendedSkill]
+
+
+# The resume analysis minus the fields the local skill matcher computes
+class ResumeNarrative(TypedDict):
+    summary: str
+    skill_match: NarrativeSkillMatch
+    content_improvements: ContentImprovements
+    company_specific_insights: CompanyInsights
+
+
+class CareerAlignment(TypedDict):
+    alignment_score: int
+    strengths: List[str]
+    gaps: List[str]
+
+
+class NetworkingStrategy(TypedDict):
+    key_connections: List[str]
+    communities: List[str]
+    engagement_tactics: List[str]
+
+
+class TechnicalSkill(TypedDict):
+    skill: str
+    priority: Priority
+    resources: List[str]
+    current_level: Level
+    gap_analysis: str
+
+
+class SoftSkill(TypedDict):
+    skill: str
+    priority: Priority
+    development_approaches: List[str]
+    current_level: Level
+    gap_analysis: str
+
+
+class SkillDevelopment(TypedDict):
+    technical_skills: List[TechnicalSkill]
+    soft_skills: List[SoftSkill]
+
+
+class ProfileOptimization(TypedDict):
+    headline_suggestions: List[str]
+    about_section_tips: List[str]
+    experience_highlighting: List[str]
+
+
+class IndustryInsights(TypedDict):
+    trends: List[str]
+    certifications: List[str]
+    thought_leaders: List[str]
+
+
+class CareerAnalysis(TypedDict):
+    career_alignment: CareerAlignment
+    summary: str
+    networking_strategy: NetworkingStrategy
+    skill_development: SkillDevelopment
+    profile_optimization: ProfileOptimization
+    industry_insights: IndustryInsights
+
+
+# Function to build a strict JSON schema from a typed model
+def json_schema(model):
+    if model is str:
+        return {"type": "string"}
+    if model is int:
+        return {"type": "integer"}
+    if get_origin(model) is Literal:
+        return {"type": "string", "enum": list(get_args(model))}
+    if get_origin(model) in (list, List):
+        return {"type": "array", "items": json_schema(get_args(model)[0])}
+    fields = get_type_hints(model)
+    return {
+        "type": "object",
+        "properties": {name: json_schema(field) for name, field in fields.items()},
+        "required": list(fields),
+        "additionalProperties": False,
+    }
+
+
+# Function to restrict an object schema to some of its top-level keys
+def subschema(schema, keys):
+    return dict(
+        schema,
+        properties={key: schema["properties"][key] for key in keys},
+        required=list(keys),
+    )
+
+
+# Function to wrap a schema, or the subset of its top-level keys, as an OpenAI response_format
+def response_format(name, schema, keys=None):
+    if keys is not None:
+        schema = subschema(schema, keys)
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+
+
+# Function to check a value against a schema built by json_schema. Extra object keys are
+# tolerated, and whole numbers sent as floats or numeric strings are accepted for integers.
+def is_valid(value, schema):
+    kind = schema["type"]
+    if kind == "object":
+        return isinstance(value, dict) and all(
+            key in value and is_valid(value[key], sub_schema)
+            for key, sub_schema in schema["properties"].items()
+        )
+    if kind == "array":
+        return isinstance(value, list) and all(is_valid(item, schema["items"]) for item in value)
+    if kind == "integer":
+        return _as_int(value) is not None
+    if "enum" in schema:
+        return value in schema["enum"]
+    return isinstance(value, str)
+
+
+# Function to list the top-level keys of a reply that are missing or don't match the schema
+def invalid_sections(data, schema):
+    return [key for key, sub_schema in schema["properties"].items()
+            if key not in data or not is_valid(data[key], sub_schema)]
+
+
+# Function to coerce valid integer-like values (85.0, "85") to int, in place
+def normalize_integers(data, schema):
+    for key, sub_schema in schema["properties"].items():
+        if sub_schema["type"] == "integer" and key in data:
+            data[key] = _as_int(data[key])
+        elif sub_schema["type"] == "object" and isinstance(data.get(key), dict):
+            normalize_integers(data[key], sub_schema)
+    return data
+
+
+# Function to build an empty value of the right shape, used for sections that could not be generated
+def default_value(schema):
+    kind = schema["type"]
+    if kind == "object":
+        return {key: default_value(sub_schema) for key, sub_schema in schema["properties"].items()}
+    if kind == "array":
+        return []
+    if kind == "integer":
+        return 0
+    return ""
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+RESUME_ANALYSIS_SCHEMA = json_schema(ResumeAnalysis)
+RESUME_NARRATIVE_SCHEMA = json_schema(ResumeNarrative)
+CAREER_ANALYSIS_SCHEMA = json_schema(CareerAnalysis)
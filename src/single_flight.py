@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import Future
+
+
+# Raised to the followers of a call whose leader was stopped without an error of its own
+class _LeaderStopped(Exception):
+    pass
+
+
+# Coalesces concurrent calls by key: while a call for a key is in flight, later callers with
+# the same key wait for it and share its result (or exception) instead of starting their own.
+# Nothing is kept once the call finishes; that is the caches' job.
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._saved = 0
+
+    # Function to run fn(*args) once per key in flight. Returns (result, shared), where
+    # shared is True when the result came from another caller's call. Only Exception
+    # subclasses are shared: when the leader is stopped by anything else (Streamlit's
+    # StopException and RerunException are BaseExceptions that stop or rerun the leader's
+    # own session), its followers start over and one of them runs fn itself.
+    def do(self, key, fn, *args, **kwargs):
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self._executed += 1
+                else:
+                    self._saved += 1
+
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except _LeaderStopped:
+                with self._lock:
+                    self._saved -= 1
+
+        # The key is forgotten before the future completes, so a follower that starts over
+        # never finds the finished call still in flight
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._forget(key, future)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._forget(key, future)
+            future.set_exception(_LeaderStopped())
+            raise
+        self._forget(key, future)
+        future.set_result(result)
+        return result, False
+
+    # Function to start fn(*args) on an executor unless a call for the key is already in
+    # flight; either way returns the future for its result
+    def submit(self, key, executor, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._saved += 1
+                return future
+            future = executor.submit(fn, *args)
+            self._calls[key] = future
+            self._executed += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self._executed, "saved": self._saved}
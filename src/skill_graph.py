@@ -0,0 +1,282 @@
+import heapq
+import os
+import re
+import unicodedata
+
+import networkx as nx
+
+from skill_matcher import get_matcher, tokenize
+
+ROOT = "desired-job"
+PRIORITIES = ["high", "medium", "low"]
+
+# Graphs larger than this are cut down to the most important skills before rendering
+MAX_NODES = int(os.environ.get("NEXTCV_SKILL_GRAPH_MAX_NODES", "60"))
+MAX_EDGES = int(os.environ.get("NEXTCV_SKILL_GRAPH_MAX_EDGES", "120"))
+
+# Version suffixes that don't make a different skill ("Python 3", "Angular 2+", "ES6 v2")
+_VERSION = re.compile(r"^(?:v?\d+(?:\.\d+)*(?:\.x|\+)?|x)$")
+# Words of a skill name in any script, with the symbols that are part of skill names
+_WORDS = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+
+# Cytoscape styles for the graph's node types
+CYTOSCAPE_STYLES = [
+    {
+        'selector': 'node',
+        'style': {
+            'label': 'data(label)',
+            'text-valign': 'center',
+            'text-halign': 'center',
+            'font-size': '12px',
+            'width': '30px',
+            'height': '30px',
+            'padding': '5px'
+        }
+    },
+    {
+        'selector': 'edge',
+        'style': {
+            'width': 2,
+            'curve-style': 'bezier',
+            'target-arrow-shape': 'triangle',
+            'line-color': '#888',
+            'target-arrow-color': '#888',
+            'opacity': 0.8
+        }
+    },
+    {
+        'selector': 'node[type="root"]',
+        'style': {
+            'background-color': '#6E7C7C',
+            'font-weight': 'bold',
+            'font-size': '16px'
+        }
+    },
+    {
+        'selector': 'node[type="high"]',
+        'style': {
+            'background-color': '#E63946',
+        }
+    },
+    {
+        'selector': 'node[type="medium"]',
+        'style': {
+            'background-color': '#F9C74F'
+        }
+    },
+    {
+        'selector': 'node[type="low"]',
+        'style': {
+            'background-color': '#90BE6D'
+        }
+    },
+    {
+        'selector': 'node[type="prerequisite"]',
+        'style': {
+            'background-color': '#43AA8B',
+            'font-size': '12px',
+        }
+    },
+    {
+        'selector': '.highlighted',
+        'style': {
+            'border-width': '3px',
+            'border-color': '#000',
+            'border-opacity': 1,
+            'z-index': 999
+        }
+    },
+    {
+        'selector': '.hover',
+        'style': {
+            'border-width': '2px',
+            'border-color': '#fff',
+            'border-opacity': 1,
+            'z-index': 999
+        }
+    }
+]
+
+
+# Function to get the node key of a skill name, so "Python", "python" and "Python 3" (or
+# "PyTorch" and "torch") become one node. Names the skill taxonomy knows, with or without a
+# version suffix, map to its entry; other names, in any script, are compared by their
+# casefolded words. Returns "" for a name with no words at all.
+def skill_key(name):
+    normalized = unicodedata.normalize("NFKC", name or "").casefold()
+    words = _WORDS.findall(normalized)
+    # The taxonomy's aliases are ASCII, so only all-ASCII names can be one of them
+    if words and all(word.isascii() for word in words):
+        tokens = tokenize(normalized)
+        matcher = get_matcher()
+        unversioned = list(tokens)
+        while len(unversioned) > 1 and _VERSION.match(unversioned[-1]):
+            unversioned.pop()
+        canonical = matcher.canonical_name(" ".join(tokens)) or matcher.canonical_name(" ".join(unversioned))
+        if canonical:
+            return canonical.casefold()
+    return " ".join(words)
+
+
+# Function to build the skill development graph from the recommended skills: an edge runs
+# from the desired job to each skill and from each skill to its prerequisites. Duplicates
+# are merged by skill_key, cycles are broken, the graph is cut to max_nodes/max_edges
+# (dropping low-priority skills and rarely shared prerequisites first) and edges implied by
+# a longer path are removed. graph.graph records what was dropped.
+def build_skill_graph(recommended_skills, max_nodes=MAX_NODES, max_edges=MAX_EDGES):
+    graph = nx.DiGraph()
+    graph.add_node(ROOT, label="Desired Job", type="root", info="")
+
+    ordered = sorted(recommended_skills, key=lambda skill: _priority_rank(skill.get("priority")))
+    # Skills whose name has no words are left out, along with their prerequisites
+    keyed = [(skill_key(skill_data.get("skill")), skill_data) for skill_data in ordered]
+    keyed = [(key, skill_data) for key, skill_data in keyed if key and key != ROOT]
+    for key, skill_data in keyed:
+        if key in graph:
+            continue
+        priority = skill_data.get("priority") if skill_data.get("priority") in PRIORITIES else "low"
+        graph.add_node(key, label=skill_data["skill"], type=priority, info=(
+            f"Priority: {priority.title()}\nCategory: {skill_data.get('category', '')}\n"
+            f"Est. Time: {skill_data.get('estimated_time', '')}"
+        ))
+        graph.add_edge(ROOT, key)
+
+    for key, skill_data in keyed:
+        for prereq in skill_data.get("prerequisites") or []:
+            prereq_key = skill_key(prereq)
+            if not prereq_key or prereq_key in (key, ROOT):
+                continue
+            if prereq_key not in graph:
+                graph.add_node(prereq_key, label=prereq, type="prerequisite")
+            graph.add_edge(key, prereq_key)
+
+    removed = _break_cycles(graph)
+    omitted = _cap_nodes(graph, max_nodes)
+    reduced = _reduce(graph)
+    while max_edges is not None and reduced.number_of_edges() > max_edges and len(graph) > 1:
+        omitted += _cap_nodes(graph, len(graph) - 1)
+        reduced = _reduce(graph)
+
+    for node, data in reduced.nodes(data=True):
+        if data["type"] == "prerequisite":
+            dependents = [reduced.nodes[source]["label"] for source in graph.predecessors(node)]
+            data["info"] = "Prerequisite for: " + ", ".join(dependents)
+    reduced.graph.update(removed_cycle_edges=removed, omitted=omitted)
+    return reduced
+
+
+# Function to place the nodes of a skill graph in layers, top to bottom: each node sits one
+# layer below its deepest parent, and within a layer nodes are ordered by the average x of
+# their parents to keep edges from crossing. Returns {node: {"x": ..., "y": ...}}, computed
+# once here so the browser doesn't have to run a layout.
+def layered_layout(graph, layer_spacing=90, node_gap=30):
+    positions = {}
+    for depth, layer in enumerate(nx.topological_generations(graph)):
+        def barycenter(node):
+            parents = [positions[parent]["x"] for parent in graph.predecessors(node)]
+            return sum(parents) / len(parents) if parents else 0
+
+        layer = sorted(layer, key=barycenter)
+        # Room for each label, which is drawn across the node
+        widths = [max(30, 7 * len(graph.nodes[node]["label"])) for node in layer]
+        x = -(sum(widths) + node_gap * (len(layer) - 1)) / 2
+        for node, width in zip(layer, widths):
+            positions[node] = {"x": round(x + width / 2), "y": depth * layer_spacing}
+            x += width + node_gap
+    return positions
+
+
+# Function to convert a skill graph into Cytoscape node and edge elements, with preset
+# positions when given
+def to_cytoscape(graph, positions=None):
+    ids = {}
+    nodes = []
+    for node, data in graph.nodes(data=True):
+        if node == ROOT:
+            ids[node] = ROOT
+        else:
+            prefix = "prereq" if data["type"] == "prerequisite" else "skill"
+            ids[node] = f"{prefix}-{len(nodes)}"
+        element = {'data': {'id': ids[node], 'label': data["label"], 'type': data["type"], 'info': data["info"]}}
+        if positions is not None:
+            element['position'] = positions[node]
+        nodes.append(element)
+    edges = [{'data': {'source': ids[source], 'target': ids[target]}} for source, target in graph.edges]
+    return nodes, edges
+
+
+def _priority_rank(priority):
+    return PRIORITIES.index(priority) if priority in PRIORITIES else len(PRIORITIES)
+
+
+# Remove the back edges of a depth-first search from the root, the edges that close a
+# cycle, in one pass. Returns the removed edges as label pairs.
+def _break_cycles(graph):
+    on_stack = set()
+    back_edges = []
+    for source, target, kind in nx.dfs_labeled_edges(graph, source=ROOT):
+        if kind == "forward":
+            on_stack.add(target)
+        elif kind == "reverse":
+            on_stack.discard(target)
+        elif kind == "nontree" and target in on_stack:
+            back_edges.append((source, target))
+    graph.remove_edges_from(back_edges)
+    return [(graph.nodes[source]["label"], graph.nodes[target]["label"]) for source, target in back_edges]
+
+
+# Drop the least important node, one at a time, until at most max_nodes are left.
+# Prerequisites are scored by how many of the remaining skills need them: one needed by a
+# single skill goes before any skill, one shared by several ranks with the most important
+# skill that needs it, ahead of the skills of that priority. Skills rank by priority.
+# Returns the labels of the dropped nodes.
+def _cap_nodes(graph, max_nodes):
+    if max_nodes is None or len(graph) <= max_nodes:
+        return []
+    order = {node: i for i, node in enumerate(graph)}
+
+    def importance(node):
+        data = graph.nodes[node]
+        if node == ROOT:
+            return (-1, 0, 0, 0)
+        if data["type"] != "prerequisite":
+            return (_priority_rank(data["type"]), 1, 0, order[node])
+        dependents = list(graph.predecessors(node))
+        if len(dependents) < 2:
+            return (len(PRIORITIES), 0, -len(dependents), order[node])
+        rank = min(_priority_rank(graph.nodes[dependent]["type"]) for dependent in dependents)
+        return (rank, 0, -len(dependents), order[node])
+
+    # Max-heap of the nodes by importance. Dropping a skill changes only the scores of its
+    # prerequisites, which are pushed again; outdated entries are skipped when popped.
+    scores = {node: importance(node) for node in graph}
+    heap = [(tuple(-x for x in score), node) for node, score in scores.items()]
+    heapq.heapify(heap)
+    labels = []
+    while len(graph) > max(max_nodes, 1):
+        score, node = heapq.heappop(heap)
+        if node not in graph or scores[node] != tuple(-x for x in score):
+            continue
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            successors = list(graph.successors(node))
+            labels.append(graph.nodes[node]["label"])
+            graph.remove_node(node)
+            for successor in successors:
+                # Prerequisites of a dropped skill that nothing else needs go too
+                if graph.in_degree(successor) == 0:
+                    pending.append(successor)
+                else:
+                    scores[successor] = importance(successor)
+                    heapq.heappush(heap, (tuple(-x for x in scores[successor]), successor))
+    return labels
+
+
+# Transitive reduction that keeps node attributes and insertion order
+def _reduce(graph):
+    reduced = nx.transitive_reduction(graph)
+    result = nx.DiGraph()
+    result.add_nodes_from(graph.nodes(data=True))
+    result.add_edges_from(edge for edge in graph.edges if reduced.has_edge(*edge))
+    return result
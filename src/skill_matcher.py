@@ -0,0 +1,272 @@
+import bisect
+import json
+import math
+import os
+import re
+from collections import namedtuple
+
+# A skill in the taxonomy: its display name, category, the phrases that refer to it, and
+# skills that having it implies (someone who uses PyTorch knows Python and deep learning)
+Skill = namedtuple("Skill", "name category aliases implies", defaults=((), ()))
+
+SKILLS = [
+    # Programming languages
+    Skill("Python", "technical", ("python", "python3")),
+    Skill("Java", "technical", ("java",)),
+    Skill("JavaScript", "technical", ("javascript", "js", "ecmascript", "es6")),
+    Skill("TypeScript", "technical", ("typescript",), ("JavaScript",)),
+    Skill("C++", "technical", ("c++", "cpp")),
+    Skill("C#", "technical", ("c#", "csharp")),
+    Skill("Go", "technical", ("golang",)),
+    Skill("Rust", "technical", ("rust",)),
+    Skill("Kotlin", "technical", ("kotlin",)),
+    Skill("Swift", "technical", ("swift", "swiftui")),
+    Skill("Scala", "technical", ("scala",)),
+    Skill("Ruby", "technical", ("ruby",)),
+    Skill("PHP", "technical", ("php",)),
+    Skill("R", "technical", ("r programming", "rstudio", "tidyverse")),
+    Skill("MATLAB", "technical", ("matlab",)),
+    Skill("SQL", "technical", ("sql", "t-sql", "pl/sql")),
+    Skill("Bash", "technical", ("bash", "shell scripting", "shell scripts")),
+    # Web and mobile
+    Skill("HTML", "technical", ("html", "html5")),
+    Skill("CSS", "technical", ("css", "css3", "sass", "scss", "tailwind", "tailwindcss")),
+    Skill("React", "technical", ("react", "reactjs", "react.js"), ("JavaScript",)),
+    Skill("React Native", "technical", ("react native",), ("React",)),
+    Skill("Angular", "technical", ("angular", "angularjs"), ("TypeScript",)),
+    Skill("Vue.js", "technical", ("vue", "vuejs", "vue.js"), ("JavaScript",)),
+    Skill("Next.js", "technical", ("nextjs", "next.js"), ("React",)),
+    Skill("Node.js", "technical", ("nodejs", "node.js"), ("JavaScript",)),
+    Skill("Express", "technical", ("expressjs", "express.js"), ("Node.js",)),
+    Skill("Django", "technical", ("django",), ("Python",)),
+    Skill("Flask", "technical", ("flask",), ("Python",)),
+    Skill("FastAPI", "technical", ("fastapi",), ("Python",)),
+    Skill("Spring", "technical", ("spring", "spring boot", "springboot", "spring framework"), ("Java",)),
+    Skill(".NET", "technical", ("dotnet", "asp.net", "dotnet core"), ("C#",)),
+    Skill("Ruby on Rails", "technical", ("rails", "ruby on rails"), ("Ruby",)),
+    Skill("REST APIs", "technical", ("restful", "rest api", "rest apis", "restful apis")),
+    Skill("GraphQL", "technical", ("graphql",)),
+    Skill("Android", "technical", ("android",)),
+    Skill("iOS", "technical", ("ios",)),
+    Skill("Flutter", "technical", ("flutter",)),
+    # Data and machine learning
+    Skill("Machine Learning", "technical", ("machine learning", "ml")),
+    Skill("Deep Learning", "technical", ("deep learning", "neural networks", "neural network"), ("Machine Learning",)),
+    Skill("Natural Language Processing", "technical", ("natural language processing", "nlp"), ("Machine Learning",)),
+    Skill("Computer Vision", "technical", ("computer vision", "image recognition", "opencv"), ("Machine Learning",)),
+    Skill("Large Language Models", "technical", ("llm", "llms", "large language models", "large language model",
+                                                 "generative ai", "genai"), ("Natural Language Processing",)),
+    Skill("PyTorch", "technical", ("pytorch", "torch"), ("Python", "Deep Learning")),
+    Skill("TensorFlow", "technical", ("tensorflow", "keras"), ("Python", "Deep Learning")),
+    Skill("scikit-learn", "technical", ("scikit learn", "sklearn"), ("Python", "Machine Learning")),
+    Skill("Pandas", "technical", ("pandas",), ("Python",)),
+    Skill("NumPy", "technical", ("numpy",), ("Python",)),
+    Skill("Data Analysis", "technical", ("data analysis", "data analytics", "exploratory data analysis", "eda")),
+    Skill("Data Visualization", "technical", ("data visualization", "data visualisation", "matplotlib", "seaborn",
+                                              "plotly", "d3.js")),
+    Skill("Statistics", "technical", ("statistics", "statistical analysis", "statistical modeling",
+                                      "hypothesis testing", "a/b testing")),
+    Skill("Tableau", "technical", ("tableau",), ("Data Visualization",)),
+    Skill("Power BI", "technical", ("power bi", "powerbi"), ("Data Visualization",)),
+    Skill("Excel", "technical", ("microsoft excel", "ms excel", "advanced excel", "excel vba", "vba")),
+    Skill("Apache Spark", "technical", ("spark", "apache spark", "pyspark", "spark sql", "spark streaming")),
+    Skill("Hadoop", "technical", ("hadoop", "hdfs", "hive")),
+    Skill("Kafka", "technical", ("kafka", "apache kafka")),
+    Skill("Airflow", "technical", ("airflow", "apache airflow")),
+    Skill("dbt", "technical", ("dbt",), ("SQL",)),
+    Skill("ETL", "technical", ("etl", "elt", "data pipelines", "data pipeline")),
+    Skill("Data Warehousing", "technical", ("data warehouse", "data warehousing", "snowflake", "bigquery",
+                                            "redshift")),
+    Skill("MLOps", "technical", ("mlops", "mlflow", "kubeflow", "model deployment"), ("Machine Learning",)),
+    # Databases
+    Skill("PostgreSQL", "technical", ("postgresql", "postgres"), ("SQL",)),
+    Skill("MySQL", "technical", ("mysql",), ("SQL",)),
+    Skill("SQL Server", "technical", ("sql server", "mssql"), ("SQL",)),
+    Skill("Oracle Database", "technical", ("oracle database", "oracle db"), ("SQL",)),
+    Skill("MongoDB", "technical", ("mongodb", "mongo")),
+    Skill("Redis", "technical", ("redis",)),
+    Skill("Elasticsearch", "technical", ("elasticsearch", "elastic search", "opensearch")),
+    Skill("DynamoDB", "technical", ("dynamodb",)),
+    Skill("Cassandra", "technical", ("cassandra",)),
+    # Cloud and infrastructure
+    Skill("AWS", "technical", ("aws", "amazon web services", "ec2", "s3")),
+    Skill("Azure", "technical", ("azure", "microsoft azure")),
+    Skill("Google Cloud", "technical", ("gcp", "google cloud", "google cloud platform")),
+    Skill("Docker", "technical", ("docker", "containers", "containerization", "containerized")),
+    Skill("Kubernetes", "technical", ("kubernetes", "k8s", "eks", "gke", "aks"), ("Docker",)),
+    Skill("Terraform", "technical", ("terraform",), ("Infrastructure as Code",)),
+    Skill("Infrastructure as Code", "technical", ("infrastructure as code", "iac", "cloudformation", "pulumi")),
+    Skill("Ansible", "technical", ("ansible",)),
+    Skill("CI/CD", "technical", ("ci/cd", "ci cd", "continuous integration", "continuous delivery",
+                                 "continuous deployment", "jenkins", "github actions", "gitlab ci", "circleci")),
+    Skill("Linux", "technical", ("linux", "unix", "ubuntu")),
+    Skill("Git", "technical", ("git", "github", "gitlab", "bitbucket", "version control")),
+    Skill("Microservices", "technical", ("microservices", "microservice", "service oriented architecture")),
+    Skill("Distributed Systems", "technical", ("distributed systems", "distributed computing")),
+    Skill("System Design", "technical", ("system design", "software architecture", "scalable systems")),
+    Skill("Monitoring", "technical", ("monitoring", "observability", "prometheus", "grafana", "datadog",
+                                      "new relic")),
+    Skill("Networking", "technical", ("tcp/ip", "computer networking", "network protocols", "dns")),
+    Skill("Cybersecurity", "technical", ("cybersecurity", "cyber security", "information security",
+                                         "application security", "penetration testing", "owasp")),
+    # Engineering practice
+    Skill("Unit Testing", "technical", ("unit testing", "unit tests", "pytest", "junit", "jest",
+                                        "test driven development", "tdd")),
+    Skill("Test Automation", "technical", ("test automation", "selenium", "cypress", "playwright")),
+    Skill("Object-Oriented Programming", "technical", ("object oriented", "object oriented programming", "oop")),
+    Skill("Data Structures and Algorithms", "technical", ("data structures", "algorithms")),
+    Skill("Agile", "domain-specific", ("agile", "scrum", "kanban", "sprint planning")),
+    Skill("Jira", "domain-specific", ("jira", "confluence")),
+    # Product, design and business
+    Skill("Product Management", "domain-specific", ("product management", "product roadmap", "roadmapping",
+                                                    "product strategy")),
+    Skill("Project Management", "domain-specific", ("project management", "pmp", "prince2")),
+    Skill("UX Design", "domain-specific", ("ux", "user experience", "ux design", "ui/ux", "user research",
+                                           "usability testing")),
+    Skill("Figma", "domain-specific", ("figma", "adobe xd")),
+    Skill("Financial Modeling", "domain-specific", ("financial modeling", "financial modelling", "dcf",
+                                                    "valuation")),
+    Skill("Accounting", "domain-specific", ("accounting", "gaap", "ifrs", "bookkeeping")),
+    Skill("Digital Marketing", "domain-specific", ("digital marketing", "seo", "sem", "google analytics",
+                                                   "content marketing", "social media marketing")),
+    Skill("Salesforce", "domain-specific", ("salesforce",)),
+    Skill("SAP", "domain-specific", ("sap", "sap erp", "s/4hana")),
+    # Soft skills that job descriptions name explicitly
+    Skill("Communication", "soft", ("communication skills", "written communication", "verbal communication")),
+    Skill("Leadership", "soft", ("leadership", "team lead", "led a team", "mentoring", "mentored")),
+    Skill("Stakeholder Management", "soft", ("stakeholder management", "stakeholder engagement",
+                                             "cross functional", "cross-functional")),
+    Skill("Problem Solving", "soft", ("problem solving", "problem-solving", "analytical skills")),
+]
+
+# Aliases that are also everyday words ("a spring internship", "react quickly", "monitoring
+# patients"). In running text they only count next to another skill, within CONTEXT_WINDOW
+# tokens ("Java and Spring", "Python, SQL, Spark"); their longer forms ("spring boot",
+# "apache spark") always count.
+EVERYDAY_ALIASES = {"spring", "spark", "swift", "rails", "monitoring", "containers", "torch", "react"}
+CONTEXT_WINDOW = 4
+
+# Words, version-like tokens and the symbols that are part of skill names (c++, c#, node.js)
+_TOKENS = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+# ".NET" is rewritten before tokenizing so it survives it
+_DOT_NET = re.compile(r"(?<![\w.])\.net\b")
+
+
+# Function to split text into the lowercase tokens skills are matched on
+def tokenize(text):
+    return _TOKENS.findall(_DOT_NET.sub("dotnet", text.lower()))
+
+
+# Deterministic skill matcher. Skills are found only through their aliases, so ambiguous
+# names like "Go" or "R" are matched by unambiguous phrases instead, and aliases that are
+# everyday words need another skill nearby (see EVERYDAY_ALIASES). Every alias is indexed
+# by its first token, so scanning a document is one dictionary lookup per token plus a
+# check of the few aliases that start with it; the longest alias at a position wins.
+class SkillMatcher:
+    def __init__(self, skills):
+        self.skills = {skill.name: skill for skill in skills}
+        self._index = {}
+        for skill in skills:
+            for alias in skill.aliases:
+                tokens = tuple(tokenize(alias))
+                if tokens:
+                    self._index.setdefault(tokens[0], []).append((tokens, skill.name, alias in EVERYDAY_ALIASES))
+        for candidates in self._index.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+
+    # Function to find the skills a text mentions, with how often, in order of first mention
+    def find_skills(self, text):
+        return self.find_skills_in_tokens(tokenize(text or ""))
+
+    # Function to find the skills in text already split by tokenize()
+    def find_skills_in_tokens(self, tokens):
+        mentions = []
+        i = 0
+        while i < len(tokens):
+            for alias, name, everyday in self._index.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(alias)]) == alias:
+                    mentions.append((i, i + len(alias), name, everyday))
+                    i += len(alias)
+                    break
+            else:
+                i += 1
+
+        # Positions of the mentions that count on their own, to look for context around the others
+        starts = [start for start, _, _, everyday in mentions if not everyday]
+        ends = [end for _, end, _, everyday in mentions if not everyday]
+        found = {}
+        for start, end, name, everyday in mentions:
+            if everyday and not (_any_between(ends, start - CONTEXT_WINDOW + 1, start)
+                                 or _any_between(starts, end, end + CONTEXT_WINDOW - 1)):
+                continue
+            found[name] = found.get(name, 0) + 1
+        return found
+
+    # Function to get the taxonomy name of a phrase that is exactly one of its aliases
+    def canonical_name(self, text):
+        tokens = tuple(tokenize(text or ""))
+        for alias, name, _ in self._index.get(tokens[0] if tokens else None, ()):
+            if alias == tokens:
+                return name
+        return None
+
+    # Function to add every skill implied by the ones found
+    def with_implied(self, names):
+        result = set(names)
+        pending = list(names)
+        while pending:
+            for implied in self.skills[pending.pop()].implies:
+                if implied not in result:
+                    result.add(implied)
+                    pending.append(implied)
+        return result
+
+    # Function to compare a resume with a job description. The score is the share of the
+    # job's skills the resume covers, each weighted by how often the job mentions it.
+    # resume_skills, if given, are the resume's skills as found earlier.
+    def match(self, resume_text, job_description, resume_skills=None):
+        required = self.find_skills(job_description)
+        if resume_skills is None:
+            resume_skills = self.find_skills(resume_text)
+        present = self.with_implied(resume_skills)
+
+        matched = [name for name in required if name in present]
+        missing = [name for name in required if name not in present]
+        weights = {name: 1 + math.log(count) for name, count in required.items()}
+        total = sum(weights.values())
+        score = round(100 * sum(weights[name] for name in matched) / total) if total else 0
+        return {"match_percentage": score, "matched_skills": matched, "missing_skills": missing}
+
+
+# Function to check whether a sorted list holds a value from low to high, inclusive
+def _any_between(values, low, high):
+    i = bisect.bisect_left(values, low)
+    return i < len(values) and values[i] <= high
+
+
+# Function to load extra skills from a JSON list of {"name", "category", "aliases", "implies"}
+def load_skills(path):
+    with open(path, encoding="utf-8") as f:
+        return [Skill(item["name"], item.get("category", "technical"), tuple(item.get("aliases", ())),
+                      tuple(item.get("implies", ()))) for item in json.load(f)]
+
+
+_matcher = None
+
+
+# Function to get the shared matcher, built once from the built-in taxonomy plus the skills
+# in NEXTCV_SKILL_TAXONOMY_FILE, if set
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        skills = list(SKILLS)
+        extra = os.environ.get("NEXTCV_SKILL_TAXONOMY_FILE")
+        if extra:
+            skills += load_skills(extra)
+        _matcher = SkillMatcher(skills)
+    return _matcher
+
+
+# Function to match a resume against a job description with the shared matcher
+def match_skills(resume_text, job_description, resume_skills=None):
+    return get_matcher().match(resume_text, job_description, resume_skills)
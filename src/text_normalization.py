@@ -0,0 +1,110 @@
+import re
+
+# Cleanup rules for extracted resume text. Each rule is (trigger, pattern, replacement),
+# all precompiled. Patterns that start with a character class make the regex engine try a
+# match at every position of the page, so those rules carry a cheap trigger that starts
+# with a literal and must match for the rule to match at all; when it does not, the rule
+# is skipped without the expensive scan. Rules run in order and each one sees the output
+# of the previous one, exactly like the chained re.sub calls they replace.
+
+_HYPHENATION = (re.compile(r'-\s*\n'), re.compile(r'(\w)-\s*\n\s*(\w)'), r'\1\2')
+_WRAPPED_DATES = (re.compile(r'\n\s*\d'), re.compile(r'(\d{4})\s*\n\s*(\d{4})'), r'\1-\2')
+_WRAPPED_NAMES = (None, re.compile(r'([A-Z][a-z]+)\s*\n\s*([A-Z][a-z]+)'), r'\1 \2')
+_SECTION_HEADERS = (None, re.compile(r'\n([A-Z][A-Z\s]+)\n'), r'\n\n\1\n')
+_BULLETS = (re.compile('•'), re.compile(r'\n\s*•\s*'), '\n• ')
+_BLANK_LINES = (None, re.compile(r'\n\s*\n\s*\n+'), '\n\n')
+_HYPHEN_DATES = (re.compile(r'-\s*\d'), re.compile(r'(\d{4})\s*-\s*(\d{4})'), r'\1 - \2')
+_EN_DASH_DATES = (re.compile(r'–\s*\d'), re.compile(r'(\d{4})\s*–\s*(\d{4})'), r'\1 – \2')
+
+# Clean up common PDF extraction artifacts while preserving structure
+PDF_PAGE_RULES = (
+    _HYPHENATION,
+    _WRAPPED_DATES,
+    _WRAPPED_NAMES,
+    _SECTION_HEADERS,
+    _BULLETS,
+    _BLANK_LINES,
+    _HYPHEN_DATES,
+    _EN_DASH_DATES,
+)
+
+# Clean up text file formatting while preserving structure
+TEXT_FILE_RULES = (
+    _BLANK_LINES,
+    _HYPHEN_DATES,
+    _EN_DASH_DATES,
+)
+
+# Final cleanup over the whole document; mostly affects page and paragraph boundaries
+DOCUMENT_RULES = (
+    _HYPHEN_DATES,
+    _EN_DASH_DATES,
+    _BULLETS,
+    _BLANK_LINES,
+)
+
+
+def apply_rules(text, rules):
+    for trigger, pattern, replacement in rules:
+        if trigger is None or trigger.search(text):
+            text = pattern.sub(replacement, text)
+    return text
+
+
+def normalize_pdf_page(text):
+    return apply_rules(text, PDF_PAGE_RULES)
+
+
+def normalize_text_file(text):
+    return apply_rules(text, TEXT_FILE_RULES)
+
+
+def normalize_document(text):
+    return apply_rules(text.strip(), DOCUMENT_RULES)
+
+
+# Equivalent to normalize_document("".join(page + "\n\n" for page in pages)) for pages that
+# went through normalize_pdf_page. Such pages are already fixed points of DOCUMENT_RULES, so
+# the document pass can only change text around page boundaries: pages are grouped at
+# boundaries no rule can match across, and only groups spanning other boundaries (plus the
+# stripped first and last group) are rescanned.
+def join_pdf_pages(pages):
+    if not pages:
+        return ""
+
+    groups = [[pages[0]]]
+    for left, right in zip(pages, pages[1:]):
+        if _is_quiet_boundary(left, right):
+            groups.append([right])
+        else:
+            groups[-1].append(right)
+
+    last = len(groups) - 1
+    parts = []
+    for index, group in enumerate(groups):
+        text = "\n\n".join(group)
+        if index == 0:
+            text = text.lstrip()
+        if index == last:
+            text = text.rstrip()
+        if len(group) > 1 or index in (0, last):
+            text = apply_rules(text, DOCUMENT_RULES)
+        parts.append(text)
+    return "\n\n".join(parts)
+
+
+# A boundary is quiet when joining the pages with "\n\n" cannot create a match for any
+# document rule: no third newline in the whitespace run, no bullet on either side of it
+# and no digit or dash on both sides of it.
+def _is_quiet_boundary(left, right):
+    left_core = left.rstrip()
+    right_core = right.lstrip()
+    if not left_core or not right_core:
+        return False
+    if "\n" in left[len(left_core):] or "\n" in right[:len(right) - len(right_core)]:
+        return False
+    if left_core[-1] == "•" or right_core[0] == "•":
+        return False
+    left_edge = left_core[-1].isdecimal() or left_core[-1] in "-–"
+    right_edge = right_core[0].isdecimal() or right_core[0] in "-–"
+    return not (left_edge and right_edge)
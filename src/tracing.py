@@ -0,0 +1,300 @@
+import functools
+import itertools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Stage timing and token usage. Off by default; NEXTCV_TRACE=1 turns it on, and so does
+# setting either export: NEXTCV_TRACE_FILE appends one JSON line per finished span, and
+# NEXTCV_METRICS_PORT serves Prometheus text on http://<NEXTCV_METRICS_HOST>:<port>/metrics
+# (host 127.0.0.1 unless set). When off, span() hands back one shared object that does
+# nothing and traced() returns the function itself, so instrumented code pays for a
+# function call at most.
+TRACE_FILE = os.environ.get("NEXTCV_TRACE_FILE")
+METRICS_PORT = int(os.environ.get("NEXTCV_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("NEXTCV_METRICS_HOST", "127.0.0.1")
+enabled = os.environ.get("NEXTCV_TRACE", "0") == "1" or bool(TRACE_FILE) or bool(METRICS_PORT)
+# Latency percentiles are taken over the most recent spans of each stage
+WINDOW = int(os.environ.get("NEXTCV_TRACE_WINDOW", "10000"))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_ids = itertools.count(1)
+_local = threading.local()
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# A timed stage. Spans opened while another is open on the same thread are its children
+# and share its trace id. Attributes added with set() are exported with the span.
+class Span:
+    __slots__ = ("name", "attributes", "trace_id", "span_id", "parent_id", "start", "_started")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        self.span_id = next(_ids)
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.parent_id = parent.span_id if parent else None
+        stack.append(self)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        _stack().pop()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        recorder.record(self, duration)
+        return False
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+# Function to time a block: `with span("pdf_parse", pages=3) as s: ... s.set(chars=n)`
+def span(name, **attributes):
+    if not enabled:
+        return _NOOP
+    return Span(name, attributes)
+
+
+# Decorator to time every call of a function as a span
+def traced(name):
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Function to get the innermost open span on this thread, or a no-op one
+def current_span():
+    stack = _stack() if enabled else None
+    return stack[-1] if stack else _NOOP
+
+
+class _Adoption:
+    __slots__ = ("parent",)
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def __enter__(self):
+        _stack().append(self.parent)
+        return self.parent
+
+    def __exit__(self, exc_type, exc, tb):
+        _stack().pop()
+        return False
+
+
+# Function to continue a span on a worker thread: spans opened inside `with adopt(parent)`
+# become its children, as if they had been opened on the thread that opened it
+def adopt(parent):
+    if not isinstance(parent, Span):
+        return _NOOP
+    return _Adoption(parent)
+
+
+# Function to count the tokens an API reply reports (its `usage`) against the model that
+# served it, and attach them to the open span
+def record_usage(model, usage):
+    if not enabled or usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    recorder.add_usage(model, prompt_tokens, completion_tokens)
+    current_span().set(model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+# Function to export a component's stats() with the metrics, as gauges named
+# nextcv_<name>_<key>. A stats function that returns a dict of dicts (e.g. per model) is
+# exported with the outer key as the `label` label.
+def register_collector(name, collect, label="key"):
+    recorder.collectors.append((name, collect, label))
+
+
+# Aggregates finished spans per stage (count, total, recent durations for percentiles) and
+# token usage per model, and writes spans to the JSONL sink when there is one
+class Recorder:
+    def __init__(self, trace_file=None, window=10000):
+        self.window = window
+        self.collectors = []
+        self._stages = {}
+        self._usage = {}
+        self._lock = threading.Lock()
+        self._sink = None
+        if trace_file:
+            os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+            self._sink = open(trace_file, "a", encoding="utf-8")
+
+    def record(self, span, duration):
+        with self._lock:
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = {"count": 0, "sum": 0.0, "errors": 0,
+                                                   "recent": deque(maxlen=self.window)}
+            stage["count"] += 1
+            stage["sum"] += duration
+            stage["errors"] += "error" in span.attributes
+            stage["recent"].append(duration)
+            if self._sink is not None:
+                record = {"trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id,
+                          "name": span.name, "start": round(span.start, 6), "duration_ms": round(duration * 1000, 3)}
+                record.update(span.attributes)
+                self._sink.write(json.dumps(record, default=str) + "\n")
+                self._sink.flush()
+
+    def add_usage(self, model, prompt_tokens, completion_tokens):
+        with self._lock:
+            usage = self._usage.setdefault(model, {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+
+    # Function to summarize each stage: count, errors, mean and max, and the p50/p95/p99
+    # latency of its recent spans, all in seconds
+    def stage_stats(self):
+        with self._lock:
+            stages = {name: (stage["count"], stage["sum"], stage["errors"], sorted(stage["recent"]))
+                      for name, stage in self._stages.items()}
+        stats = {}
+        for name, (count, total, errors, recent) in stages.items():
+            stats[name] = {"count": count, "errors": errors, "mean": total / count, "max": recent[-1],
+                           "sum": total}
+            for quantile in QUANTILES:
+                stats[name][f"p{round(quantile * 100)}"] = recent[max(0, math.ceil(quantile * len(recent)) - 1)]
+        return stats
+
+    def usage_stats(self):
+        with self._lock:
+            return {model: dict(usage) for model, usage in self._usage.items()}
+
+    # Function to render every metric in the Prometheus text exposition format
+    def prometheus_text(self):
+        stages = sorted(self.stage_stats().items())
+        lines = [
+            "# HELP nextcv_stage_seconds Time spent in each stage, over the most recent spans",
+            "# TYPE nextcv_stage_seconds summary",
+        ]
+        for name, stats in stages:
+            for quantile in QUANTILES:
+                lines.append(f'nextcv_stage_seconds{{stage="{name}",quantile="{quantile}"}} '
+                             f'{stats[f"p{round(quantile * 100)}"]:.6f}')
+            lines.append(f'nextcv_stage_seconds_sum{{stage="{name}"}} {stats["sum"]:.6f}')
+            lines.append(f'nextcv_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        lines += ["# HELP nextcv_stage_errors_total Spans that ended with an exception",
+                  "# TYPE nextcv_stage_errors_total counter"]
+        for name, stats in stages:
+            lines.append(f'nextcv_stage_errors_total{{stage="{name}"}} {stats["errors"]}')
+
+        usage = self.usage_stats()
+        for key, help_text in (("requests", "API replies"), ("prompt_tokens", "Prompt tokens the API reported"),
+                               ("completion_tokens", "Completion tokens the API reported")):
+            lines += [f"# HELP nextcv_llm_{key}_total {help_text}", f"# TYPE nextcv_llm_{key}_total counter"]
+            for model, counts in sorted(usage.items()):
+                lines.append(f'nextcv_llm_{key}_total{{model="{model}"}} {counts[key]}')
+
+        for name, collect, label in self.collectors:
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.warning("Could not collect %s stats: %s", name, e)
+                continue
+            samples = {}
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    for sub_key, sub_value in value.items():
+                        samples.setdefault(sub_key, []).append((f'{{{label}="{key}"}}', sub_value))
+                else:
+                    samples.setdefault(key, []).append(("", value))
+            for key, values in samples.items():
+                values = [(labels, value) for labels, value in values
+                          if isinstance(value, (int, float)) and not isinstance(value, bool)]
+                if values:
+                    lines.append(f"# TYPE nextcv_{name}_{key} gauge")
+                    lines += [f"nextcv_{name}_{key}{labels} {value}" for labels, value in values]
+        return "\n".join(lines) + "\n"
+
+
+recorder = Recorder(TRACE_FILE, WINDOW)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        payload = recorder.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Function to serve the metrics in the background; returns the server, or None when the
+# port is taken (e.g. by another process of the same deployment)
+def serve_metrics(port, host="127.0.0.1"):
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("Could not serve metrics on port %s: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+# Function to format the stage latencies and token usage as a table, for command-line runs
+def summary_table():
+    lines = [f"{'stage':<22} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, stats in sorted(recorder.stage_stats().items(), key=lambda item: -item[1]["sum"]):
+        lines.append(f"{name:<22} {stats['count']:>6} {stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} "
+                     f"{stats['p99'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f}")
+    for model, usage in sorted(recorder.usage_stats().items()):
+        lines.append(f"{model}: {usage['requests']} replies, {usage['prompt_tokens']} prompt tokens, "
+                     f"{usage['completion_tokens']} completion tokens")
+    return "\n".join(lines)
+
+
+if enabled and METRICS_PORT:
+    serve_metrics(METRICS_PORT, METRICS_HOST)
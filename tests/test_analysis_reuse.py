@@ -0,0 +1,112 @@
+import pytest
+
+from incremental import AnalysisInputs
+
+import llm_functions
+from near_duplicates import NearDuplicateIndex
+from schemas import default_value
+
+RESUME = "Jane Doe\nData Engineer\nBuilt pipelines in Python and SQL on AWS\n"
+JOB = """Data Engineer at a growing logistics company.
+You will design batch jobs, own the reporting tables, and work closely with analysts
+and product managers on reporting. Kubernetes experience is required for this role.
+We offer flexible hours, a learning budget and a friendly office in the city centre.
+"""
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    calls = []
+
+    def complete_json(client, model, prompt, schema_name, schema, stream=False, on_section=None, use_cache=True):
+        calls.append(schema_name)
+        result = default_value(schema)
+        if "match_percentage" in result:
+            result["match_percentage"] = 42
+            result["skill_match"]["matched_skills"] = ["model judged"]
+        return result
+
+    monkeypatch.setattr(llm_functions, "near_duplicates", NearDuplicateIndex())
+    monkeypatch.setattr(llm_functions, "_complete_json", complete_json)
+    monkeypatch.setattr(llm_functions, "get_client", lambda api_key: None)
+    monkeypatch.setattr(llm_functions, "_resolve_company_summary", lambda company, *args: COMPANIES.get(company, ""))
+    return calls
+
+
+# Company summaries the mocked lookup has finished; a company missing here is still pending
+COMPANIES = {"Acme": "Acme moves freight across Europe."}
+
+
+def analyze(job, use_cache=True, company=""):
+    return llm_functions.analyze_resume_with_openai(RESUME, job, company, "key", use_cache=use_cache)
+
+
+def test_near_duplicate_reuses_analysis_with_fresh_skill_match(completions):
+    first = analyze(JOB)
+    assert first["skill_match"]["missing_skills"] == ["Kubernetes"]
+    reused = analyze(JOB.replace("Kubernetes", "Kubernetes and Python"))
+    assert completions == ["resume_narrative"]
+    assert reused["skill_match"]["matched_skills"] == ["Python"]
+    assert reused["skill_match"]["missing_skills"] == ["Kubernetes"]
+
+
+def test_no_reuse_across_local_and_model_judged_skill_match(completions):
+    analyze(JOB)
+    # The same posting without the one skill the matcher knows: the model judges the match,
+    # so the earlier local skill lists must not be served
+    result = analyze(JOB.replace("Kubernetes", "Container"))
+    assert completions == ["resume_narrative", "resume_analysis"]
+    assert result["skill_match"]["matched_skills"] == ["model judged"]
+    assert result["skill_match"]["missing_skills"] == []
+
+
+def test_use_cache_false_bypasses_reuse(completions):
+    analyze(JOB)
+    analyze(JOB, use_cache=False)
+    assert completions == ["resume_narrative", "resume_narrative"]
+
+
+def test_analysis_with_company_details_is_reused(completions):
+    analyze(JOB, company="Acme")
+    analyze(JOB, company="Acme Ltd")
+    assert completions == ["resume_narrative"]
+
+
+def test_analysis_without_pending_company_details_is_not_reused(completions):
+    analyze(JOB, company="Globex")
+    analyze(JOB, company="Globex")
+    assert completions == ["resume_narrative", "resume_narrative"]
+
+
+def test_reanalysis_keeps_unaffected_sections(completions):
+    previous = analyze(JOB)
+    edited = RESUME.replace("Built", "Designed")
+    result, refreshed = llm_functions.reanalyze_resume_with_openai(AnalysisInputs(RESUME, JOB, ""), previous,
+                                                                   edited, JOB, "", "key")
+    assert refreshed == ["content_improvements"]
+    assert completions == ["resume_narrative", "resume_narrative_refresh"]
+    assert result["summary"] == previous["summary"]
+
+
+def test_reanalysis_from_scratch_redoes_everything(completions):
+    previous = analyze(JOB)
+    previous["summary"] = "kept from the last analysis"
+    edited = RESUME.replace("Built", "Designed")
+    result, refreshed = llm_functions.reanalyze_resume_with_openai(AnalysisInputs(RESUME, JOB, ""), previous,
+                                                                   edited, JOB, "", "key", use_cache=False)
+    assert refreshed is None
+    assert completions == ["resume_narrative", "resume_narrative"]
+    assert result["summary"] != "kept from the last analysis"
+
+
+def test_sections_outside_a_script_run_log_no_context_warnings(completions, monkeypatch):
+    from streamlit.runtime.scriptrunner_utils import script_run_context
+
+    warnings = []
+    monkeypatch.setattr(script_run_context._LOGGER, "warning", lambda *args: warnings.append(args))
+    result = llm_functions.analyze_resume_with_openai(RESUME, JOB, "", "key", split_sections=True)
+    assert set(completions) == {"resume_narrative_overview", "resume_narrative_skill_match",
+                                "resume_narrative_content_improvements",
+                                "resume_narrative_company_specific_insights"}
+    assert result["skill_match"]["missing_skills"] == ["Kubernetes"]
+    assert warnings == []
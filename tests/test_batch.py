@@ -0,0 +1,132 @@
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import batch
+import llm_functions
+import openai_client
+from near_duplicates import NearDuplicateIndex
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from mock_openai_server import MockHandler  # noqa: E402
+
+RESUMES = {
+    "ana.txt": "Ana Lima\nData engineer. Built pipelines in Python, SQL and Spark.",
+    "ben.txt": "Ben Ode\nFrontend developer. React, TypeScript and CSS.",
+}
+JOBS = {
+    "data": {"job_description": "Data engineer to build Spark pipelines in Python.", "company": ""},
+    "web": {"job_description": "Frontend developer for our React and TypeScript app.", "company": ""},
+    "broken": {"job_description": "FAIL this posting gets an error reply.", "company": ""},
+}
+
+
+# The mock server, except that it answers requests mentioning one of `failing` with a 400
+class Handler(MockHandler):
+    failing = ()
+    prompts = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        prompt = " ".join(message.get("content") or "" for message in json.loads(body)["messages"])
+        Handler.prompts.append(prompt)
+        if any(marker in prompt for marker in self.failing):
+            self.send_error(400, "Bad request")
+            return
+        self.rfile = io.BytesIO(body)
+        super().do_POST()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    Handler.failing = ("FAIL",)
+    Handler.prompts = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    monkeypatch.setattr(openai_client, "_injected_client", None)
+    openai_client.set_client(openai_client.get_client("test", base_url))
+    monkeypatch.setattr(llm_functions, "near_duplicates", NearDuplicateIndex(enabled=False))
+    yield base_url
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def analyzed_pairs(prompts):
+    return sorted((resume, job) for prompt in prompts for resume, text in RESUMES.items() if text in prompt
+                  for job, posting in JOBS.items() if posting["job_description"] in prompt)
+
+
+def run(output, jobs=JOBS, **kwargs):
+    asyncio.run(batch.run_batch(RESUMES, jobs, str(output), "test", concurrency=3, **kwargs))
+
+
+def test_every_pair_gets_a_record(server, tmp_path):
+    output = tmp_path / "results.jsonl"
+    run(output)
+    records = read_records(output)
+    assert sorted((record["resume"], record["job"]) for record in records) == analyzed_pairs(Handler.prompts)
+    assert len(records) == 6
+    for record in records:
+        if record["job"] == "broken":
+            assert record["result"] is None
+        else:
+            assert isinstance(record["result"]["match_percentage"], int)
+            assert set(record["result"]) == set(llm_functions.RESUME_ANALYSIS_SCHEMA["properties"])
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(server, tmp_path):
+    output = tmp_path / "results.jsonl"
+    run(output, jobs={"data": JOBS["data"]})
+    # The run was cut off while writing its next record
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"resume": "ana.txt", "job": "web", "res')
+    Handler.prompts = []
+    run(output, jobs={job: JOBS[job] for job in ("data", "web")})
+
+    assert analyzed_pairs(Handler.prompts) == [("ana.txt", "web"), ("ben.txt", "web")]
+    assert batch.load_checkpoint(str(output)) == {(resume, job) for resume in RESUMES for job in ("data", "web")}
+
+
+def test_failed_pairs_are_retried(server, tmp_path):
+    output = tmp_path / "results.jsonl"
+    run(output)
+    Handler.failing = ()
+    Handler.prompts = []
+    run(output)
+
+    assert analyzed_pairs(Handler.prompts) == [("ana.txt", "broken"), ("ben.txt", "broken")]
+    assert batch.load_checkpoint(str(output)) == {(resume, job) for resume in RESUMES for job in JOBS}
+
+
+def test_cli_runs_against_a_base_url(server, tmp_path, monkeypatch, capsys):
+    resumes_dir, jobs_dir = tmp_path / "resumes", tmp_path / "jobs"
+    resumes_dir.mkdir()
+    jobs_dir.mkdir()
+    for name, text in RESUMES.items():
+        (resumes_dir / name).write_text(text, encoding="utf-8")
+    (jobs_dir / "data.txt").write_text(JOBS["data"]["job_description"], encoding="utf-8")
+    (jobs_dir / "web.json").write_text(json.dumps(JOBS["web"]), encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    monkeypatch.setattr(sys, "argv", ["batch.py", "--resumes", str(resumes_dir), "--jobs", str(jobs_dir),
+                                      "--output", str(output), "--api-key", "test", "--base-url", server,
+                                      "--top-k", "1"])
+    batch.main()
+
+    # With --top-k 1 each resume is analyzed only against the posting that matches it best
+    assert sorted((record["resume"], record["job"]) for record in read_records(output)) == [
+        ("ana.txt", "data"), ("ben.txt", "web")]
+    assert "2 resumes x 2 jobs, best 1 jobs per resume: 0 already done, 2 to run" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+import pytest
+
+from company_cache import CompanyCache, normalize_company_name, read_company_list
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Google", "google"),
+    ("  google ", "google"),
+    ("Google LLC", "google"),
+    ("Google, Inc.", "google"),
+    ("Acme Holdings Pte. Ltd.", "acme holdings"),
+    ("AT&T Inc", "at&t"),
+    ("Procter & Gamble Co.", "procter & gamble"),
+    ("Société Générale SA", "société générale"),
+    ("STRASSE GmbH", "strasse"),
+    ("Straße GmbH", "strasse"),
+    ("Company", "company"),
+    ("Limited Brands Limited", "limited brands"),
+    ("", ""),
+])
+def test_normalize_company_name(name, key):
+    assert normalize_company_name(name) == key
+
+
+def test_read_company_list(tmp_path):
+    path = tmp_path / "companies.txt"
+    path.write_text("# popular\nGoogle\n\n  Stripe  \n   # indented comment\nMeta\n", encoding="utf-8")
+    assert read_company_list(path) == ["Google", "Stripe", "Meta"]
+
+
+def test_variants_share_one_entry():
+    cache = CompanyCache()
+    cache.put("Google LLC", "Search and ads")
+    assert cache.get("google") == "Search and ads"
+    assert cache.get("Stripe") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("company_cache.time.time", lambda: now[0])
+    cache = CompanyCache(ttl_seconds=60)
+    cache.put("Google", "Search")
+    now[0] += 61
+    assert cache.get("Google") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CompanyCache(max_entries=2)
+    cache.put("Google", "Search")
+    cache.put("Stripe", "Payments")
+    cache.get("Google")
+    cache.put("Meta", "Social")
+    assert cache.get("Stripe") is None
+    assert cache.get("Google") == "Search"
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache" / "companies.json")
+    CompanyCache(path=path).put("Google LLC", "Search")
+    assert CompanyCache(path=path).get("google") == "Search"
+    assert CompanyCache(path=path, ttl_seconds=-1).get("google") is None
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "companies.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert CompanyCache(path=str(path)).stats()["entries"] == 0
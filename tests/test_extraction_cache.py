@@ -0,0 +1,65 @@
+import io
+import os
+
+import helper
+from extraction_cache import ExtractionCache
+
+
+def test_memory_entries_are_evicted_least_recently_used_first():
+    cache = ExtractionCache(max_entries=2)
+    cache.put("a", "resume a")
+    cache.put("b", "resume b")
+    assert cache.get("a") == "resume a"
+    cache.put("c", "resume c")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("resume a", "resume c")
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_disk_entries_survive_a_restart(tmp_path):
+    cache_dir = str(tmp_path / "extracted")
+    ExtractionCache(cache_dir=cache_dir).put("a", "Zoë's résumé\n• Python")
+    restarted = ExtractionCache(cache_dir=cache_dir)
+    assert restarted.get("a") == "Zoë's résumé\n• Python"
+    # The entry read from disk is kept in memory too
+    os.remove(os.path.join(cache_dir, "a.txt"))
+    assert restarted.get("a") == "Zoë's résumé\n• Python"
+    assert ExtractionCache(cache_dir=cache_dir).get("a") is None
+
+
+def test_disk_entries_are_evicted_least_recently_used_first(tmp_path):
+    cache_dir = str(tmp_path)
+    cache = ExtractionCache(max_entries=1, cache_dir=cache_dir, max_disk_entries=2)
+    cache.put("a", "resume a")
+    cache.put("b", "resume b")
+    os.utime(os.path.join(cache_dir, "a.txt"), (1000, 1000))
+    os.utime(os.path.join(cache_dir, "b.txt"), (2000, 2000))
+    # Reading "a" from disk marks it as used, so "b" is the one evicted
+    assert cache.get("a") == "resume a"
+    cache.put("c", "resume c")
+    assert sorted(os.listdir(cache_dir)) == ["a.txt", "c.txt"]
+
+
+def test_key_depends_on_content_extension_and_version():
+    key = ExtractionCache.make_key(b"resume", "cv.pdf", "1")
+    assert ExtractionCache.make_key(b"resume", "other name.PDF", "1") == key
+    assert ExtractionCache.make_key(b"resume", "cv.txt", "1") != key
+    assert ExtractionCache.make_key(b"resume!", "cv.pdf", "1") != key
+    assert ExtractionCache.make_key(b"resume", "cv.pdf", "2") != key
+
+
+def test_bumping_the_extractor_version_extracts_again(monkeypatch):
+    monkeypatch.setattr(helper, "extraction_cache", ExtractionCache())
+    extracted = []
+    monkeypatch.setattr(helper, "_extract_text", lambda data, file_name, on_page: extracted.append(1) or "text")
+
+    def upload():
+        file = io.BytesIO(b"Jane Doe\nData Engineer")
+        file.name = "resume.txt"
+        return helper.extract_text_from_file(file)
+
+    upload()
+    upload()
+    monkeypatch.setattr(helper, "EXTRACTOR_VERSION", "2")
+    upload()
+    assert len(extracted) == 2
@@ -0,0 +1,65 @@
+import hashlib
+import json
+
+import pytest
+
+import graph_assets
+
+
+@pytest.fixture
+def vendor_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_assets, "VENDOR_DIR", str(tmp_path))
+    monkeypatch.setattr(graph_assets, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(graph_assets, "_verified", {})
+    monkeypatch.setattr(graph_assets, "_inline", {})
+    return tmp_path
+
+
+def vendor(directory, names):
+    manifest = {}
+    for name in names:
+        file_name, url = graph_assets.ASSETS[name]
+        data = f"window.{name.replace('-', '_')} = '</script>';".encode("utf-8")
+        (directory / file_name).write_bytes(data)
+        manifest[name] = {"file": file_name, "url": url, "sha256": hashlib.sha256(data).hexdigest()}
+    (directory / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+
+@pytest.mark.parametrize("mode", ["static", "inline"])
+def test_explicit_local_mode_fails_when_not_vendored(vendor_dir, mode):
+    with pytest.raises(RuntimeError, match="cytoscape.min.js"):
+        graph_assets.script_tags(["cytoscape"], mode)
+
+
+def test_explicit_local_mode_fails_when_file_was_changed(vendor_dir):
+    vendor(vendor_dir, ["cytoscape"])
+    (vendor_dir / "cytoscape.min.js").write_text("tampered", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        graph_assets.script_tags(["cytoscape"], "inline")
+
+
+def test_auto_mode_falls_back_to_cdn(vendor_dir):
+    tags = graph_assets.script_tags(["cytoscape", "dagre"], "auto")
+    assert tags.count('src="https://') == 2
+
+
+def test_unknown_mode_fails(vendor_dir):
+    with pytest.raises(RuntimeError, match="Unknown"):
+        graph_assets.script_tags(["cytoscape"], "local")
+
+
+def test_vendored_scripts_are_served_locally(vendor_dir, monkeypatch):
+    vendor(vendor_dir, graph_assets.ASSETS)
+    monkeypatch.setattr(graph_assets, "_option", lambda name: None)
+    static = graph_assets.script_tags(["cytoscape"], "static")
+    assert static == '<script src="/app/static/vendor/cytoscape.min.js"></script>'
+    inline = graph_assets.script_tags(["cytoscape"], "inline")
+    assert "https://" not in inline and "<\\/script" in inline
+    assert graph_assets.verify_offline() == []
+
+
+def test_static_url_follows_base_url_path(monkeypatch):
+    monkeypatch.setattr(graph_assets, "_option", lambda name: "/careers/nextcv/")
+    assert graph_assets.static_url() == "/careers/nextcv/app/static/vendor/"
+    monkeypatch.setattr(graph_assets, "_option", lambda name: "")
+    assert graph_assets.static_url() == "/app/static/vendor/"
@@ -0,0 +1,62 @@
+import pytest
+
+from incremental import AnalysisInputs, change_ratio, changed_lines, sections_to_refresh
+
+RESUME = ("Data engineer with five years of experience building batch and streaming pipelines.\n"
+          "Led the migration of nightly jobs to Airflow and cut runtime by half.\n"
+          "Skills: Python, SQL, Spark, Kafka, Docker.")
+JOB = ("We are hiring a data engineer to own our ingestion platform.\n"
+       "You will build pipelines in Python and SQL and run them on Kubernetes.")
+OLD = AnalysisInputs(RESUME, JOB, "Acme")
+MATCH = {"matched_skills": ["Python", "SQL"], "missing_skills": ["Kubernetes"]}
+
+
+def refresh(new, new_match=MATCH, max_change=0.3):
+    return sections_to_refresh(OLD, new, MATCH, new_match, max_change)
+
+
+def test_change_ratio():
+    assert change_ratio("a b  c", " a\nb c ") == 0.0
+    assert change_ratio("", "") == 0.0
+    assert change_ratio(None, "a b") == 1.0
+    assert change_ratio("a b c d", "a b c e") == pytest.approx(0.25)
+
+
+def test_changed_lines():
+    assert changed_lines("a\n\nb\n", " a\nb") == 0
+    assert changed_lines("a\nb\nc", "a\nB\nc\nd") == 2
+    assert changed_lines(None, "a\nb") == 2
+
+
+def test_unchanged_inputs_refresh_nothing():
+    assert refresh(AnalysisInputs(RESUME + "\n\n", "  " + JOB, "acme inc")) == set()
+
+
+def test_resume_typo_refreshes_content_improvements():
+    new = OLD._replace(resume_text=RESUME.replace("five years", "fife years"))
+    assert refresh(new) == {"content_improvements"}
+
+
+def test_job_edit_refreshes_summary():
+    new = OLD._replace(job_description=JOB.replace("own our", "own and grow our"))
+    assert refresh(new) == {"summary"}
+
+
+def test_skill_change_refreshes_summary_and_skills():
+    new = OLD._replace(resume_text=RESUME.replace("Docker.", "Docker, Kubernetes."))
+    new_match = {"matched_skills": ["Python", "SQL", "Kubernetes"], "missing_skills": []}
+    assert refresh(new, new_match) == {"content_improvements", "summary", "skill_match"}
+
+
+def test_reordered_skills_are_not_a_change():
+    assert refresh(OLD, {"matched_skills": ["SQL", "Python"], "missing_skills": ["Kubernetes"]}) == set()
+
+
+def test_company_change_refreshes_everything():
+    assert refresh(OLD._replace(company="Globex")) is None
+
+
+def test_large_edit_refreshes_everything():
+    new = OLD._replace(resume_text="Product manager who shipped mobile apps.")
+    assert refresh(new) is None
+    assert sections_to_refresh(OLD, new, MATCH, MATCH, max_change=1.0) == {"content_improvements"}
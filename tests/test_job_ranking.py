@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+from job_ranking import BM25Index, rank_postings, split_postings, terms
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+RESUME = "Data engineer. Built pipelines in Python and Spark, deployed on k8s with Docker."
+POSTINGS = [
+    "Registered Nurse\nPatient care in a busy clinic, medication and records.",
+    "Data Engineer\nPython, Spark and Kubernetes for our data platform.",
+    "Frontend Developer\nReact and TypeScript for our web app, some Python scripting.",
+]
+
+
+def test_split_postings_reads_titles_and_companies():
+    postings = split_postings("Company: Acme\nData Engineer\nPython\n---\nML Engineer\nPyTorch\n\n=====\n\n")
+    assert [(p.title, p.company) for p in postings] == [("Data Engineer", "Acme"), ("ML Engineer", "")]
+    assert postings[0].text.startswith("Company: Acme")
+    assert split_postings("") == [] and split_postings(None) == []
+
+
+def test_terms_drop_stopwords_and_add_skills():
+    indexed = terms("We need Kubernetes and k8s")
+    assert "we" not in indexed and "and" not in indexed
+    assert indexed.count("skill:Kubernetes") == 2
+
+
+def test_best_match_ranks_first():
+    ranking = rank_postings(RESUME, POSTINGS)
+    assert [index for index, _ in ranking] == [1, 2, 0]
+    assert ranking[0][1] > ranking[1][1] > ranking[2][1] == 0
+
+
+def test_top_k_and_empty_inputs():
+    assert [index for index, _ in rank_postings(RESUME, POSTINGS, top_k=1)] == [1]
+    assert rank_postings(RESUME, []) == []
+    assert rank_postings("", POSTINGS) == [(0, 0.0), (1, 0.0), (2, 0.0)]
+    assert list(BM25Index(["", ""]).score("python")) == [0.0, 0.0]
+
+
+def test_repeated_query_terms_saturate():
+    index = BM25Index(POSTINGS)
+    once, many = index.score("python"), index.score("python " * 20)
+    # With k3 = 1.2 a term's query weight never exceeds 2.2 times that of a single mention
+    assert (many[1:] > once[1:]).all() and (many <= once * 2.2).all()
+
+
+def test_importing_does_not_load_numpy():
+    code = "import sys, job_ranking; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=SRC)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,66 @@
+import json
+import random
+
+import pytest
+
+from json_stream import IncrementalJSONParser, parse_json_reply
+
+REPLY = {
+    "match_percentage": 72,
+    "summary": "Strong {data} background, \"quoted\" and \\escaped\\ text, commas, colons: [brackets]",
+    "strengths": ["Python", "SQL", {"nested": [1, 2, {"deep": None}]}],
+    "weaknesses": [],
+    "ratio": -1.5e3,
+    "remote": True,
+    "unicode": "Zürich – 東京",
+}
+
+
+def feed_in_chunks(text, sizes):
+    parser = IncrementalJSONParser()
+    completed = []
+    start = 0
+    for size in sizes:
+        completed.extend(parser.feed(text[start:start + size]))
+        start += size
+    completed.extend(parser.feed(text[start:]))
+    return parser, completed
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_any_chunking_yields_every_member_in_order(seed):
+    rng = random.Random(seed)
+    text = "Here you go:\n```json\n" + json.dumps(REPLY, indent=rng.choice([None, 2])) + "\n```"
+    parser, completed = feed_in_chunks(text, [rng.randint(0, 7) for _ in range(len(text))])
+    assert completed == list(REPLY.items())
+    assert parser.members == REPLY
+    assert parser.done
+
+
+def test_member_is_reported_as_soon_as_it_completes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"match_percentage": 8') == []
+    assert parser.feed('5, "summary": "Go') == [("match_percentage", 85)]
+    assert parser.feed('od"') == []
+    assert parser.feed("}") == [("summary", "Good")]
+    assert parser.feed(', "ignored": 1}') == []
+
+
+def test_malformed_value_is_skipped():
+    parser, completed = feed_in_chunks('{"a": 1, "b": nope, "c": [1, 2]}', [])
+    assert completed == [("a", 1), ("c", [1, 2])]
+
+
+def test_parse_json_reply_complete_object():
+    assert parse_json_reply("Sure! " + json.dumps(REPLY) + " Hope it helps.") == REPLY
+
+
+def test_parse_json_reply_keeps_completed_members_of_truncated_reply():
+    text = json.dumps(REPLY)
+    assert parse_json_reply(text[:text.index('"weaknesses"') + 5]) == {
+        key: REPLY[key] for key in ("match_percentage", "summary", "strengths")}
+
+
+def test_parse_json_reply_without_object():
+    assert parse_json_reply("I can't help with that.") == {}
+    assert parse_json_reply("") == {}
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+from near_duplicates import NearDuplicateIndex, optimal_bands, shingle_hashes
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+POSTING = """Senior Data Engineer
+We are looking for a data engineer to build our streaming platform on AWS.
+- 5+ years of Python and SQL in production
+- Experience with Spark, Kafka and Airflow
+- Kubernetes and Terraform for the infrastructure you own
+- Great communication skills and a knack for mentoring
+We offer flexible hours, a learning budget and a friendly office in the city centre.
+"""
+UNRELATED = """Registered Nurse
+Provide patient care in a busy outpatient clinic, administer medication and keep records.
+Night shifts twice a month. A current nursing license is required.
+"""
+
+
+def test_shingles_ignore_case_whitespace_and_links():
+    assert list(shingle_hashes("Build  DATA\npipelines")) == list(shingle_hashes("build data pipelines"))
+    assert list(shingle_hashes("apply at https://jobs.example.com/123 today")) == list(shingle_hashes("apply at today"))
+    assert len(shingle_hashes("")) == 0
+
+
+def test_banding_favours_catching_near_duplicates():
+    bands, rows = optimal_bands(0.8, 128)
+    assert bands * rows <= 128
+    assert 1 - (1 - 0.85 ** rows) ** bands > 0.99
+
+
+def test_finds_reworded_copies_within_scope_only():
+    index = NearDuplicateIndex()
+    index.add("resume-a", POSTING, "analysis")
+    value, similarity = index.lookup("resume-a", POSTING)
+    assert (value, similarity) == ("analysis", 1.0)
+
+    variant = "  ".join(POSTING.split()) + "\nApply now at https://jobs.example.com/?utm_source=board"
+    value, similarity = index.lookup("resume-a", variant)
+    assert value == "analysis" and similarity >= 0.8
+    assert index.lookup("resume-b", POSTING) is None
+    assert index.lookup("resume-a", UNRELATED) is None
+    assert index.lookup("resume-a", "") is None
+    assert index.stats()["hits"] == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    index = NearDuplicateIndex(max_entries=1)
+    index.add("scope", POSTING, "old")
+    index.add("scope", UNRELATED, "new")
+    assert index.lookup("scope", POSTING) is None
+    assert index.lookup("scope", UNRELATED)[0] == "new"
+    assert index.stats()["entries"] == 1
+
+
+def test_disabled_index_never_matches():
+    index = NearDuplicateIndex(enabled=False)
+    index.add("scope", POSTING, "analysis")
+    assert index.lookup("scope", POSTING) is None
+
+
+def test_importing_does_not_load_numpy():
+    code = "import sys, near_duplicates; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=SRC)
+    assert result.stdout.strip() == "False"
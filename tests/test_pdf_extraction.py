@@ -0,0 +1,65 @@
+import time
+
+import PyPDF2
+import pytest
+
+import pdf_extraction
+
+fpdf = pytest.importorskip("fpdf")
+
+
+def make_pdf(pages):
+    pdf = fpdf.FPDF()
+    pdf.set_font("Helvetica", size=10)
+    for page in range(pages):
+        pdf.add_page()
+        pdf.cell(0, 5, f"page {page} python data engineer", new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "MAX_WORKERS", 2)
+    monkeypatch.setattr(pdf_extraction, "PARALLEL_PAGE_THRESHOLD", 4)
+    monkeypatch.setattr(pdf_extraction, "PAGES_PER_CHUNK", 2)
+    pdf_extraction.shutdown_pool()
+    yield
+    pdf_extraction.shutdown_pool()
+
+
+def test_cold_pool_extracts_on_calling_thread_and_starts_warming(pool, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(pdf_extraction, "_extract_page_range", lambda *args: submitted.append(args))
+    pages = list(pdf_extraction.iter_pdf_pages(make_pdf(6)))
+    assert [page.split()[:2] for page in pages] == [["page", str(i)] for i in range(6)]
+    assert submitted == []
+    assert pdf_extraction._warmup
+
+
+def test_warm_pool_matches_sequential_extraction(pool):
+    data = make_pdf(7)
+    sequential = list(pdf_extraction.iter_pdf_pages(data))
+    pdf_extraction.warm_pool()
+    deadline = time.monotonic() + 60
+    while not pdf_extraction.pool_ready():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert list(pdf_extraction.iter_pdf_pages(data)) == sequential
+
+
+def test_worker_opens_each_document_once(monkeypatch):
+    opened = []
+    real_reader = PyPDF2.PdfReader
+
+    def counting_reader(stream):
+        opened.append(stream)
+        return real_reader(stream)
+
+    monkeypatch.setattr("PyPDF2.PdfReader", counting_reader)
+    monkeypatch.setattr(pdf_extraction, "_worker_document", None)
+    data = make_pdf(4)
+    first = pdf_extraction._extract_page_range(("doc", 1), data, 0, 2)
+    second = pdf_extraction._extract_page_range(("doc", 1), data, 2, 4)
+    other = pdf_extraction._extract_page_range(("doc", 2), data, 0, 1)
+    assert len(opened) == 2
+    assert [page.split()[1] for page in first + second + other] == ["0", "1", "2", "3", "0"]
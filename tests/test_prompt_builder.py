@@ -0,0 +1,70 @@
+import pytest
+
+from llm_functions import _resume_analysis_sections
+from prompt_builder import PromptSection, assemble_prompt, estimate_tokens
+
+
+def words(count, word="pipeline"):
+    return "\n".join(" ".join([word] * 10) for _ in range(count // 10))
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Built data pipelines") == 4
+    assert estimate_tokens("internationalization") == 3
+    assert estimate_tokens("2019-2021, 1234567") == 2 + 1 + 2 + 1 + 3
+    assert estimate_tokens("C++ / Node.js") == 7
+
+
+def test_prompt_under_budget_is_unchanged():
+    sections = [PromptSection("instructions", "Analyze this."), PromptSection("resume", words(100), 0, 10)]
+    prompt, report = assemble_prompt(sections, 1000)
+    assert prompt == "Analyze this.\n" + words(100)
+    assert report["trimmed"] == {}
+    assert report["total_tokens"] == estimate_tokens("Analyze this.") + 100
+
+
+def test_sections_are_trimmed_lowest_rank_first():
+    company, job, resume = words(1000, "company"), words(1000, "posting"), words(1000, "resume")
+    sections = _resume_analysis_sections(resume, job, "Acme", company, None)
+    fixed = sum(estimate_tokens(section.text) for section in sections if section.trim_rank is None)
+
+    # Only the company details have to give way
+    _, report = assemble_prompt(sections, fixed + 2500)
+    assert list(report["trimmed"]) == ["company_details"]
+    assert report["total_tokens"] <= fixed + 2500
+
+    # Company details are dropped entirely, then the job description is cut to its floor,
+    # then the resume
+    prompt, report = assemble_prompt(sections, fixed + 1200)
+    assert list(report["trimmed"]) == ["company_details", "job_description", "resume"]
+    assert report["sections"]["company_details"] == 0
+    assert 280 <= report["sections"]["job_description"] <= 300
+    assert 800 <= report["sections"]["resume"] < 1000
+    assert report["total_tokens"] <= fixed + 1200
+    assert prompt.count("[...truncated to fit the input budget]") == 2
+
+
+def test_sections_are_never_trimmed_below_min_tokens():
+    sections = [
+        PromptSection("instructions", words(200, "task")),
+        PromptSection("resume", words(1000, "resume"), trim_rank=1, min_tokens=400),
+        PromptSection("job_description", words(1000, "posting"), trim_rank=0, min_tokens=300),
+    ]
+    prompt, report = assemble_prompt(sections, 500)
+    # The budget can't be met, so every section stops at its floor and fixed text stays whole
+    assert report["sections"]["instructions"] == 200
+    assert report["sections"]["resume"] == pytest.approx(400, abs=10)
+    assert report["sections"]["job_description"] == pytest.approx(300, abs=10)
+    assert report["sections"]["resume"] <= 400 and report["sections"]["job_description"] <= 300
+    assert report["total_tokens"] > report["max_tokens"]
+    assert prompt.startswith(words(200, "task"))
+
+
+def test_truncation_cuts_at_line_boundaries():
+    text = words(1000, "resume")
+    prompt, report = assemble_prompt([PromptSection("resume", text, trim_rank=0)], 205)
+    kept = prompt[:-len("\n[...truncated to fit the input budget]")]
+    assert text.startswith(kept + "\n")
+    assert 15 <= kept.count("\n") < 20
+    assert report["trimmed"] == {"resume": 1000 - report["total_tokens"]}
@@ -0,0 +1,148 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai import RateLimitError
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def rate_limit_error(headers=None, code="rate_limit_exceeded"):
+    response = SimpleNamespace(status_code=429, headers=headers or {}, request=None)
+    return RateLimitError("Rate limit reached", response=response, body={"code": code})
+
+
+def test_bucket_refills_continuously_up_to_capacity():
+    bucket = TokenBucket(60)
+    bucket._updated = 0.0
+    bucket.consume(60, now=0.0)
+    assert bucket.time_until(1, now=0.0) == pytest.approx(1.0)
+    assert bucket.time_until(10, now=4.0) == pytest.approx(6.0)
+    assert bucket.time_until(10, now=10.0) == 0.0
+    bucket.consume(10, now=10.0)
+    assert bucket.level == pytest.approx(0.0)
+    bucket._refill(now=1000.0)
+    assert bucket.level == 60
+
+
+def test_bucket_waits_only_for_a_full_bucket_for_oversized_requests():
+    bucket = TokenBucket(60)
+    bucket._updated = 0.0
+    bucket.consume(30, now=0.0)
+    assert bucket.time_until(1000, now=0.0) == pytest.approx(30.0)
+
+
+def test_bucket_follows_the_reported_limits():
+    bucket = TokenBucket(60)
+    bucket._updated = 0.0
+    bucket.observe(limit=120, remaining=10, now=0.0)
+    assert (bucket.capacity, bucket.level) == (120, 10)
+    # Reported headroom never raises the level above what we counted ourselves
+    bucket.consume(5, now=0.0)
+    bucket.observe(limit=None, remaining=50, now=0.0)
+    assert (bucket.capacity, bucket.level) == (120, 5)
+
+
+def test_acquire_waits_for_the_bucket_to_refill():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+    limiter.acquire(1)
+    limiter.requests.level = 0.0
+    started = time.monotonic()
+    waited = limiter.acquire(1)
+    # 600 per minute refills one request every 0.1 s
+    assert 0.08 <= time.monotonic() - started < 1
+    assert waited == pytest.approx(time.monotonic() - started, abs=0.02)
+    assert limiter.stats()["requests"] == 2
+
+
+def test_callers_are_admitted_in_arrival_order_and_retries_go_first():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+    limiter.requests.level = 0.0
+    admitted = []
+
+    def caller(name, retry=False):
+        limiter.acquire(1, retry=retry)
+        admitted.append(name)
+
+    threads = []
+    for name, retry in [("a", False), ("b", False), ("c", False), ("retry", True)]:
+        thread = threading.Thread(target=caller, args=(name, retry))
+        thread.start()
+        threads.append(thread)
+        deadline = time.monotonic() + 5
+        while limiter.stats()["queue_depth"] < len(threads):
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+
+    # "a" may already have been admitted when the retry arrived, since the head of the
+    # queue is the only one waiting on the bucket
+    assert admitted in (["retry", "a", "b", "c"], ["a", "retry", "b", "c"])
+    assert limiter.stats()["max_queue_depth"] == 4
+
+
+def test_rate_limit_error_pauses_for_retry_after():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9, base_delay=0.0)
+    calls = []
+
+    def request():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise rate_limit_error({"retry-after-ms": "200"})
+        return SimpleNamespace(headers={})
+
+    response = limiter.call(request, tokens=10)
+    assert response.headers == {}
+    assert calls[1] - calls[0] >= 0.19
+    stats = limiter.stats()
+    assert (stats["throttled"], stats["retries"], stats["requests"]) == (1, 1, 2)
+
+
+def test_rate_limit_errors_give_up_after_max_retries():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9, max_retries=2, base_delay=0.0)
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise rate_limit_error()
+
+    with pytest.raises(RateLimitError):
+        limiter.call(request, tokens=10)
+    assert len(calls) == 3
+
+
+def test_insufficient_quota_is_not_retried():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9, base_delay=0.0)
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise rate_limit_error(code="insufficient_quota")
+
+    with pytest.raises(RateLimitError):
+        limiter.call(request, tokens=10)
+    assert len(calls) == 1
+    assert limiter.stats()["retries"] == 0
+
+
+def test_budgets_follow_rate_limit_headers():
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+    headers = {
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-remaining-requests": "4999",
+        "x-ratelimit-limit-tokens": "2000000",
+        "x-ratelimit-remaining-tokens": "1500",
+    }
+    limiter.call(lambda: SimpleNamespace(headers=headers), tokens=100)
+    stats = limiter.stats()
+    assert (stats["requests_per_minute"], stats["tokens_per_minute"]) == (5000, 2000000)
+    assert limiter.tokens.level == pytest.approx(1500, abs=5)
+
+
+def test_malformed_headers_are_ignored():
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+    limiter.observe({"x-ratelimit-limit-requests": "lots", "x-ratelimit-remaining-tokens": ""})
+    stats = limiter.stats()
+    assert (stats["requests_per_minute"], stats["tokens_per_minute"]) == (500, 200000)
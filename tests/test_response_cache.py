@@ -0,0 +1,67 @@
+import time
+
+from response_cache import ResponseCache
+from schemas import RESUME_ANALYSIS_SCHEMA, response_format
+
+MESSAGES = [{"role": "user", "content": "Analyze this resume"}]
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    key = ResponseCache.make_key("gpt-4.1-mini", MESSAGES, temperature=0.2)
+    assert cache.get(key) is None
+    cache.put(key, "gpt-4.1-mini", '{"summary": "ok"}')
+    assert cache.get(key) == '{"summary": "ok"}'
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "nested" / "responses.sqlite3")
+    key = ResponseCache.make_key("gpt-4.1-mini", MESSAGES)
+    ResponseCache(path).put(key, "gpt-4.1-mini", "reply")
+    assert ResponseCache(path).get(key) == "reply"
+
+
+def test_key_covers_model_messages_and_params():
+    key = ResponseCache.make_key("gpt-4.1-mini", MESSAGES, temperature=0.2)
+    assert key == ResponseCache.make_key("gpt-4.1-mini", [dict(MESSAGES[0])], temperature=0.2)
+    assert key != ResponseCache.make_key("gpt-4o-mini", MESSAGES, temperature=0.2)
+    assert key != ResponseCache.make_key("gpt-4.1-mini", MESSAGES, temperature=0.3)
+    assert key != ResponseCache.make_key("gpt-4.1-mini", [{"role": "user", "content": "Other"}], temperature=0.2)
+
+
+def test_key_changes_with_the_schema_not_just_its_name():
+    schema = RESUME_ANALYSIS_SCHEMA
+    changed = dict(schema, properties=dict(schema["properties"], extra={"type": "string"}))
+    old = ResponseCache.make_key("m", MESSAGES, response_format=response_format("resume_analysis", schema))
+    new = ResponseCache.make_key("m", MESSAGES, response_format=response_format("resume_analysis", changed))
+    assert old != new
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60)
+    cache.put("key", "m", "reply")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=2)
+    cache.put("a", "m", "1")
+    time.sleep(0.01)
+    cache.put("b", "m", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"
+    time.sleep(0.01)
+    cache.put("c", "m", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    path = tmp_path / "responses.sqlite3"
+    cache = ResponseCache(str(path), enabled=False)
+    cache.put("key", "m", "reply")
+    assert cache.get("key") is None
+    assert not path.exists()
@@ -0,0 +1,41 @@
+from resume_store import ResumeStore, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+EXPERIENCE
+Data Engineer, Acme
+Built pipelines in Python and Spark
+Skills:
+Python, SQL
+"""
+
+
+def test_same_content_is_one_shared_entry():
+    store = ResumeStore()
+    first = store.put("key", RESUME)
+    assert store.put("key", "other text") is first
+    assert store.get("key") is first and first.text == RESUME
+    # Nothing about the upload that stored it is kept with the shared entry
+    assert not hasattr(first, "file_name")
+
+
+def test_least_recently_used_resume_is_evicted():
+    store = ResumeStore(max_entries=2)
+    store.put("a", "A")
+    store.put("b", "B")
+    store.get("a")
+    store.put("c", "C")
+    assert store.get("b") is None
+    assert store.get("a").text == "A" and store.stats() == {"entries": 2}
+
+
+def test_derived_values_are_computed_from_the_text():
+    resume = ResumeStore().put("key", RESUME)
+    assert [heading for heading, _ in resume.sections] == ["", "EXPERIENCE", "Skills"]
+    assert resume.skills == {"Python": 2, "Apache Spark": 1, "SQL": 1}
+    assert resume.normalized_text.startswith("jane doe jane@example.com experience")
+
+
+def test_split_sections_keeps_text_before_the_first_heading():
+    assert split_sections("Jane\nSUMMARY\nEngineer") == [("", "Jane"), ("SUMMARY", "Engineer")]
+    assert split_sections("") == []
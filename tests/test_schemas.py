@@ -0,0 +1,114 @@
+import copy
+
+import pytest
+
+from schemas import (CAREER_ANALYSIS_SCHEMA, RESUME_ANALYSIS_SCHEMA, RESUME_NARRATIVE_SCHEMA, default_value,
+                     invalid_sections, is_valid, normalize_integers, response_format, subschema)
+
+VALID = {
+    "match_percentage": 85,
+    "summary": "Strong data background.",
+    "skill_match": {
+        "matched_skills": ["Python"],
+        "missing_skills": ["Kubernetes"],
+        "recommended_skills": [{
+            "skill": "Kubernetes", "category": "technical", "priority": "high", "prerequisites": ["Docker"],
+            "estimated_time": "4 weeks", "resources": ["Kubernetes docs"],
+        }],
+    },
+    "content_improvements": {"sections_to_improve": [], "wording_suggestions": ["Lead with impact"],
+                             "format_suggestions": []},
+    "company_specific_insights": {"company_specific_skills": [], "company_projects": [],
+                                  "networking_opportunities": [], "company_resources": []},
+    # Keys the schema doesn't ask for are tolerated
+    "extra": "ignored",
+}
+
+
+def broken(**changes):
+    reply = copy.deepcopy(VALID)
+    for path, value in changes.items():
+        target = reply
+        *parents, key = path.split("__")
+        for parent in parents:
+            target = target[parent]
+        if value is KeyError:
+            del target[key]
+        else:
+            target[key] = value
+    return reply
+
+
+def test_valid_reply():
+    assert is_valid(VALID, RESUME_ANALYSIS_SCHEMA)
+    assert invalid_sections(VALID, RESUME_ANALYSIS_SCHEMA) == []
+
+
+@pytest.mark.parametrize("reply, sections", [
+    (broken(summary=KeyError), ["summary"]),
+    (broken(summary=None), ["summary"]),
+    (broken(match_percentage="high"), ["match_percentage"]),
+    (broken(match_percentage=True), ["match_percentage"]),
+    (broken(match_percentage=85.5), ["match_percentage"]),
+    (broken(skill_match__matched_skills="Python"), ["skill_match"]),
+    (broken(skill_match__missing_skills=["Kubernetes", 3]), ["skill_match"]),
+    (broken(skill_match__recommended_skills=[{"skill": "Go"}]), ["skill_match"]),
+    (broken(skill_match__recommended_skills=[dict(VALID["skill_match"]["recommended_skills"][0], priority="urgent")]),
+     ["skill_match"]),
+    (broken(content_improvements=[], company_specific_insights=KeyError),
+     ["content_improvements", "company_specific_insights"]),
+])
+def test_invalid_sections(reply, sections):
+    assert invalid_sections(reply, RESUME_ANALYSIS_SCHEMA) == sections
+    assert not is_valid(reply, RESUME_ANALYSIS_SCHEMA)
+
+
+def test_integers_sent_as_floats_or_strings_are_valid_and_normalized():
+    reply = broken(match_percentage="85")
+    assert is_valid(reply, RESUME_ANALYSIS_SCHEMA)
+    assert normalize_integers(reply, RESUME_ANALYSIS_SCHEMA)["match_percentage"] == 85
+    reply = broken(match_percentage=85.0)
+    assert type(normalize_integers(reply, RESUME_ANALYSIS_SCHEMA)["match_percentage"]) is int
+
+    career = default_value(CAREER_ANALYSIS_SCHEMA)
+    career["career_alignment"]["alignment_score"] = " 70 "
+    assert normalize_integers(career, CAREER_ANALYSIS_SCHEMA)["career_alignment"]["alignment_score"] == 70
+
+
+def test_normalize_integers_leaves_missing_and_malformed_sections():
+    reply = broken(skill_match=KeyError, content_improvements="oops")
+    normalize_integers(reply, RESUME_ANALYSIS_SCHEMA)
+    assert "skill_match" not in reply and reply["content_improvements"] == "oops"
+
+
+def test_subschema_and_response_format():
+    schema = subschema(RESUME_ANALYSIS_SCHEMA, ["summary", "match_percentage"])
+    assert list(schema["properties"]) == ["summary", "match_percentage"]
+    assert schema["required"] == ["summary", "match_percentage"]
+    assert schema["additionalProperties"] is False
+    assert invalid_sections({"summary": "ok"}, schema) == ["match_percentage"]
+    assert list(RESUME_ANALYSIS_SCHEMA["properties"])[0] == "match_percentage"
+
+    wrapped = response_format("repair", RESUME_ANALYSIS_SCHEMA, ["summary"])
+    assert wrapped["json_schema"]["strict"] is True
+    assert wrapped["json_schema"]["schema"]["required"] == ["summary"]
+
+
+def test_schemas_are_strict_and_ordered():
+    def objects(schema):
+        if schema["type"] == "object":
+            yield schema
+            for sub_schema in schema["properties"].values():
+                yield from objects(sub_schema)
+        elif schema["type"] == "array":
+            yield from objects(schema["items"])
+
+    for schema in (RESUME_ANALYSIS_SCHEMA, RESUME_NARRATIVE_SCHEMA, CAREER_ANALYSIS_SCHEMA):
+        for obj in objects(schema):
+            assert obj["required"] == list(obj["properties"]) and obj["additionalProperties"] is False
+    assert "match_percentage" not in RESUME_NARRATIVE_SCHEMA["properties"]
+
+
+@pytest.mark.parametrize("schema", [RESUME_ANALYSIS_SCHEMA, RESUME_NARRATIVE_SCHEMA, CAREER_ANALYSIS_SCHEMA])
+def test_default_value_is_valid(schema):
+    assert is_valid(default_value(schema), schema)
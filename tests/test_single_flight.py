@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from streamlit.runtime.scriptrunner import StopException
+
+from single_flight import SingleFlight
+
+
+# Function to start `count` callers of flights.do(key, fn) once the first one is running fn;
+# returns the threads and a list their (result, shared) pairs or exceptions end up in
+def start_followers(flights, key, fn, count):
+    outcomes = []
+
+    def follow():
+        try:
+            outcomes.append(flights.do(key, fn))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for_followers(flights, count):
+    deadline = time.monotonic() + 5
+    while flights.stats()["saved"] < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"answer": 42}
+
+    leader, leader_outcome = start_followers(flights, "key", fn, 1)
+    started.wait(5)
+    threads, outcomes = start_followers(flights, "key", fn, 3)
+    wait_for_followers(flights, 3)
+    release.set()
+    for thread in leader + threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert leader_outcome == [({"answer": 42}, False)]
+    assert outcomes == [({"answer": 42}, True)] * 3
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "saved": 3}
+
+
+def test_calls_after_completion_run_again():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+    assert flights.do("other", lambda x, y=0: x + y, 3, y=4) == (7, False)
+    assert flights.stats() == {"in_flight": 0, "executed": 3, "saved": 0}
+
+
+def test_errors_are_shared_with_followers():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    leader, leader_outcome = start_followers(flights, "key", fn, 1)
+    started.wait(5)
+    threads, outcomes = start_followers(flights, "key", fn, 2)
+    wait_for_followers(flights, 2)
+    release.set()
+    for thread in leader + threads:
+        thread.join(5)
+
+    assert all(isinstance(outcome, ValueError) for outcome in leader_outcome + outcomes)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_control_flow_exceptions_are_not_shared():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            raise StopException()
+        # Long enough for the other two followers, woken together, to join the new leader
+        time.sleep(0.3)
+        return "done"
+
+    leader_errors = []
+
+    def lead():
+        try:
+            flights.do("key", fn)
+        except StopException as e:
+            leader_errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    threads, outcomes = start_followers(flights, "key", fn, 3)
+    wait_for_followers(flights, 3)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join(5)
+
+    # The stopped leader's followers elected a new leader, which the others joined
+    assert len(leader_errors) == 1
+    assert len(calls) == 2
+    assert sorted(outcomes) == [("done", False), ("done", True), ("done", True)]
+    assert flights.stats() == {"in_flight": 0, "executed": 2, "saved": 2}
+
+
+def test_submit_shares_the_future_in_flight():
+    flights = SingleFlight()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = flights.submit("key", executor, lambda: release.wait(5) and "summary")
+        second = flights.submit("key", executor, lambda: "other")
+        assert second is first
+        release.set()
+        assert first.result(5) == "summary"
+    deadline = time.monotonic() + 5
+    while flights.stats()["in_flight"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "saved": 1}
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt, SystemExit])
+def test_leader_alone_reraises_control_flow_exceptions(error):
+    flights = SingleFlight()
+
+    def fn():
+        raise error()
+
+    with pytest.raises(error):
+        flights.do("key", fn)
+    assert flights.stats()["in_flight"] == 0
@@ -0,0 +1,88 @@
+from skill_graph import ROOT, build_skill_graph, layered_layout, skill_key, to_cytoscape
+
+
+def skill(name, priority="high", prerequisites=()):
+    return {"skill": name, "priority": priority, "category": "Technical", "estimated_time": "1 month",
+            "prerequisites": list(prerequisites)}
+
+
+def render(graph):
+    return to_cytoscape(graph, layered_layout(graph))
+
+
+def test_skill_key_merges_aliases_and_versions():
+    assert skill_key("Python") == skill_key("python 3") == skill_key("PYTHON")
+    assert skill_key("PyTorch") == skill_key("torch")
+
+
+def test_skill_key_keeps_non_ascii_names():
+    assert skill_key("機械学習") == "機械学習"
+    assert skill_key("Анализ данных") == "анализ данных"
+    assert skill_key("Análisis de datos") == "análisis de datos"
+    # Compatibility forms are folded: full-width letters, decomposed accents
+    assert skill_key("ＳＱＬ") == skill_key("SQL")
+    assert skill_key("Análisis") == skill_key("Análisis")
+    assert skill_key("C++/#") != ""
+
+
+def test_skill_key_of_name_without_words_is_empty():
+    assert skill_key("") == ""
+    assert skill_key(None) == ""
+    assert skill_key(" -/ ") == ""
+
+
+def test_non_ascii_skills_and_prerequisites_are_kept():
+    graph = build_skill_graph([skill("機械学習", prerequisites=["Python", "線形代数"]),
+                               skill("Análisis de datos", "medium", ["SQL"])])
+    labels = {data["label"] for _, data in graph.nodes(data=True)}
+    assert {"機械学習", "線形代数", "Análisis de datos", "Python", "SQL"} <= labels
+    nodes, edges = render(graph)
+    assert len(nodes) == 6 and all(node["data"]["label"] for node in nodes)
+
+
+def test_skill_without_a_name_is_skipped_with_its_prerequisites():
+    graph = build_skill_graph([skill("", prerequisites=["Python"]), skill("???", prerequisites=["Go"]),
+                               skill("Docker")])
+    assert set(graph) == {ROOT, skill_key("Docker")}
+    render(graph)
+
+
+def test_duplicate_skills_are_merged():
+    graph = build_skill_graph([skill("Python", "low", ["Programming Basics"]),
+                               skill("python 3", "high", ["Algorithms"]),
+                               skill("機械学習"), skill("機械学習", "low")])
+    python = skill_key("Python")
+    assert len(graph) == 5
+    # The highest priority entry names the node; prerequisites of both are kept
+    assert graph.nodes[python]["label"] == "python 3" and graph.nodes[python]["type"] == "high"
+    assert {graph.nodes[node]["label"] for node in graph.successors(python)} == {"Programming Basics", "Algorithms"}
+
+
+def test_cycles_are_broken():
+    graph = build_skill_graph([skill("Kubernetes", prerequisites=["Docker"]), skill("Docker", prerequisites=["Kubernetes"])])
+    assert graph.graph["removed_cycle_edges"]
+    render(graph)
+
+
+def test_cap_keeps_shared_prerequisites_over_low_priority_skills():
+    priorities = ["high", "medium", "low"]
+    skills = [skill(f"Skill {i}", priorities[i % 3], [f"Prereq {i % 7}", f"Rare {i}"]) for i in range(200)]
+    graph = build_skill_graph(skills, max_nodes=60, max_edges=None)
+    assert len(graph) == 60
+    kept = {data["label"] for _, data in graph.nodes(data=True)}
+    # Each shared prerequisite is needed by about 28 skills; the single-use ones go first
+    assert {f"Prereq {i}" for i in range(7)} <= kept
+    assert not any(label.startswith("Rare") for label in kept)
+    assert all(graph.in_degree(skill_key(f"Prereq {i}")) > 0 for i in range(7))
+    assert "Skill 0" in kept and "Skill 2" not in kept
+    assert len(graph.graph["omitted"]) == 200 * 2 + 7 + 1 - 60
+
+
+def test_cap_drops_single_use_prerequisites_then_low_priority_skills():
+    skills = [skill("Go", "high", ["Concurrency"])] + [skill(f"Low {i}", "low", ["Shared"]) for i in range(3)]
+    graph = build_skill_graph(skills, max_nodes=4, max_edges=None)
+    assert set(graph) == {ROOT, skill_key("Go"), skill_key("Low 0"), skill_key("Shared")}
+    assert graph.graph["omitted"] == ["Concurrency", "Low 2", "Low 1"]
+    # Once only one skill needs it, the prerequisite is no longer shared
+    graph = build_skill_graph(skills, max_nodes=3, max_edges=None)
+    assert set(graph) == {ROOT, skill_key("Go"), skill_key("Low 0")}
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from skill_matcher import SKILLS, SkillMatcher, load_skills, match_skills, tokenize
+
+matcher = SkillMatcher(SKILLS)
+
+
+def test_tokenize_keeps_skill_symbols():
+    assert tokenize("C++, C#, Node.js and .NET; CI/CD.") == ["c++", "c#", "node.js", "and", "dotnet", "ci", "cd"]
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("Python, python3 and PYTHON", {"Python": 3}),
+    ("Built REST APIs with FastAPI on k8s", {"REST APIs": 1, "FastAPI": 1, "Kubernetes": 1}),
+    ("Golang services, R programming and C++", {"Go": 1, "R": 1, "C++": 1}),
+    ("React Native apps and React web apps", {"React Native": 1, "React": 1}),
+    ("Deployed on .NET and ASP.NET", {".NET": 2}),
+    ("Ruby on Rails and Spring Boot", {"Ruby on Rails": 1, "Spring": 1}),
+])
+def test_aliases_find_their_skills(text, skills):
+    assert matcher.find_skills(text) == skills
+
+
+def test_skills_are_reported_in_order_of_first_mention():
+    assert list(matcher.find_skills("Kafka, then Python, then Kafka again and SQL")) == ["Kafka", "Python", "SQL"]
+
+
+@pytest.mark.parametrize("text", [
+    "Our spring internship starts in March and ends in the summer.",
+    "We value swift delivery and the spark of curiosity in every hire.",
+    "You will be monitoring patients and stacking shipping containers on rails.",
+    "Carry the torch for our mission. Go further, R&D minded, express yourself and react fast.",
+    "Apply now to join a friendly team in a great location.",
+])
+def test_ordinary_prose_matches_no_skill(text):
+    assert matcher.find_skills(text) == {}
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Backend services in Java and Spring", "Spring"),
+    ("Python, SQL, Spark, Kafka", "Apache Spark"),
+    ("iOS apps written in Swift", "Swift"),
+    ("Rails and PostgreSQL", "Ruby on Rails"),
+    ("TypeScript and React", "React"),
+    ("Monitoring with Prometheus", "Monitoring"),
+    ("Docker containers", "Docker"),
+    ("Models in torch and NumPy", "PyTorch"),
+    ("Pipelines on Apache Spark", "Apache Spark"),
+    ("Jobs on PySpark", "Apache Spark"),
+    ("A SwiftUI app", "Swift"),
+])
+def test_everyday_aliases_count_next_to_other_skills(text, skill):
+    assert skill in matcher.find_skills(text)
+
+
+def test_everyday_aliases_need_a_skill_within_the_window():
+    assert "Apache Spark" not in matcher.find_skills("Python is what we use to spark new ideas")
+    assert "Apache Spark" in matcher.find_skills("Python jobs on spark")
+
+
+@pytest.mark.parametrize("phrase, name", [
+    ("pytorch", "PyTorch"),
+    ("Torch", "PyTorch"),
+    ("k8s", "Kubernetes"),
+    ("Spring", "Spring"),
+    ("apache spark", "Apache Spark"),
+    ("Node.js", "Node.js"),
+    ("Python programming", None),
+    ("", None),
+])
+def test_canonical_name(phrase, name):
+    assert matcher.canonical_name(phrase) == name
+
+
+def test_implied_skills_are_followed_transitively():
+    assert matcher.with_implied(["Next.js"]) == {"Next.js", "React", "JavaScript"}
+    assert matcher.with_implied(["PyTorch"]) == {"PyTorch", "Python", "Deep Learning", "Machine Learning"}
+    assert matcher.with_implied([]) == set()
+
+
+def test_match_weighs_skills_by_mentions_and_counts_implied_ones():
+    resume = "Built models in PyTorch and served them with FastAPI."
+    job = "Python, Python, Python and Kubernetes. Deep learning experience required."
+    result = match_skills(resume, job)
+    assert result["matched_skills"] == ["Python", "Deep Learning"]
+    assert result["missing_skills"] == ["Kubernetes"]
+    # Python weighs 1 + ln 3, the other two 1 each
+    assert result["match_percentage"] == 76
+
+
+def test_match_without_known_skills():
+    assert match_skills("Python developer", "A friendly team in a great location") == {
+        "match_percentage": 0, "matched_skills": [], "missing_skills": []}
+
+
+def test_extra_skills_from_a_taxonomy_file(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps([{"name": "Polars", "aliases": ["polars"], "implies": ["Python"]}]), encoding="utf-8")
+    extra = SkillMatcher(SKILLS + load_skills(path))
+    assert extra.find_skills("Dataframes in Polars") == {"Polars": 1}
+    assert extra.match("Polars", "Python")["matched_skills"] == ["Python"]
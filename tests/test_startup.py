@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import profile_imports  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    packages, _ = profile_imports.profile("streamlit")
+    return packages
+
+
+# The startup regression check of benchmarks/profile_imports.py: each module the app imports
+# at startup stays within the budget and leaves the heavy packages to the features using them
+@pytest.mark.parametrize("module", profile_imports.STARTUP_MODULES)
+def test_startup_import(module, baseline):
+    packages, total = profile_imports.profile(module)
+    assert profile_imports.check(module, packages, total, baseline) == []
+
+
+def test_check_reports_deferred_packages_and_budget():
+    packages = {"streamlit": (1, 1), "numpy": (60000, 60000)}
+    failures = profile_imports.check("app", packages, 2500000, {"streamlit": (1, 1)})
+    assert failures == ["import app loads numpy, which should be deferred",
+                        "import app took 2500 ms, over the 2000 ms budget"]
+    assert profile_imports.check("app", packages, 100000, {"numpy": (1, 1)}) == []
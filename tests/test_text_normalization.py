@@ -0,0 +1,76 @@
+import random
+import re
+
+import pytest
+
+from text_normalization import join_pdf_pages, normalize_document, normalize_pdf_page, normalize_text_file
+
+
+# The chained re.sub calls the rules replaced, as extract_text_from_file used to run them
+def original_page(text):
+    text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
+    text = re.sub(r'(\d{4})\s*\n\s*(\d{4})', r'\1-\2', text)
+    text = re.sub(r'([A-Z][a-z]+)\s*\n\s*([A-Z][a-z]+)', r'\1 \2', text)
+    text = re.sub(r'\n([A-Z][A-Z\s]+)\n', r'\n\n\1\n', text)
+    text = re.sub(r'\n\s*•\s*', '\n• ', text)
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
+    return re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
+
+
+def original_text_file(text):
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
+    return re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
+
+
+def original_document(text):
+    text = text.strip()
+    text = re.sub(r'(\d{4})\s*-\s*(\d{4})', r'\1 - \2', text)
+    text = re.sub(r'(\d{4})\s*–\s*(\d{4})', r'\1 – \2', text)
+    text = re.sub(r'\n\s*•\s*', '\n• ', text)
+    return re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+
+
+# Fragments chosen to sit on both sides of every rule, including at page edges
+FRAGMENTS = ["2019", "2021", "-", "–", "•", "\n", "\n\n\n", " ", "  ", "EXPERIENCE", "Data", "Engineer",
+             "built pipe-", "lines", "Acme Corp", "python", "\t", "\n • ", "", "x"]
+
+
+def random_page(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_rules_match_original_chain(seed):
+    rng = random.Random(seed)
+    raw_pages = [random_page(rng) for _ in range(rng.randint(1, 6))]
+    pages = [normalize_pdf_page(page) for page in raw_pages]
+    assert pages == [original_page(page) for page in raw_pages]
+
+    expected = original_document("".join(page + "\n\n" for page in pages))
+    assert normalize_document("".join(page + "\n\n" for page in pages)) == expected
+    assert join_pdf_pages(pages) == expected
+
+    text = "\n".join(raw_pages)
+    assert normalize_text_file(text) == original_text_file(text)
+
+
+@pytest.mark.parametrize("pages", [
+    [],
+    [""],
+    ["", "", ""],
+    ["Worked 2019", "- 2021 at Acme"],
+    ["Skills\n", "• Python"],
+    ["2019 –", "2021"],
+    ["  SUMMARY", "EXPERIENCE  "],
+    ["line\n", "\nline"],
+])
+def test_join_pdf_pages_edge_cases(pages):
+    pages = [normalize_pdf_page(page) for page in pages]
+    assert join_pdf_pages(pages) == original_document("".join(page + "\n\n" for page in pages))
+
+
+def test_page_rules_fix_extraction_artifacts():
+    page = "Built pipe-\nlines\nJohn\nSmith\n2019\n2021\n   •  Python\n\n\n\n2019-2021"
+    assert normalize_pdf_page(page) == "Built pipelines\nJohn Smith\n2019 - 2021\n• Python\n\n2019 - 2021"
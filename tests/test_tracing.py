@@ -0,0 +1,156 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = tracing.Recorder()
+    monkeypatch.setattr(tracing, "enabled", True)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+    return recorder
+
+
+@pytest.fixture
+def sink(monkeypatch, tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    recorder = tracing.Recorder(str(path))
+    monkeypatch.setattr(tracing, "enabled", True)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+    return lambda: [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_nested_spans_share_the_trace_of_their_root(sink):
+    with tracing.span("analysis") as root:
+        with tracing.span("completion", model="gpt") as child:
+            with tracing.span("json_parse") as grandchild:
+                pass
+    with tracing.span("other") as other:
+        pass
+
+    assert (child.trace_id, child.parent_id) == (root.span_id, root.span_id)
+    assert (grandchild.trace_id, grandchild.parent_id) == (root.span_id, child.span_id)
+    assert (root.parent_id, other.trace_id) == (None, other.span_id)
+    records = sink()
+    assert [record["name"] for record in records] == ["json_parse", "completion", "analysis", "other"]
+    assert records[1]["model"] == "gpt"
+    assert records[1]["parent_id"] == root.span_id
+    assert set(records[2]) == {"trace_id", "span_id", "parent_id", "name", "start", "duration_ms"}
+
+
+def test_adopted_spans_on_worker_threads_are_children(recorder):
+    spans = []
+
+    def work():
+        with tracing.adopt(parent), tracing.span("section") as child:
+            spans.append(child)
+        # Nothing stays adopted once the block is left
+        with tracing.span("detached") as detached:
+            spans.append(detached)
+
+    with tracing.span("analysis") as parent:
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    children = [span for span in spans if span.name == "section"]
+    assert [(span.trace_id, span.parent_id) for span in children] == [(parent.span_id, parent.span_id)] * 3
+    assert all(span.parent_id is None for span in spans if span.name == "detached")
+    assert tracing.current_span() is tracing._NOOP
+    assert tracing.adopt(tracing._NOOP) is tracing._NOOP
+
+
+def test_errors_are_recorded_and_reraised(sink):
+    with pytest.raises(ValueError):
+        with tracing.span("pdf_parse"):
+            raise ValueError("bad page")
+    assert sink()[0]["error"] == "ValueError"
+    assert tracing.recorder.stage_stats()["pdf_parse"]["errors"] == 1
+
+
+def test_stage_stats_use_nearest_rank_percentiles(recorder):
+    span = SimpleNamespace(name="stage", attributes={})
+    for duration in range(100, 0, -1):
+        recorder.record(span, duration / 1000)
+    stats = recorder.stage_stats()["stage"]
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (0.05, 0.095, 0.099, 0.1)
+    assert stats["count"] == 100
+    assert stats["mean"] == pytest.approx(0.0505)
+
+    small = tracing.Recorder()
+    for duration in (3, 1, 2):
+        small.record(SimpleNamespace(name="stage", attributes={}), duration)
+    stats = small.stage_stats()["stage"]
+    assert (stats["p50"], stats["p95"], stats["p99"]) == (2, 3, 3)
+
+
+def test_percentiles_cover_only_the_recent_window():
+    recorder = tracing.Recorder(window=3)
+    for duration in (9, 9, 9, 1, 2, 3):
+        recorder.record(SimpleNamespace(name="stage", attributes={}), duration)
+    stats = recorder.stage_stats()["stage"]
+    assert (stats["count"], stats["sum"], stats["max"], stats["p50"]) == (6, 33, 3, 2)
+
+
+def test_prometheus_text(recorder):
+    recorder.record(SimpleNamespace(name="completion", attributes={}), 0.25)
+    recorder.record(SimpleNamespace(name="completion", attributes={"error": "Timeout"}), 0.75)
+    tracing.record_usage("gpt-4o-mini", SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+    tracing.register_collector("response_cache", lambda: {"hits": 3, "enabled": True, "path": "/tmp/x", "ratio": 0.5})
+    tracing.register_collector("rate_limiter", lambda: {"gpt-4o-mini": {"queue_depth": 2, "paused": False},
+                                                        "gpt-4.1-mini": {"queue_depth": 0}}, label="model")
+    tracing.register_collector("broken", lambda: 1 / 0)
+    tracing.register_collector("empty", lambda: {"note": "text only"})
+
+    lines = recorder.prometheus_text().splitlines()
+    assert 'nextcv_stage_seconds{stage="completion",quantile="0.5"} 0.250000' in lines
+    assert 'nextcv_stage_seconds{stage="completion",quantile="0.99"} 0.750000' in lines
+    assert 'nextcv_stage_seconds_sum{stage="completion"} 1.000000' in lines
+    assert 'nextcv_stage_seconds_count{stage="completion"} 2' in lines
+    assert 'nextcv_stage_errors_total{stage="completion"} 1' in lines
+    assert 'nextcv_llm_requests_total{model="gpt-4o-mini"} 1' in lines
+    assert 'nextcv_llm_prompt_tokens_total{model="gpt-4o-mini"} 120' in lines
+    assert 'nextcv_llm_completion_tokens_total{model="gpt-4o-mini"} 30' in lines
+    assert "nextcv_response_cache_hits 3" in lines
+    assert "nextcv_response_cache_ratio 0.5" in lines
+    assert 'nextcv_rate_limiter_queue_depth{model="gpt-4o-mini"} 2' in lines
+    assert 'nextcv_rate_limiter_queue_depth{model="gpt-4.1-mini"} 0' in lines
+    # Bools and text are not samples, and a failing or text-only collector adds nothing
+    assert not any("enabled" in line or "path" in line or "paused" in line for line in lines)
+    assert not any("nextcv_broken" in line or "nextcv_empty" in line for line in lines)
+    samples = [line for line in lines if not line.startswith("#")]
+    assert all(len(line.split(" ")) == 2 and float(line.split(" ")[1]) >= 0 for line in samples)
+
+
+def test_disabled_tracing_does_nothing(monkeypatch):
+    recorder = tracing.Recorder()
+    monkeypatch.setattr(tracing, "enabled", False)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+
+    def stage():
+        return 1
+
+    assert tracing.traced("stage")(stage) is stage
+    assert tracing.span("stage", pages=3) is tracing._NOOP
+    with tracing.span("stage") as span:
+        span.set(chars=10)
+        assert tracing.current_span() is tracing._NOOP
+    tracing.record_usage("gpt-4o-mini", SimpleNamespace(prompt_tokens=1, completion_tokens=1))
+    assert recorder.stage_stats() == {} and recorder.usage_stats() == {}
+
+
+def test_traced_functions_are_timed(recorder):
+    @tracing.traced("lookup")
+    def lookup(company):
+        """Look up a company."""
+        return company.upper()
+
+    assert lookup("acme") == "ACME"
+    assert lookup.__name__ == "lookup" and lookup.__doc__ == "Look up a company."
+    assert recorder.stage_stats()["lookup"]["count"] == 1